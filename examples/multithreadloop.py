@@ -7,12 +7,12 @@ of user-defined functions when the gui is idle.
 
 The worker thread 'work' is to increment a counter
 as fast as interpreter can handle. Every so often (every resultStep counts),
-the thread stores the count in a synchronized queue, for later retrieval
-by the main thread. In parallel to this, the main thread loops forever (or
+the thread sends the count via a pub.QueuedPublisher, which only queues the
+message. In parallel to this, the main thread loops forever (or
 until user interrupts via keyboard), doing some hypothetical work
 (represented by the sleep(1) call) and calling all registered 'idle'
-callbacks. The transfer is done by extracting items from the queue and
-publishing them via pubsub.
+callbacks. The transfer is done by draining the queued publisher, which
+delivers the queued messages to listeners from the main thread.
 
 Oliver Schoenborn
 May 2009
@@ -22,7 +22,6 @@ May 2009
 
 """
 
-from queue import Queue
 import time
 import threading
 import sys
@@ -35,16 +34,17 @@ __date__ = "$31-May-2009 9:11:41 PM$"
 resultStep = 1000000  # how many counts for thread "result" to be available
 
 
-def threadObserver(transfers, threadObj, count):
+def threadObserver(count):
     """Listener that listens for data from testTopic. This function
     doesn't know where the data comes from (or in what thread it was
-    generated... but threadObj is the thread in which this
+    generated... but the current thread is the one in which this
     threadObserver is called and should indicate Main thread)."""
 
-    print(transfers, threadObj, count / resultStep)
+    print(thread.transfer, threading.current_thread(), count / resultStep)
 
 
 pub.subscribe(threadObserver, 'testTopic')
+queuedPub = pub.QueuedPublisher(pub.getDefaultPublisher())
 
 
 def onIdle():
@@ -58,8 +58,8 @@ def onIdle():
 class ParaFunction(threading.Thread):
     """
     Represent a function running in a parallel thread. The thread
-    just increments a counter and puts the counter value on a synchronized
-    queue every resultStep counts. The content of the queue can be published by
+    just increments a counter and sends the counter value via the queued
+    publisher every resultStep counts. The queued messages are delivered by
     calling transferData().
     """
 
@@ -67,7 +67,6 @@ class ParaFunction(threading.Thread):
         threading.Thread.__init__(self)
         self.running = False  # set to True when thread should stop
         self.count = 0  # our workload: keep counting!
-        self.queue = Queue()  # to transfer data to main thread
         self.transfer = 0  # count how many transfers occurred
 
     def run(self):
@@ -76,7 +75,7 @@ class ParaFunction(threading.Thread):
         while self.running:
             self.count += 1
             if self.count % resultStep == 0:
-                self.queue.put(self.count)
+                queuedPub.sendMessage('testTopic', count=self.count)
 
         print('aux thread done')
 
@@ -84,16 +83,12 @@ class ParaFunction(threading.Thread):
         self.running = False
 
     def transferData(self):
-        """Send data from aux thread to main thread. The data was put in
-        self.queue by the aux thread, and this queue is a Queue.Queue which
-        is a synchronized queue for inter-thread communication.
+        """Send data from aux thread to main thread. The messages were
+        queued by the aux thread, and get delivered to listeners by the
+        thread that drains the queued publisher.
         Note: This method must be called from main thread."""
         self.transfer += 1
-        while not self.queue.empty():
-            pub.sendMessage('testTopic',
-                            transfers=self.transfer,
-                            threadObj=threading.currentThread(),
-                            count=self.queue.get())
+        queuedPub.drain()
 
 
 thread = ParaFunction()
@@ -7,10 +7,11 @@ object modules.
 
 """
 
-from .publisher import Publisher
+from .publisher import Publisher, MessageSender, QueuedPublisher, QueuePolicy, MessageIterator, MessageStream
 
 from .callables import (
     AUTO_TOPIC,
+    MSG_BATCH,
 )
 
 from .listener import (
@@ -18,7 +19,19 @@ from .listener import (
     ListenerMismatchError,
     IListenerExcHandler,
     Listener,
+    DispatchMode,
+    ListenerProcessError,
 )
+from .topicargspec import (
+    MsgDataCheck,
+    LazyValue,
+)
+from .scheduler import (
+    IScheduler,
+    TimerScheduler,
+    AsyncioScheduler,
+)
+
 from .topicobj import (
     Topic,
     SenderUnknownMsgDataError,
@@ -35,6 +48,10 @@ from .topicmgr import (
     ALL_TOPICS,
 )
 
+from .topicutils import (
+    isTopicPattern,
+)
+
 from .topicdefnprovider import (
     ITopicDefnProvider,
     TopicDefnProvider,
@@ -5,14 +5,16 @@ The AUTO_TOPIC
 is the "marker" to use in callables to indicate that when a message
 is sent to those callables, the topic object for that message should be
 added to the data sent via the call arguments. See the docs in
-CallArgsInfo regarding its autoTopicArgName data member.
+CallArgsInfo regarding its autoTopicArgName data member. Similarly, MSG_BATCH
+marks callables that accept message batches in columnar form (see batchArgName).
 
 :copyright: Copyright since 2006 by Oliver Schoenborn, all rights reserved.
 :license: BSD, see LICENSE_BSD_Simple.txt for details.
 
 """
 
-from inspect import ismethod, isfunction, signature, Parameter
+from inspect import ismethod, isfunction, iscoroutinefunction, signature, Parameter
+from importlib import import_module
 import sys
 from types import ModuleType
 from typing import Tuple, List, Sequence, Callable, Any
@@ -22,6 +24,11 @@ from typing import Tuple, List, Sequence, Callable, Any
 # pubsub can find such kwarg.
 class AUTO_TOPIC: pass
 
+# Opaque constant used to mark a kwarg of a listener as one to which pubsub should assign the number of messages
+# in a batch: such a listener receives message data in columnar form, ie each message data as a sequence having
+# one item per message of the batch. Like AUTO_TOPIC, it should be used by reference.
+class MSG_BATCH: pass
+
 # In the user domain, a listener is any callable, regardless of signature. The return value is ignored,
 # i.e. the listener will be treated as though it is a Callable[..., None]. Also, the args, "...", must be
 # consistent with the MDS of the topic to which listener is being subscribed.
@@ -62,6 +69,50 @@ def getID(callable_obj: UserListener) -> Tuple[str, ModuleType]:
     return obj_name, module
 
 
+def getCallableFromPath(path: str) -> UserListener:
+    """
+    Get the callable at the given importable path, of the form 'module:name', where module
+    is a (possibly dotted) module name, and name is the (possibly dotted) qualified name of the
+    callable in that module. E.g. getCallableFromPath('a.b:Foo.bar') returns Foo.bar of module a.b.
+    :raise ValueError: if path is not of that form or does not lead to a callable
+    """
+    moduleName, sep, qualName = path.partition(':')
+    if not (sep and moduleName and qualName):
+        raise ValueError('path "%s" is not of the form "module:name"' % path)
+
+    try:
+        obj = import_module(moduleName)
+        for name in qualName.split('.'):
+            obj = getattr(obj, name)
+    except (ImportError, AttributeError) as exc:
+        raise ValueError('path "%s" does not lead to a callable: %s' % (path, exc))
+
+    if not callable(obj):
+        raise ValueError('object at path "%s" is not callable' % path)
+    return obj
+
+
+def getPath(callable_obj: UserListener) -> str:
+    """
+    Get the importable path of a function, in the form accepted by getCallableFromPath(). This is the
+    counterpart of getID() for functions that must be found again by name, such as from another process.
+    :raise ValueError: if callable_obj is not a function, or is not importable by its name (such as a lambda
+        or a function defined inside another function)
+    """
+    if not isfunction(callable_obj):
+        raise ValueError('only functions have importable paths (got "%s")' % type(callable_obj).__name__)
+
+    module = getModule(callable_obj)
+    path = '%s:%s' % (module, callable_obj.__qualname__)
+    try:
+        found = getCallableFromPath(path)
+    except ValueError:
+        found = None
+    if found is not callable_obj:
+        raise ValueError('function "%s" of module %s is not importable by name' % (callable_obj.__qualname__, module))
+    return path
+
+
 def getRawFunction(callable_obj: UserListener) -> Tuple[Callable]:
     """
     Get raw function information about a callable.
@@ -125,6 +176,10 @@ class CallArgsInfo:
         - self.autoTopicArgName will be the name of argument in which to put the Topic
           object for which pubsub message is sent, or None if auto off. This is identified
           by a parameter that has a default value of AUTO_TOPIC.
+        - self.batchArgName will be the name of argument in which to put the number of
+          messages of a batch, or None if listener does not accept batches. This is identified
+          by a parameter that has a default value of MSG_BATCH.
+        - self.isCoroutine will be True if the listener is a coroutine function (async def).
 
         For instance,
         - listener(self, arg1, arg2=AUTO_TOPIC, arg3=None) will have self.allParams = (arg1, arg2, arg3),
@@ -136,7 +191,9 @@ class CallArgsInfo:
         requiredArgs = []
         optionalArgs = []
         self.autoTopicArgName = None
+        self.batchArgName = None
         self.acceptsAllKwargs = False
+        self.isCoroutine = iscoroutinefunction(func)
         for argName, param in signature(func).parameters.items():
             if argName in ignoreArgs or param.kind == Parameter.VAR_POSITIONAL:
                 continue
@@ -150,6 +207,8 @@ class CallArgsInfo:
             else:
                 if param.default == AUTO_TOPIC:
                     self.autoTopicArgName = argName
+                elif param.default == MSG_BATCH:
+                    self.batchArgName = argName
                 else:
                     optionalArgs.append(argName)
 
@@ -5,22 +5,33 @@ Top-level functionality related to message listeners.
 :license: BSD, see LICENSE_BSD_Simple.txt for details.
 """
 
+from enum import IntEnum
+from functools import lru_cache
+from threading import Lock
+from time import monotonic
+import traceback
+import warnings
 from types import ModuleType
-from typing import Callable, Mapping, Any, Sequence
+from typing import Callable, Mapping, Any, Sequence, Optional, Tuple, List, Union, Hashable
 
 from .callables import (
     getID,
+    getPath,
+    getCallableFromPath,
     getArgs,
     ListenerMismatchError,
     CallArgsInfo,
     AUTO_TOPIC as _AUTO_ARG,
+    MSG_BATCH as _BATCH_ARG,
     UserListener,
 )
-from .weakmethod import getWeakRef, WeakRef
+from .weakmethod import getWeakRef, WeakRef, StrongRef
 from .annotations import annotationType
 
 __all__ = [
     'Listener',
+    'DispatchMode',
+    'ListenerProcessError',
     'IListenerExcHandler',
     'ListenerValidator'
 ]
@@ -37,6 +48,10 @@ class Listener:
     pass
 
 
+CoalesceOption = Union[bool, Callable[[Mapping[str, Any]], Hashable]]
+ScheduleCall = Callable[[Listener, float, Callable[[], None]], None]
+
+
 class IListenerExcHandler:
     """
     Interface class base class for any handler given to pub.setListenerExcHandler()
@@ -58,10 +73,62 @@ class IListenerExcHandler:
         raise NotImplementedError('%s must override __call__()' % self.__class__)
 
 
+class DispatchMode(IntEnum):
+    """
+    How listeners get called when a message is sent: INLINE calls them one after the other in the
+    thread that sends the message; THREAD_POOL submits the calls to the topic tree's thread pool
+    (see Publisher.setThreadPoolExecutor()) and returns without waiting for them; THREAD_POOL_WAIT
+    also submits the calls but waits for them to complete, for at most the topic's timeout.
+    PROCESS_POOL submits the calls to the topic tree's process pool (see
+    Publisher.setProcessPoolExecutor()) without waiting; it can only be given at subscription,
+    for listeners that are functions importable by name (see Listener.getPath()).
+    """
+    INLINE, THREAD_POOL, THREAD_POOL_WAIT, PROCESS_POOL = range(4)
+
+
+class ListenerProcessError(RuntimeError):
+    """
+    Given to the listener exception handler when a listener called from the process pool
+    (see DispatchMode.PROCESS_POOL) raised an exception, since the exception itself stays in
+    the worker process. The formatted traceback of that exception is in excTraceback.
+    """
+
+    def __init__(self, listenerPath: str, excTraceback: str):
+        RuntimeError.__init__(self, 'Listener %s raised in worker process:\n%s' % (listenerPath, excTraceback))
+        self.listenerPath = listenerPath
+        self.excTraceback = excTraceback
+
+
+@lru_cache(maxsize=None)
+def _getListenerAtPath(path: str) -> UserListener:
+    return getCallableFromPath(path)
+
+
+def _callInProcess(calls: Sequence[Tuple[str, Optional[Mapping[str, Any]], bool]],
+                   data: Mapping[str, Any], allData: Mapping[str, Any] = None) -> List[Tuple[str, str]]:
+    """
+    Call listeners in a worker process of the process pool. Each call is a triple of listener path,
+    curried args and whether the listener wants all message data. Returns a (path, formatted traceback)
+    pair for each listener that raised.
+    """
+    failures = []
+    for path, curriedArgs, wantsAllData in calls:
+        kwargs = allData if wantsAllData and allData is not None else data
+        if curriedArgs:
+            kwargs = {**kwargs, **curriedArgs}
+        try:
+            _getListenerAtPath(path)(**kwargs)
+        except Exception:
+            failures.append((path, traceback.format_exc()))
+    return failures
+
+
 class Listener:
     """
     Wraps a callable (UserListener) so it can be stored by weak reference and introspected
-    to verify that it adheres to a topic's MDS.
+    to verify that it adheres to a topic's MDS. A Listener created with strong=True holds
+    its callable by strong reference instead: such a listener never dies, so it must be
+    unsubscribed explicitly.
 
     A Listener instance has the same hash value as the callable that it wraps.
 
@@ -71,26 +138,62 @@ class Listener:
 
     Callables that have a '** kargs' argument will receive all message data, not just that for
     the topic they are subscribed to. Such a listener will have wantsAllMessageData() True.
+
+    Callables that have 'argName=pub.MSG_BATCH' as a kwarg always receive message data in
+    columnar form, ie as sequences with one item per message, and the number of messages
+    as argName: a whole batch in one call (see Topic.publishBatch()), or a batch of one for a
+    message sent by sendMessage(). Such a Listener will have wantsMsgBatch() True.
     """
 
     AUTO_TOPIC = _AUTO_ARG
+    MSG_BATCH = _BATCH_ARG
 
     def __init__(self, callable_obj: UserListener, argsInfo: CallArgsInfo, curriedArgs: Mapping[str, Any] = None,
-                 onDead: Callable[[Listener], None] = None):
+                 onDead: Callable[[Listener], None] = None, strong: bool = False,
+                 dispatchMode: DispatchMode = None, coalesce: CoalesceOption = None,
+                 throttle: float = None, debounce: float = None, scheduleCall: ScheduleCall = None):
         """
         Use callable_obj as a listener of topicName. The argsInfo is the
         return value from a Validator, ie an instance of callables.CallArgsInfo.
         If given, the onDead will be called with self as parameter, if/when
         callable_obj gets garbage collected (callable_obj is held only by weak
-        reference).
+        reference). If strong is True, callable_obj is held by strong reference,
+        and onDead is ignored. The dispatchMode and coalesce, if given, override the
+        dispatch mode and coalescing of the topic the listener is subscribed to (see
+        Topic.setDispatchMode() and Topic.setCoalescing()).
+
+        If throttle is given, the callable gets called at most once every throttle seconds: the
+        calls in between are skipped, except the last one, which is deferred until the end of the
+        interval. If debounce is given, the callable gets called only once debounce seconds have
+        passed without a call, with the last call's message. The deferred calls are given to
+        scheduleCall, with self, the delay and the function to call after that delay.
         """
         # set call policies
         self.acceptsAllKwargs = argsInfo.acceptsAllKwargs
         self.curriedArgs = curriedArgs
 
         self._autoTopicArgName = argsInfo.autoTopicArgName
-        self._callable = getWeakRef(callable_obj, self.__notifyOnDead)
-        self.__onDead = onDead
+        self._batchArgName = argsInfo.batchArgName
+        self.__isCoroutine = argsInfo.isCoroutine
+        self.__dispatchMode = None if dispatchMode is None else DispatchMode(dispatchMode)
+        if not (coalesce is None or isinstance(coalesce, bool) or callable(coalesce)):
+            raise ValueError('coalesce must be a bool or a key function (got %s)' % type(coalesce).__name__)
+        if coalesce and self.__isCoroutine:
+            raise ValueError('coroutine listeners can\'t coalesce messages')
+        self.__coalesce = coalesce
+        self.__path = None
+        if self.__dispatchMode is DispatchMode.PROCESS_POOL:
+            self.__checkProcessable(callable_obj)
+        elif self.__dispatchMode is not None and self.__dispatchMode is not DispatchMode.INLINE and self.__isCoroutine:
+            raise ValueError('coroutine listeners can\'t be called from thread pool')
+        self.__initRateLimit(throttle, debounce, scheduleCall)
+        self.__strong = strong
+        if strong:
+            self._callable = StrongRef(callable_obj)
+            self.__onDead = None
+        else:
+            self._callable = getWeakRef(callable_obj, self.__notifyOnDead)
+            self.__onDead = onDead
 
         # save identity now in case callable dies:
         name, mod = getID(callable_obj)  #
@@ -99,6 +202,8 @@ class Listener:
         self.__id = str(id(callable_obj))[-4:]  # only last four digits of id
         self.__hash = hash(callable_obj)
 
+        self.__makeInvokers()
+
     def name(self) -> str:
         """
         Return a human readable name for listener, based on the
@@ -137,10 +242,47 @@ class Listener:
         """Return True if this listener died (has been garbage collected)"""
         return self._callable() is None
 
+    def isStrongRef(self) -> bool:
+        """True if this listener holds its callable by strong reference (so it can't die)"""
+        return self.__strong
+
     def wantsTopicObjOnCall(self) -> bool:
         """True if this listener wants topic object: it has a arg=pub.AUTO_TOPIC"""
         return self._autoTopicArgName is not None
 
+    def getPath(self) -> str:
+        """
+        Get the importable path of the wrapped callable, of the form 'module:name' (see
+        pub.subscribe()). Raises ValueError if the callable is not a function importable by name.
+        """
+        if self.__path is None:
+            self.__path = getPath(self.getCallable())
+        return self.__path
+
+    def getDispatchMode(self) -> Optional[DispatchMode]:
+        """Get the dispatch mode given at subscription, or None if the listener uses its topic's."""
+        return self.__dispatchMode
+
+    def getRateLimit(self) -> Tuple[Optional[float], Optional[float]]:
+        """Get the (throttle, debounce) pair given at subscription (None for those not given)."""
+        return self.__throttle, self.__debounce
+
+    def getCoalescing(self) -> Optional[CoalesceOption]:
+        """Get the coalescing given at subscription, or None if the listener uses its topic's."""
+        return self.__coalesce
+
+    def isCoroutine(self) -> bool:
+        """
+        True if the wrapped callable is a coroutine function (async def): it only runs when
+        the message is sent by Publisher.asendMessage(), which awaits it. Messages sent otherwise
+        (sendMessage(), etc) skip it, with a RuntimeWarning.
+        """
+        return self.__isCoroutine
+
+    def wantsMsgBatch(self) -> bool:
+        """True if this listener wants message data in columnar form: it has a arg=pub.MSG_BATCH"""
+        return self._batchArgName is not None
+
     def wantsAllMessageData(self) -> bool:
         """True if this listener wants all message data: it has a ** kwargs argument"""
         return self.acceptsAllKwargs
@@ -156,14 +298,143 @@ class Listener:
                 .format(self, curriedArgs.keys(), self.curriedArgs.keys()))
 
         self.curriedArgs = curriedArgs
+        self.__makeInvokers()
 
     def _unlinkFromTopic_(self):
-        """Tell self that it is no longer used by a Topic. This allows to break some cyclical references."""
+        """
+        Tell self that it is no longer used by a Topic. This allows to break some cyclical references.
+        The call deferred by throttle or debounce, if any, is forgotten.
+        """
         self.__onDead = None
+        with self.__rateLock:
+            self.__scheduleCall = None
+            self.__pendingCall = None
+
+    def _raiseProcessError(self, excTraceback: str):
+        """Raise ListenerProcessError for an exception raised by this listener in a worker process."""
+        raise ListenerProcessError(self.getPath(), excTraceback)
 
     def _calledWhenDead(self):
         raise RuntimeError('BUG: Dead Listener called, still subscribed!')
 
+    def __checkProcessable(self, callable_obj: UserListener):
+        """Raise ValueError if callable_obj can't be called from process pool."""
+        self.__path = getPath(callable_obj)
+        if self.__isCoroutine or self._autoTopicArgName is not None or self._batchArgName is not None:
+            raise ValueError('Listener "%s" can\'t be called from process pool: it is a coroutine function '
+                             'or has a pub.AUTO_TOPIC or pub.MSG_BATCH parameter' % self.__path)
+
+    def __initRateLimit(self, throttle: Optional[float], debounce: Optional[float], scheduleCall: Optional[ScheduleCall]):
+        """Check and set the throttle and debounce of this listener, and the state needed to enforce them."""
+        if throttle is not None and debounce is not None:
+            raise ValueError('only one of throttle and debounce can be given')
+        delay = throttle if debounce is None else debounce
+        if delay is not None:
+            if delay <= 0:
+                raise ValueError('throttle and debounce must be positive (got %s)' % delay)
+            if scheduleCall is None:
+                raise ValueError('throttled and debounced listeners need a function to schedule calls')
+            if self.__isCoroutine or self.__dispatchMode is DispatchMode.PROCESS_POOL:
+                raise ValueError('coroutine listeners and listeners called from process pool '
+                                 'can\'t be throttled or debounced')
+
+        self.__throttle = throttle
+        self.__debounce = debounce
+        self.__scheduleCall = scheduleCall
+        self.__rateLock = Lock()
+        self.__pendingCall = None  # (args of invoker) of the call deferred until end of throttle or debounce delay
+        self.__nextCallTime = 0.0  # throttle: earliest time of next call
+        self.__lastMsgTime = 0.0  # debounce: time of last message
+
+    def __makeInvokers(self):
+        """Create the functions that call the wrapped callable (see __makeInvoker() and __makeBatchInvoker())."""
+        self._invokeBatch = self.__makeBatchInvoker()
+        call = self.__makeInvoker()
+        if self.__isCoroutine:
+            # only Topic.apublish() can await the listener, other sends skip it:
+            self._invokeAsync = call
+            self._invokeBatch = None
+            self._invoke = self.__makeCoroutineSkipper()
+            return
+
+        self._invokeAsync = None
+        if self.__throttle is None and self.__debounce is None:
+            self._invoke = call
+        else:
+            # all calls go through the rate limiter, including those of batches:
+            self._invokeBatch = None
+            self.__callNow = call
+            self._invoke = self.__makeRateLimiter()
+
+    def __makeRateLimiter(self) -> Callable[[Mapping[str, Any], Topic, Mapping[str, Any]], None]:
+        """
+        Create the function that enforces the throttle or debounce of this listener, given the same args
+        as __call__(): it calls the wrapped callable now, or records the call to make it later, using
+        monotonic timestamps. At most one deferred call is scheduled at any time.
+        """
+        lock = self.__rateLock
+        throttle = self.__throttle
+        call = self.__callNow
+
+        if throttle is not None:
+            def invoke(kwargs, actualTopic, allKwargs=None):
+                now = monotonic()
+                with lock:
+                    if self.__pendingCall is None and now >= self.__nextCallTime:
+                        self.__nextCallTime = now + throttle
+                        callNow = True
+                    else:
+                        mustSchedule = self.__pendingCall is None
+                        self.__pendingCall = (kwargs, actualTopic, allKwargs)
+                        callNow = False
+                if callNow:
+                    return call(kwargs, actualTopic, allKwargs)
+                if mustSchedule:
+                    self.__schedulePendingCall(self.__nextCallTime - now)
+
+        else:
+            debounce = self.__debounce
+
+            def invoke(kwargs, actualTopic, allKwargs=None):
+                with lock:
+                    self.__lastMsgTime = monotonic()
+                    mustSchedule = self.__pendingCall is None
+                    self.__pendingCall = (kwargs, actualTopic, allKwargs)
+                if mustSchedule:
+                    self.__schedulePendingCall(debounce)
+
+        return invoke
+
+    def __schedulePendingCall(self, delay: float):
+        """Schedule the call of the deferred call in delay seconds, or forget it if no longer subscribed."""
+        scheduleCall = self.__scheduleCall
+        if scheduleCall is None:
+            with self.__rateLock:
+                self.__pendingCall = None
+        else:
+            scheduleCall(self, max(delay, 0.0), self.__makePendingCall)
+
+    def __makePendingCall(self):
+        """Make the deferred call; for a debounced listener, schedule it again if messages were sent since."""
+        with self.__rateLock:
+            pendingCall = self.__pendingCall
+            if pendingCall is None:
+                return
+            now = monotonic()
+            if self.__debounce is not None:
+                remaining = self.__lastMsgTime + self.__debounce - now
+                if remaining > 0:
+                    pendingCall = None
+            else:
+                self.__nextCallTime = now + self.__throttle
+            if pendingCall is not None:
+                self.__pendingCall = None
+
+        if pendingCall is None:
+            self.__schedulePendingCall(remaining)
+        elif self._callable() is not None:
+            self.__callNow(*pendingCall)
+
     def __notifyOnDead(self, _: WeakRef):
         """This gets called when listener weak ref has died. Propagate info to Topic."""
         notifyDeath = self.__onDead
@@ -212,31 +483,141 @@ class Listener:
         if listener is dead. Should always return True (False would require
         the callable_obj be dead but self hasn't yet been notified of it...).
         """
-        if self.acceptsAllKwargs:
-            kwargs = allKwargs or kwargs  # if allKwargs is None then use kwargs
+        self._invoke(kwargs, actualTopic, allKwargs)
+        return True
+
+    def __makeInvoker(self) -> Callable[[Mapping[str, Any], Topic, Mapping[str, Any]], None]:
+        """
+        Create the function that calls the wrapped callable, given the same args as __call__(). If
+        the callable is a coroutine function, the invoker is too: calling it returns an awaitable
+        that awaits the coroutine of the callable.
+        """
+        call = self.__makeCaller()
+        if not self.__isCoroutine:
+            return call
 
-        orig_kwargs = kwargs
+        async def invoke(kwargs, actualTopic, allKwargs=None):
+            await call(kwargs, actualTopic, allKwargs)
 
-        # combine with curried args; Note: this overrides topic arg if present:
-        if self.curriedArgs:
-            if kwargs:
-                kwargs = kwargs.copy()
-                kwargs.update(self.curriedArgs)
-            else:
-                kwargs = self.curriedArgs
+        return invoke
+
+    def __makeCoroutineSkipper(self) -> Callable[[Mapping[str, Any], Topic, Mapping[str, Any]], None]:
+        """
+        Create the function used instead of the invoker of a coroutine listener for messages sent
+        without asyncio (by Publisher.sendMessage(), etc): the listener is not called, and a
+        RuntimeWarning says so.
+        """
+        nameID = self.__nameID
 
-        if self._autoTopicArgName is not None:
-            if kwargs is orig_kwargs:
-                kwargs = kwargs.copy()
-            kwargs[self._autoTopicArgName] = actualTopic
+        def invoke(kwargs, actualTopic, allKwargs=None):
+            warnings.warn('listener "%s" of topic "%s" is a coroutine function: it only gets messages sent by '
+                          'asendMessage()' % (nameID, actualTopic.getName()), RuntimeWarning)
 
-        # call:
-        cb = self._callable()
-        if cb is None:
-            self._calledWhenDead()
-        cb(**kwargs)
+        return invoke
 
-        return True
+    def __makeCaller(self) -> Callable[[Mapping[str, Any], Topic, Mapping[str, Any]], Any]:
+        """
+        Create the function that calls the wrapped callable, given the same args as __call__(), and
+        returns what the callable returns.
+        The function is specialized for this listener's call policies (whether it wants all
+        message data, the topic object, has curried args, and is held strongly) so none of them
+        has to be tested at every call. Must be re-created whenever call policies change.
+        """
+        invokeBatch = self._invokeBatch
+        if invokeBatch is not None:
+            # a message is a batch of one:
+            def invoke(kwargs, actualTopic, allKwargs=None):
+                columns = {name: (value,) for name, value in kwargs.items()}
+                allColumns = None if allKwargs is None else {name: (value,) for name, value in allKwargs.items()}
+                return invokeBatch(columns, 1, actualTopic, allColumns)
+
+            return invoke
+
+        getCallable = self._callable
+        calledWhenDead = self._calledWhenDead
+        acceptsAllKwargs = self.acceptsAllKwargs
+        curriedArgs = self.curriedArgs or {}
+        autoTopicArgName = self._autoTopicArgName
+        # strongly held callable can be called directly, no need to deref and check for death:
+        cb = getCallable() if self.__strong else None
+
+        if not curriedArgs and autoTopicArgName is None:
+            if cb is not None:
+                if acceptsAllKwargs:
+                    def invoke(kwargs, actualTopic, allKwargs=None):
+                        return cb(**(allKwargs or kwargs))  # if allKwargs is None then use kwargs
+                else:
+                    def invoke(kwargs, actualTopic, allKwargs=None):
+                        return cb(**kwargs)
+
+            elif acceptsAllKwargs:
+                def invoke(kwargs, actualTopic, allKwargs=None):
+                    weakCB = getCallable()
+                    if weakCB is None:
+                        calledWhenDead()
+                    return weakCB(**(allKwargs or kwargs))  # if allKwargs is None then use kwargs
+
+            else:
+                def invoke(kwargs, actualTopic, allKwargs=None):
+                    weakCB = getCallable()
+                    if weakCB is None:
+                        calledWhenDead()
+                    return weakCB(**kwargs)
+
+            return invoke
+
+        # combine with curried args and/or topic; Note: these override topic arg if present:
+        if autoTopicArgName is None:
+            def getKwargs(kwargs, actualTopic, allKwargs):
+                if acceptsAllKwargs:
+                    kwargs = allKwargs or kwargs
+                return {**kwargs, **curriedArgs}
+        else:
+            def getKwargs(kwargs, actualTopic, allKwargs):
+                if acceptsAllKwargs:
+                    kwargs = allKwargs or kwargs
+                return {**kwargs, **curriedArgs, autoTopicArgName: actualTopic}
+
+        if cb is not None:
+            def invoke(kwargs, actualTopic, allKwargs=None):
+                return cb(**getKwargs(kwargs, actualTopic, allKwargs))
+        else:
+            def invoke(kwargs, actualTopic, allKwargs=None):
+                weakCB = getCallable()
+                if weakCB is None:
+                    calledWhenDead()
+                return weakCB(**getKwargs(kwargs, actualTopic, allKwargs))
+
+        return invoke
+
+    def __makeBatchInvoker(self) -> Optional[Callable[[Mapping[str, Sequence], int, Topic, Mapping[str, Sequence]], None]]:
+        """
+        Create the function that calls the wrapped callable with a batch of messages: given
+        the message data columns, the number of messages, the topic, and all the message data
+        columns. Returns None if the wrapped callable does not accept batches (no arg=MSG_BATCH).
+        """
+        batchArgName = self._batchArgName
+        if batchArgName is None:
+            return None
+
+        getCallable = self._callable
+        calledWhenDead = self._calledWhenDead
+        acceptsAllKwargs = self.acceptsAllKwargs
+        curriedArgs = self.curriedArgs or {}
+        autoTopicArgName = self._autoTopicArgName
+
+        def invokeBatch(columns, numMsgs, actualTopic, allColumns=None):
+            cb = getCallable()
+            if cb is None:
+                calledWhenDead()
+            if acceptsAllKwargs:
+                columns = allColumns or columns
+            kwargs = {**columns, **curriedArgs, batchArgName: numMsgs}
+            if autoTopicArgName is not None:
+                kwargs[autoTopicArgName] = actualTopic
+            return cb(**kwargs)
+
+        return invokeBatch
 
 
 class ListenerValidator:
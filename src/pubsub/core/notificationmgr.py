@@ -3,7 +3,7 @@
 :license: BSD, see LICENSE_BSD_Simple.txt for details.
 """
 
-from typing import List, Mapping
+from typing import List, Mapping, Callable, Optional, Tuple
 
 from .listener import Listener
 from .topicobj import Topic
@@ -34,6 +34,17 @@ class INotificationHandler:
         """
         raise NotImplementedError
 
+    def notifyUnsubscribeMany(self, unsubscribed: List[Tuple[Listener, Topic]]):
+        """
+        Called instead of notifyUnsubscribe() when many listeners are unsubscribed at once, because
+        topics were deleted (see TopicManager.delTopic() and clearTree()). By default, calls
+        notifyUnsubscribe() for each listener.
+
+        :param unsubscribed: the (pubsub.core.Listener, pubsub.core.Topic) pairs unsubscribed.
+        """
+        for pubListener, topicObj in unsubscribed:
+            self.notifyUnsubscribe(pubListener, topicObj)
+
     def notifyDeadListener(self, pubListener: Listener, topicObj: Topic):
         """
         Called when a listener has been garbage collected.
@@ -75,6 +86,11 @@ class INotificationHandler:
         raise NotImplementedError
 
 
+def _notifyNobody(*args, **kwargs):
+    """Notifier used by NotificationMgr when a type of notification is off"""
+    pass
+
+
 class NotificationMgr:
     """
     Manages notifications for tracing pubsub activity. When pubsub takes a
@@ -106,51 +122,34 @@ class NotificationMgr:
         self.__notifyOnDeadListener = False
 
         self.__handlers = []
-        if notificationHandler is not None:
-            self.addHandler(notificationHandler)
+        self.__sendNotifier = None
+        self.__installNotifiers()
 
         self.__atExitRegistered = False
+        if notificationHandler is not None:
+            self.addHandler(notificationHandler)
 
     def addHandler(self, handler: INotificationHandler):
         if not self.__atExitRegistered:
             self.__registerForAppExit()
         self.__handlers.append(handler)
+        self.__installNotifiers()
 
     def getHandlers(self) -> List[INotificationHandler]:
         return self.__handlers[:]
 
     def clearHandlers(self):
         self.__handlers = []
+        self.__installNotifiers()
 
-    def notifySubscribe(self, *args, **kwargs):
-        if self.__notifyOnSubscribe and self.__handlers:
-            for handler in self.__handlers:
-                handler.notifySubscribe(*args, **kwargs)
-
-    def notifyUnsubscribe(self, *args, **kwargs):
-        if self.__notifyOnUnsubscribe and self.__handlers:
-            for handler in self.__handlers:
-                handler.notifyUnsubscribe(*args, **kwargs)
-
-    def notifySend(self, *args, **kwargs):
-        if self.__notifyOnSend and self.__handlers:
-            for handler in self.__handlers:
-                handler.notifySend(*args, **kwargs)
-
-    def notifyNewTopic(self, *args, **kwargs):
-        if self.__notifyOnNewTopic and self.__handlers:
-            for handler in self.__handlers:
-                handler.notifyNewTopic(*args, **kwargs)
-
-    def notifyDelTopic(self, *args, **kwargs):
-        if self.__notifyOnDelTopic and self.__handlers:
-            for handler in self.__handlers:
-                handler.notifyDelTopic(*args, **kwargs)
-
-    def notifyDeadListener(self, *args, **kwargs):
-        if self.__notifyOnDeadListener and self.__handlers:
-            for handler in self.__handlers:
-                handler.notifyDeadListener(*args, **kwargs)
+    def getSendNotifier(self) -> Optional[Callable[..., None]]:
+        """
+        Get the callable that notifies handlers of sendMessage() activity (same
+        as self.notifySend), or None if there is nothing to notify, ie the
+        sendMessage notification flag is off or no handlers are registered. This
+        allows message sending to use a loop free of notification calls.
+        """
+        return self.__sendNotifier
 
     def getFlagStates(self) -> Mapping[str, bool]:
         """Return state of each notification flag, as a dict."""
@@ -194,6 +193,61 @@ class NotificationMgr:
         if deadListener is not None:
             self.__notifyOnDeadListener = deadListener
 
+        self.__installNotifiers()
+
+    def __installNotifiers(self):
+        """
+        Bind the notifySubscribe(), notifyUnsubscribe(), etc methods of self to either
+        a function that does nothing, if the corresponding flag is off or there are no
+        handlers, or to a function that calls the corresponding method of each handler.
+        Must be called whenever flags or handlers change.
+        """
+        handlers = tuple(self.__handlers)
+
+        def getNotifier(flag: bool, methodName: str) -> Optional[Callable[..., None]]:
+            if not (flag and handlers):
+                return None
+
+            def notify(*args, **kwargs):
+                for handler in handlers:
+                    getattr(handler, methodName)(*args, **kwargs)
+
+            return notify
+
+        self.__sendNotifier = getNotifier(self.__notifyOnSend, 'notifySend')
+        self.notifySend = self.__sendNotifier or _notifyNobody
+        self.notifySubscribe = getNotifier(self.__notifyOnSubscribe, 'notifySubscribe') or _notifyNobody
+        self.notifyUnsubscribe = getNotifier(self.__notifyOnUnsubscribe, 'notifyUnsubscribe') or _notifyNobody
+        self.notifyNewTopic = getNotifier(self.__notifyOnNewTopic, 'notifyNewTopic') or _notifyNobody
+        self.notifyUnsubscribeMany = self.__getBatchNotifier(
+            self.__notifyOnUnsubscribe, handlers, 'notifyUnsubscribeMany') or _notifyNobody
+        self.notifyDelTopic = getNotifier(self.__notifyOnDelTopic, 'notifyDelTopic') or _notifyNobody
+        self.notifyDeadListener = getNotifier(self.__notifyOnDeadListener, 'notifyDeadListener') or _notifyNobody
+
+    @staticmethod
+    def __getBatchNotifier(flag: bool, handlers: Tuple[INotificationHandler, ...],
+                           methodName: str) -> Optional[Callable[..., None]]:
+        """
+        Same as getNotifier() of __installNotifiers() for the notifications of many events at
+        once (notifyUnsubscribeMany(), etc), except that handlers that don't derive from
+        INotificationHandler, and so may not have the method, get the default implementation,
+        which notifies of each event separately.
+        """
+        if not (flag and handlers):
+            return None
+
+        default = getattr(INotificationHandler, methodName)
+
+        def notify(events: list):
+            for handler in handlers:
+                method = getattr(handler, methodName, None)
+                if method is None:
+                    default(handler, events)
+                else:
+                    method(events)
+
+        return notify
+
     def __registerForAppExit(self):
         import atexit
         atexit.register(self.clearHandlers)
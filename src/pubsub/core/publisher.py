@@ -3,20 +3,484 @@
 :license: BSD, see LICENSE_BSD_Simple.txt for details.
 """
 
-from typing import Tuple, List, Sequence, Mapping, Dict, Callable, Any, Optional, Union
+import asyncio
+from collections import deque
+from concurrent.futures import Executor
+from enum import IntEnum
+from queue import Full
+from threading import Lock, Condition, get_ident
+from time import monotonic
+from typing import Tuple, List, Sequence, Mapping, Dict, Callable, Any, Optional, Union, Iterable, Iterator
 
 from .topicmgr import (
     TopicManager,
     TreeConfig
 )
 
-from .listener import IListenerExcHandler, Listener, UserListener
+from .topicobj import Topic, _getMsgDataCheck
+from .topicutils import isTopicPattern
+from .callables import AUTO_TOPIC, getCallableFromPath
+from .topicargspec import MsgDataCheck, MsgData
+from .topicexc import TopicNameError, TopicDefnError
+from .listener import IListenerExcHandler, Listener, UserListener, DispatchMode, CoalesceOption
 from .notificationmgr import INotificationHandler
+from .scheduler import IScheduler
+from .annotations import annotationType
+
+@annotationType
+class Publisher:
+    pass
+
 
 TopicFilter = Callable[[str], bool]
 ListenerFilter = Callable[[Listener], bool]
 
 
+class MessageSender:
+    """
+    Callable that sends messages of one topic, as returned by Publisher.getSender().
+    Calling it is equivalent to calling Publisher.sendMessage() for that topic,
+    except that the topic lookup was done once, when the sender was created, and
+    that message data can also be given positionally, in the order of the topic's
+    message data specification (MDS): required args first, in the order that they
+    were defined, followed by optional args. Example::
+
+        sendPosition = pub.getSender('robot.position')
+        for x, y in path:
+            sendPosition(x, y)
+
+    The sender remains valid until its topic is deleted from the topic tree (see
+    TopicManager.delTopic()); calling it after that raises TopicNameError.
+    """
+
+    def __init__(self, topicObj: Topic):
+        self.__topicObj = topicObj
+        self.__publish = topicObj.publish
+        self.__treeConfig = topicObj._treeConfig
+        self.__argNames = None  # MDS order of message data names, determined on first positional send
+
+    def getTopic(self) -> Topic:
+        """Get the Topic object that this sender sends messages of."""
+        return self.__topicObj
+
+    def __call__(self, *args, **msgData):
+        """
+        Send a message. The positional args, if any, are message data in MDS order;
+        the msgData are given by name. Raises TypeError if too many positional args
+        or if a datum is given both positionally and by name.
+        """
+        if self.__topicObj.isDeleted():
+            raise TopicNameError(self.__topicObj.getName(), 'topic deleted, sender no longer usable')
+        treeConfig = self.__treeConfig
+        if treeConfig.skipUnobservedSends and not self.__topicObj.hasListenersOnPath() \
+                and treeConfig.notificationMgr.getSendNotifier() is None:
+            return
+        if args:
+            argNames = self.__argNames or self.__getArgNames()
+            if len(args) > len(argNames):
+                raise TypeError('topic "%s" has %s message data but %s positional args given'
+                                % (self.__topicObj.getName(), len(argNames), len(args)))
+            for argName, arg in zip(argNames, args):
+                if argName in msgData:
+                    raise TypeError('message data "%s" given both positionally and by name' % argName)
+                msgData[argName] = arg
+
+        self.__publish(**msgData)
+
+    def __getArgNames(self) -> Tuple[str, ...]:
+        """Get the message data names of topic, in MDS order. Raises TopicDefnError if topic has no MDS."""
+        if not self.__topicObj.hasMDS():
+            raise TopicDefnError(self.__topicObj.getNameTuple())
+        required, optional = self.__topicObj.getArgs()
+        self.__argNames = tuple(required) + tuple(optional)
+        return self.__argNames
+
+
+class QueuePolicy(IntEnum):
+    """
+    What a QueuedPublisher does with a message sent while its queue is full: BLOCK waits until
+    drain() makes room (for at most the publisher's block timeout, if any, then raises queue.Full);
+    DROP_OLDEST discards the oldest queued message to make room; DROP_NEWEST discards the message
+    being sent; COALESCE replaces the data of the most recently queued message of the same topic,
+    if there is one, and otherwise discards the oldest queued message.
+    """
+    BLOCK, DROP_OLDEST, DROP_NEWEST, COALESCE = range(4)
+
+
+class QueuedPublisher:
+    """
+    Sends messages from any thread by queuing them, for delivery by the thread that calls drain(),
+    typically the thread that owns the application's event loop. Example::
+
+        queued = pub.QueuedPublisher(pub.getDefaultPublisher(), maxSize=10000, policy=pub.QueuePolicy.DROP_OLDEST)
+
+        # in worker threads:
+        queued.sendMessage('progress', done=n)
+
+        # in main thread, eg when idle:
+        queued.drain(maxTime=0.01)
+
+    Sending only looks up the topic and appends (topic, message data) to the queue under a lock,
+    which is much cheaper than a queue.Queue; drain() takes all the messages it delivers from the
+    queue at once and sends consecutive messages of a same topic with Topic.publishMany().
+    """
+
+    def __init__(self, publisher: Publisher, maxSize: int = None, policy: QueuePolicy = QueuePolicy.BLOCK,
+                 blockTimeout: float = None):
+        """
+        :param publisher: the publisher that delivers the messages
+        :param maxSize: maximum number of messages in the queue; None for no limit
+        :param policy: what to do when a message is sent while the queue is full
+        :param blockTimeout: for the BLOCK policy, maximum number of seconds to wait for room
+            in the queue; None to wait as long as necessary
+        """
+        if maxSize is not None and maxSize < 1:
+            raise ValueError('queue max size must be at least 1 (got %s)' % maxSize)
+        self.__topicMgr = publisher.getTopicMgr()
+        self.__publisher = publisher
+        self.__maxSize = maxSize
+        self.__policy = QueuePolicy(policy)
+        self.__blockTimeout = blockTimeout
+        self.__queue = deque()  # of [topicObj, msgData] entries
+        self.__lastByTopic = {}  # for COALESCE policy: topic -> most recent entry of queue for that topic
+        self.__numDropped = 0
+        self.__lock = Lock()
+        self.__notFull = Condition(self.__lock)
+        self.__drainThreads = set()  # idents of threads in drain(), which can't wait for room
+
+    def getPublisher(self) -> Publisher:
+        """Get the publisher that delivers the messages."""
+        return self.__publisher
+
+    def getPolicy(self) -> Tuple[Optional[int], QueuePolicy]:
+        """Get the (max size, policy) pair given at construction."""
+        return self.__maxSize, self.__policy
+
+    def getNumPending(self) -> int:
+        """Get the number of messages queued, waiting for drain()."""
+        return len(self.__queue)
+
+    def getNumDropped(self) -> int:
+        """Get the number of messages discarded or coalesced because the queue was full."""
+        return self.__numDropped
+
+    def sendMessage(self, topicName: str, **msgData) -> bool:
+        """
+        Queue a message for delivery by the next drain(). This can be called from any thread, including
+        from listeners during a drain(). The message data is checked against the topic's MDS only when
+        delivered. Returns False if the message was discarded because the queue was full (DROP_NEWEST
+        policy), True otherwise. With the BLOCK policy, a message sent from the thread that is in drain()
+        (ie by a listener) while the queue is full raises queue.Full right away, since no room can be made
+        until drain() returns. If the publisher skips unobserved sends (see
+        Publisher.setSkipUnobservedSends()), a message that would not reach any listener is not queued.
+        """
+        if self.__publisher._isSendSkipped(topicName):
+            return True
+        topicObj = self.__topicMgr.getOrCreateTopic(topicName)
+        entry = [topicObj, msgData]
+        with self.__lock:
+            if self.__maxSize is not None and len(self.__queue) >= self.__maxSize:
+                if not self.__makeRoom(entry):
+                    return False
+            self.__queue.append(entry)
+            if self.__policy is QueuePolicy.COALESCE:
+                self.__lastByTopic[topicObj] = entry
+        return True
+
+    def drain(self, maxItems: int = None, maxTime: float = None) -> int:
+        """
+        Deliver queued messages, in the order they were sent, from the calling thread, then the messages
+        of listeners that coalesce messages (see Publisher.flushCoalesced()). Returns the number of queued
+        messages delivered. If a listener raises (and there is no listener exception handler), the
+        messages not yet delivered stay queued, ahead of those sent since.
+
+        :param maxItems: maximum number of messages to deliver; None for all those queued when called
+        :param maxTime: maximum number of seconds to spend delivering; None for no limit. The time
+            is checked before each message, so a slow listener can make drain() exceed it.
+        """
+        ident = get_ident()
+        if ident in self.__drainThreads:
+            # nested in a drain() of the same thread, which will remove ident when done:
+            return self.__drain(maxItems, maxTime)
+        self.__drainThreads.add(ident)
+        try:
+            return self.__drain(maxItems, maxTime)
+        finally:
+            self.__drainThreads.discard(ident)
+
+    def __drain(self, maxItems: Optional[int], maxTime: Optional[float]) -> int:
+        """Deliver queued messages, see drain()."""
+        items = self.__takeItems(maxItems)
+        numItems = len(items)
+        deadline = None if maxTime is None else monotonic() + maxTime
+        pos = 0
+
+        def getRun(topicObj: Topic) -> Iterator[MsgData]:
+            nonlocal pos
+            while pos < numItems:
+                entry = items[pos]
+                if entry[0] is not topicObj or (deadline is not None and monotonic() >= deadline):
+                    return
+                pos += 1
+                yield entry[1]
+
+        try:
+            while pos < numItems and (deadline is None or monotonic() < deadline):
+                topicObj = items[pos][0]
+                topicObj.publishMany(getRun(topicObj))
+        finally:
+            if pos < numItems:
+                with self.__lock:
+                    self.__queue.extendleft(reversed(items[pos:]))
+
+        self.__publisher.flushCoalesced()
+        return pos
+
+    def __makeRoom(self, entry: List[Any]) -> bool:
+        """
+        Apply the policy for queuing entry while the queue is full. Returns True if entry can be
+        appended to the queue, False if it must not (dropped, or coalesced into another entry).
+        Must be called with the lock held.
+        """
+        policy = self.__policy
+        if policy is QueuePolicy.BLOCK:
+            if get_ident() in self.__drainThreads:
+                raise Full('queue of %s messages full, and drain() is in progress in the sending thread'
+                           % self.__maxSize)
+            if not self.__notFull.wait_for(lambda: len(self.__queue) < self.__maxSize, self.__blockTimeout):
+                raise Full('queue of %s messages still full after %s seconds' % (self.__maxSize, self.__blockTimeout))
+            return True
+
+        self.__numDropped += 1
+        if policy is QueuePolicy.DROP_NEWEST:
+            return False
+
+        if policy is QueuePolicy.COALESCE:
+            last = self.__lastByTopic.get(entry[0])
+            if last is not None:
+                last[1] = entry[1]
+                return False
+
+        dropped = self.__queue.popleft()
+        if self.__lastByTopic.get(dropped[0]) is dropped:
+            del self.__lastByTopic[dropped[0]]
+        return True
+
+    def __takeItems(self, maxItems: Optional[int]) -> List[List[Any]]:
+        """Remove the first maxItems entries (all if None) from the queue and return them."""
+        with self.__lock:
+            queue = self.__queue
+            if maxItems is None or maxItems >= len(queue):
+                items = list(queue)
+                queue.clear()
+                self.__lastByTopic.clear()
+            else:
+                items = [queue.popleft() for _ in range(maxItems)]
+                lastByTopic = self.__lastByTopic
+                if lastByTopic:
+                    for entry in items:
+                        if lastByTopic.get(entry[0]) is entry:
+                            del lastByTopic[entry[0]]
+            if items and self.__policy is QueuePolicy.BLOCK:
+                self.__notFull.notify_all()
+        return items
+
+
+class _MessageBuffer:
+    """
+    Base class of MessageIterator and MessageStream: subscribes a listener to a topic that puts the
+    messages in a bounded buffer. The listener is held by weak reference, so it gets unsubscribed
+    when the iterator is closed or garbage collected.
+    """
+
+    _BLOCK_SUPPORTED = True  # whether the BLOCK overflow policy is supported
+
+    def __init__(self, topicObj: Topic, maxSize: int, overflow: Union[QueuePolicy, str], withTopic: bool):
+        if maxSize < 1:
+            raise ValueError('buffer max size must be at least 1 (got %s)' % maxSize)
+        if isinstance(overflow, str):
+            overflow = QueuePolicy[overflow.upper()]
+        overflow = QueuePolicy(overflow)
+        if overflow is QueuePolicy.COALESCE or (overflow is QueuePolicy.BLOCK and not self._BLOCK_SUPPORTED):
+            raise ValueError('overflow policy %s is not supported by %s' % (overflow.name, self.__class__.__name__))
+        if not topicObj.hasMDS():
+            raise TopicDefnError(topicObj.getNameTuple())
+
+        self._topicObj = topicObj
+        self._maxSize = maxSize
+        self._overflow = overflow
+        self._withTopic = withTopic
+        self._buffer = deque()
+        self._numDropped = 0
+        self._closed = False
+        topicObj.subscribe(self._push, strong=False, dispatch=DispatchMode.INLINE, coalesce=False)
+
+    def getTopic(self) -> Topic:
+        """Get the topic whose messages are iterated over."""
+        return self._topicObj
+
+    def getNumPending(self) -> int:
+        """Get the number of messages buffered, not yet iterated over."""
+        return len(self._buffer)
+
+    def getNumDropped(self) -> int:
+        """Get the number of messages discarded because the buffer was full."""
+        return self._numDropped
+
+    def isClosed(self) -> bool:
+        """True if close() was called."""
+        return self._closed
+
+    def close(self):
+        """
+        Unsubscribe from the topic. Iteration stops once the messages already buffered have been
+        iterated over. This is also done when the iterator is garbage collected.
+        """
+        if not self._closed:
+            self._closed = True
+            self._topicObj.unsubscribe(self._push)
+            self._wakeConsumer()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excInfo):
+        self.close()
+
+    def _push(self, msgTopic=AUTO_TOPIC, **msgData):
+        raise NotImplementedError
+
+    def _wakeConsumer(self):
+        raise NotImplementedError
+
+    def _getItem(self, msgTopic: Topic, msgData: MsgData) -> Union[MsgData, Tuple[Topic, MsgData]]:
+        return (msgTopic, msgData) if self._withTopic else msgData
+
+
+class MessageIterator(_MessageBuffer):
+    """
+    Iterator over the messages of a topic (and of its subtopics), for threads that pull messages at
+    their own pace rather than have a listener called by the sender, as returned by Publisher.iterate().
+    Example::
+
+        with pub.iterate('sensors.temp', maxSize=1000) as temperatures:
+            for msgData in temperatures:
+                record(msgData['celsius'])
+
+    Messages are put in a buffer of at most maxSize messages, which are then iterated over in the
+    order they were sent, waiting for messages when the buffer is empty. Iteration stops once the
+    iterator is closed (by any thread) and the buffer is empty.
+    """
+
+    def __init__(self, topicObj: Topic, maxSize: int = 1000, overflow: Union[QueuePolicy, str] = QueuePolicy.DROP_OLDEST,
+                 withTopic: bool = False):
+        self.__changed = Condition(Lock())
+        super().__init__(topicObj, maxSize, overflow, withTopic)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> Union[MsgData, Tuple[Topic, MsgData]]:
+        buffer = self._buffer
+        with self.__changed:
+            while not buffer:
+                if self._closed:
+                    raise StopIteration
+                self.__changed.wait()
+            item = buffer.popleft()
+            if self._overflow is QueuePolicy.BLOCK:
+                self.__changed.notify_all()
+        return item
+
+    def _push(self, msgTopic=AUTO_TOPIC, **msgData):
+        """Listener: buffer the message, applying the overflow policy if the buffer is full."""
+        buffer = self._buffer
+        with self.__changed:
+            if len(buffer) >= self._maxSize:
+                if self._overflow is QueuePolicy.BLOCK:
+                    self.__changed.wait_for(lambda: len(buffer) < self._maxSize or self._closed)
+                    if self._closed:
+                        return
+                else:
+                    self._numDropped += 1
+                    if self._overflow is QueuePolicy.DROP_NEWEST:
+                        return
+                    buffer.popleft()
+            buffer.append(self._getItem(msgTopic, msgData))
+            self.__changed.notify_all()
+
+    def _wakeConsumer(self):
+        with self.__changed:
+            self.__changed.notify_all()
+
+
+class MessageStream(_MessageBuffer):
+    """
+    Asynchronous iterator over the messages of a topic (and of its subtopics), for coroutines that
+    pull messages at their own pace, as returned by Publisher.stream(). Example::
+
+        async def recordTemperatures():
+            with pub.stream('sensors.temp', maxSize=1000, overflow='drop_oldest') as temperatures:
+                async for msgData in temperatures:
+                    await record(msgData['celsius'])
+
+    Messages can be sent from any thread. They are put in a buffer of at most maxSize messages, which
+    are then iterated over in the order they were sent, waiting for messages when the buffer is empty.
+    Iteration stops once the stream is closed and the buffer is empty. Since senders can't wait for
+    a coroutine, the BLOCK overflow policy is not supported.
+    """
+
+    _BLOCK_SUPPORTED = False
+
+    def __init__(self, topicObj: Topic, maxSize: int = 1000, overflow: Union[QueuePolicy, str] = QueuePolicy.DROP_OLDEST,
+                 withTopic: bool = False):
+        self.__loop = asyncio.get_running_loop()
+        self.__loopThread = get_ident()
+        self.__lock = Lock()
+        self.__waiter = None  # future awaited by consumer while buffer empty
+        super().__init__(topicObj, maxSize, overflow, withTopic)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> Union[MsgData, Tuple[Topic, MsgData]]:
+        while True:
+            with self.__lock:
+                if self._buffer:
+                    return self._buffer.popleft()
+                if self._closed:
+                    raise StopAsyncIteration
+                waiter = self.__waiter = self.__loop.create_future()
+            await waiter
+
+    def _push(self, msgTopic=AUTO_TOPIC, **msgData):
+        """Listener: buffer the message, applying the overflow policy if the buffer is full."""
+        buffer = self._buffer
+        with self.__lock:
+            if len(buffer) >= self._maxSize:
+                self._numDropped += 1
+                if self._overflow is QueuePolicy.DROP_NEWEST:
+                    return
+                buffer.popleft()
+            buffer.append(self._getItem(msgTopic, msgData))
+        self._wakeConsumer()
+
+    def _wakeConsumer(self):
+        with self.__lock:
+            waiter = self.__waiter
+            self.__waiter = None
+        if waiter is not None:
+            if get_ident() == self.__loopThread:
+                self.__wake(waiter)
+            else:
+                self.__loop.call_soon_threadsafe(self.__wake, waiter)
+
+    @staticmethod
+    def __wake(waiter: asyncio.Future):
+        if not waiter.done():
+            waiter.set_result(None)
+
+
 class Publisher:
     """
     Represent the class that send messages to listeners of given
@@ -133,7 +597,138 @@ class Publisher:
 
         return oldVal
 
-    def subscribe(self, listener: UserListener, topicName: str, **curriedArgs) -> Listener:
+    def setMsgDataCheck(self, policy: MsgDataCheck, n: int = 1):
+        """
+        Set how the message data given to sendMessage() is checked against the
+        topic's message data specification (MDS), for all topics that do not have
+        their own policy (see Topic.setMsgDataCheck()). The default is
+        MsgDataCheck.ALWAYS. The n is the N of the FIRST_N and SAMPLED policies.
+        Example::
+
+            # check only the first 10 messages of each topic:
+            pub.setMsgDataCheck(pub.MsgDataCheck.FIRST_N, 10)
+
+        Raises ValueError if n not valid for policy.
+        """
+        self.__treeConfig.msgDataCheck = _getMsgDataCheck(policy, n)
+
+    def getMsgDataCheck(self) -> Tuple[MsgDataCheck, int]:
+        """Get the (policy, N) pair given to setMsgDataCheck()."""
+        return self.__treeConfig.msgDataCheck
+
+    def setStrongListenerRefs(self, strong: bool = True) -> bool:
+        """
+        Set whether listeners subscribed without specifying the strong parameter of subscribe()
+        are held by strong or weak (the default) reference. Returns the previous value.
+
+        Holding a listener by strong reference is a little faster and uses less memory, but the
+        listener stays subscribed until explicitly unsubscribed; this is suitable when listeners
+        live as long as the application anyways.
+        """
+        oldVal = self.__treeConfig.strongListenerRefs
+        self.__treeConfig.strongListenerRefs = strong
+        return oldVal
+
+    def setSkipUnobservedSends(self, skip: bool = True) -> bool:
+        """
+        Set whether sending returns right away when the message would not reach any listener,
+        ie when neither the topic nor its parent topics have listeners (see
+        TopicManager.isTopicObserved()). Returns the previous value. This suits applications that
+        send many messages nobody listens to, such as telemetry: such messages then cost one lookup,
+        without creating the topic or checking the message data, unless 'sendMessage' notification
+        is on. So sending the wrong message data to a topic that has no listeners goes unnoticed.
+        This applies to sendMessage(), asendMessage(), sendMessages() and sendBatch(), to the
+        senders of getSender(), and to QueuedPublisher.sendMessage().
+        """
+        oldVal = self.__treeConfig.skipUnobservedSends
+        self.__treeConfig.skipUnobservedSends = skip
+        return oldVal
+
+    def getSkipUnobservedSends(self) -> bool:
+        """Get whether sending skips messages that would not reach any listener."""
+        return self.__treeConfig.skipUnobservedSends
+
+    def _isSendSkipped(self, topicName: str) -> bool:
+        """Return True if a message of given topic must not be sent (see setSkipUnobservedSends())."""
+        treeConfig = self.__treeConfig
+        return treeConfig.skipUnobservedSends and not self.__topicMgr.isTopicObserved(topicName) \
+            and treeConfig.notificationMgr.getSendNotifier() is None
+
+    def hasListenersFor(self, topicName: str) -> bool:
+        """
+        Return True if a message sent for given topic would reach at least one listener, i.e. if
+        the topic or one of its parent topics has listeners, or if a listener is subscribed to a
+        pattern that matches the topic name (which the topic would get if created). The topic is not
+        created. This is as fast as a dictionary lookup in most cases, so senders can call it before
+        building message data that is expensive to produce (see also LazyValue).
+
+        :param topicName: name of topic (dotted or tuple format, or a Topic object)
+        """
+        return self.__topicMgr.isTopicObserved(topicName)
+
+    def setThreadPoolExecutor(self, executor: Executor) -> Optional[Executor]:
+        """
+        Set the executor used to call listeners that have a thread pool dispatch mode (see
+        Topic.setDispatchMode()). Returns the previous one, or None if none was set or created yet.
+        If none is set, a concurrent.futures.ThreadPoolExecutor is created when first needed.
+        Note that the previous executor is not shut down.
+        """
+        with self.__treeConfig.lock:
+            oldVal = self.__treeConfig.threadPoolExecutor
+            self.__treeConfig.threadPoolExecutor = executor
+        return oldVal
+
+    def setProcessPoolExecutor(self, executor: Executor) -> Optional[Executor]:
+        """
+        Set the executor used to call listeners subscribed with the process pool dispatch mode
+        (see DispatchMode.PROCESS_POOL). Returns the previous one, or None if none was set or created
+        yet. If none is set, a concurrent.futures.ProcessPoolExecutor is created when first needed.
+        Note that the previous executor is not shut down.
+        """
+        with self.__treeConfig.lock:
+            oldVal = self.__treeConfig.processPoolExecutor
+            self.__treeConfig.processPoolExecutor = executor
+        return oldVal
+
+    def setScheduler(self, scheduler: IScheduler) -> Optional[IScheduler]:
+        """
+        Set the scheduler used to make the deferred calls of throttled and debounced listeners (see
+        subscribe()); the listeners get called from the thread that the scheduler calls from. Returns
+        the previous one, or None if none was set or created yet. If none is set, a TimerScheduler
+        is created when first needed.
+        """
+        with self.__treeConfig.lock:
+            oldVal = self.__treeConfig.scheduler
+            self.__treeConfig.scheduler = scheduler
+        return oldVal
+
+    def flushCoalesced(self) -> int:
+        """
+        Deliver the messages recorded for listeners that coalesce messages (see Topic.setCoalescing()),
+        from the calling thread. Returns the number of listener calls. This is typically called at every
+        "tick" of the application's event loop, or when idle; QueuedPublisher.drain() also calls it.
+        """
+        treeConfig = self.__treeConfig
+        with treeConfig.lock:
+            topics = list(treeConfig.coalescedTopics)
+            treeConfig.coalescedTopics.clear()
+
+        numCalls = 0
+        for index, topicObj in enumerate(topics):
+            try:
+                numCalls += topicObj._flushCoalesced()
+            except Exception:
+                # the topics not yet flushed must be flushed next time:
+                with treeConfig.lock:
+                    for unflushed in topics[index + 1:]:
+                        treeConfig.coalescedTopics[unflushed] = None
+                raise
+
+        return numCalls
+
+    def subscribe(self, listener: UserListener, topicName: str, *, strong: bool = None,
+                  dispatch: DispatchMode = None, coalesce: CoalesceOption = None,
+                  throttle: float = None, debounce: float = None, **curriedArgs) -> Listener:
         """
         Subscribe listener to named topic. Raises ListenerMismatchError
         if listener isn't compatible with the topic's MDS. Returns
@@ -153,14 +748,57 @@ class Publisher:
         Hence if some_other_topic has a or b as message data, subscription will
         raise a ListenerInadequate error.
 
+        The listener is held by weak reference, so it gets automatically unsubscribed
+        once the application no longer refers to it, unless strong=True is given (or
+        setStrongListenerRefs() was called and strong is not given): then pubsub
+        holds the listener until it is unsubscribed.
+
+        The listener gets called as set by the topic's Topic.setDispatchMode() (by default,
+        in the thread sending the message), unless dispatch is given: eg with
+        dispatch=pub.DispatchMode.THREAD_POOL, it gets called from a thread pool.
+
+        The listener can also be given as the importable path of a function, of the form
+        'module:function' (e.g. 'myapp.stats:computeStats'). The function then gets called
+        from a process pool (dispatch=pub.DispatchMode.PROCESS_POOL), which suits CPU intensive
+        listeners; a function can also be given directly with that dispatch mode.
+
+        The listener gets every message, or only the latest ones, as set by the topic's
+        Topic.setCoalescing(), unless coalesce is given: eg with coalesce=True, messages sent
+        between two calls to flushCoalesced() overwrite each other and the listener gets only the
+        last one (or the last one for each key, if coalesce is a key function of the message data).
+
+        A listener that can't keep up with frequent messages, such as one that redraws a window, can be
+        rate limited: with throttle=0.05, it gets called at most once every 50 ms, with the last message
+        of the interval; with debounce=0.2, it gets called once messages have stopped for 200 ms, with the
+        last message. The calls that get deferred are made by the scheduler (see setScheduler()).
+
+        Note that "strong", "dispatch", "coalesce", "throttle" and "debounce" are therefore not available
+        as curried argument names.
+
+        The topic name can be a pattern, in which '*' stands for any one name and '#' for any number
+        of names: eg with 'sensors.*.temperature', the listener gets the messages of
+        'sensors.kitchen.temperature', 'sensors.garage.temperature', etc, including those of topics
+        created later; with 'orders.#', those of 'orders' and all topics under it. The topics that
+        match are subscribed to when the pattern is subscribed or when they get created (see
+        TopicManager.subscribePattern()), so patterns cost nothing when messages are sent. Returns
+        (None, success) for a pattern.
+
         Note that if 'subscribe' notification is on, the handler's
         'notifySubscribe' method is called after subscription.
         """
+        if isTopicPattern(topicName):
+            success = self.__topicMgr.subscribePattern(listener, topicName, strong=strong, dispatch=dispatch,
+                                                       coalesce=coalesce, throttle=throttle, debounce=debounce,
+                                                       **curriedArgs)
+            return None, success
+
         topicObj = self.__topicMgr.getOrCreateTopic(topicName)
-        subscribedListener, success = topicObj.subscribe(listener, **curriedArgs)
+        subscribedListener, success = topicObj.subscribe(listener, strong=strong, dispatch=dispatch,
+                                                         coalesce=coalesce, throttle=throttle, debounce=debounce,
+                                                         **curriedArgs)
         return subscribedListener, success
 
-    def unsubscribe(self, listener: UserListener, topicName: str):
+    def unsubscribe(self, listener: Union[UserListener, str], topicName: str):
         """
         Unsubscribe from given topic. Returns the pubsub.core.Listener
         instance that was used to wrap listener at subscription
@@ -168,14 +806,22 @@ class Publisher:
 
         Note that if 'unsubscribe' notification is on, the handler's
         notifyUnsubscribe() method will be called after unsubscribing.
+
+        If topicName is a pattern (see subscribe()), the listener is unsubscribed
+        from the pattern, and from the topics it was subscribed to because of the
+        pattern; returns the list of pubsub.core.Listener of those topics.
         """
+        if isTopicPattern(topicName):
+            return self.__topicMgr.unsubscribePattern(listener, topicName)
+
         topicObj = self.__topicMgr.getTopic(topicName)
         unsubdLisnr = topicObj.unsubscribe(listener)
 
         return unsubdLisnr
 
     def unsubAll(self, topicName: str = None, listenerFilter: ListenerFilter = None,
-                 topicFilter: Union[str, TopicFilter] = None) -> List[Listener]:
+                 topicFilter: Union[str, TopicFilter] = None,
+                 listener: Union[UserListener, str] = None) -> List[Listener]:
         """
         Unsubscribe all listeners of a topic.
 
@@ -184,6 +830,8 @@ class Publisher:
             that satisfy listenerFilter(listener: Listener) == True
         :param topicFilter: topic name, or a filter function to apply to topics; in latter case, only
             topics that satisfy topicFilter(topic name) == True will be affected
+        :param listener: if given, unsubscribe only this listener (it can be given by path, see
+            subscribe()); only the topics it is subscribed to are visited, rather than every topic
         :returns: list of all listeners (instances of pub.Listener) that were unsubscribed from the topic tree
 
         Note: this method will generate one 'unsubcribe' notification message
@@ -191,10 +839,27 @@ class Publisher:
         """
         unsubdListeners = []
 
-        if topicName is None:
+        if listener is not None:
+            if isinstance(listener, str):
+                listener = getCallableFromPath(listener)
+            if topicName is None:
+                topics = self.__topicMgr.getTopicsSubscribed(listener)
+            else:
+                topics = [self.__topicMgr.getTopic(topicName)]
+            for topicObj in topics:
+                if topicFilter is None or topicFilter(topicObj.getName()):
+                    if listenerFilter is None:
+                        unsubdLisnr = topicObj.unsubscribe(listener)
+                        if unsubdLisnr is not None:
+                            unsubdListeners.append(unsubdLisnr)
+                    else:
+                        unsubdListeners.extend(topicObj.unsubscribeAllListeners(
+                            lambda lisnr: lisnr == listener and listenerFilter(lisnr)))
+
+        elif topicName is None:
             # unsubscribe all listeners from all topics
             topicsMap = self.__topicMgr._topicsMap
-            for topicName, topicObj in topicsMap.items():
+            for topicName, topicObj in list(topicsMap.items()):
                 if topicFilter is None or topicFilter(topicName):
                     tmp = topicObj.unsubscribeAllListeners(listenerFilter)
                     unsubdListeners.extend(tmp)
@@ -205,12 +870,100 @@ class Publisher:
 
         return unsubdListeners
 
+    def getSender(self, topicName: str) -> MessageSender:
+        """
+        Get a MessageSender for given topic, creating the topic if necessary
+        (as for sendMessage()). Calling the returned sender sends a message of
+        the topic without looking up the topic by name every time, so it is
+        faster than sendMessage() when many messages of a few topics are sent.
+        It also accepts message data positionally, in MDS order.
+        """
+        topicObj = self.__topicMgr.getOrCreateTopic(topicName)
+        return MessageSender(topicObj)
+
+    def iterate(self, topicName: str, maxSize: int = 1000, overflow: Union[QueuePolicy, str] = QueuePolicy.DROP_OLDEST,
+                withTopic: bool = False) -> MessageIterator:
+        """
+        Get an iterator over the messages of a topic (and its subtopics) sent from now on, until the
+        iterator is closed. The messages are buffered until iterated over, so the thread that iterates
+        pulls messages at its own pace instead of slowing down senders. See MessageIterator.
+
+        :param topicName: name of topic (dotted or tuple format); the topic must have an MDS
+        :param maxSize: maximum number of messages buffered
+        :param overflow: what to do with a message sent while the buffer is full (a QueuePolicy or
+            its name, except COALESCE): discard the oldest buffered message (the default) or the new one,
+            or block the sender until there is room
+        :param withTopic: if True, the items are (Topic, message data) pairs instead of message data
+        """
+        topicObj = self.__topicMgr.getOrCreateTopic(topicName)
+        return MessageIterator(topicObj, maxSize, overflow, withTopic)
+
+    def stream(self, topicName: str, maxSize: int = 1000, overflow: Union[QueuePolicy, str] = QueuePolicy.DROP_OLDEST,
+               withTopic: bool = False) -> MessageStream:
+        """
+        Same as iterate() but get an asynchronous iterator, for use in "async for"; must be called
+        from a coroutine, and BLOCK is not a valid overflow policy. See MessageStream.
+        """
+        topicObj = self.__topicMgr.getOrCreateTopic(topicName)
+        return MessageStream(topicObj, maxSize, overflow, withTopic)
+
     def sendMessage(self, topicName: str, **msgData):
         """
-        Send a message.
+        Send a message. Listeners that are coroutine functions are not called, with a
+        RuntimeWarning: their messages must be sent with asendMessage().
+        :param topicName: name of message topic (dotted or tuple format)
+        :param msgData: message data (must satisfy the topic's MDS); values that are LazyValue
+            instances are computed only if a listener gets them
+        """
+        if self.__treeConfig.skipUnobservedSends and self._isSendSkipped(topicName):
+            return
+        self.__topicMgr.getOrCreateTopic(topicName).publish(**msgData)
+
+    async def asendMessage(self, topicName: str, **msgData):
+        """
+        Send a message from asyncio code: same as sendMessage() but listeners that are coroutine
+        functions (async def) get awaited, concurrently (see Topic.apublish() for details). Example::
+
+            async def onOrder(orderID):
+                await storeOrder(orderID)
+
+            pub.subscribe(onOrder, 'orders')
+            ...
+            await pub.asendMessage('orders', orderID=123)
+
         :param topicName: name of message topic (dotted or tuple format)
         :param msgData: message data (must satisfy the topic's MDS)
         """
-        topicMgr = self.getTopicMgr()
-        topicObj = topicMgr.getOrCreateTopic(topicName)
-        topicObj.publish(**msgData)
+        if self._isSendSkipped(topicName):
+            return
+        topicObj = self.getTopicMgr().getOrCreateTopic(topicName)
+        await topicObj.apublish(**msgData)
+
+    def sendMessages(self, topicName: str, msgs: Iterable[MsgData]):
+        """
+        Send a batch of messages of same topic: same as calling sendMessage(topicName, **msgData)
+        for each msgData of msgs, but the topic is looked up only once and the per-message
+        overhead is much smaller (see Topic.publishMany() for details).
+        :param topicName: name of message topic (dotted or tuple format)
+        :param msgs: iterable of message data mappings (each must satisfy the topic's MDS)
+        """
+        if self._isSendSkipped(topicName):
+            return
+        topicObj = self.getTopicMgr().getOrCreateTopic(topicName)
+        topicObj.publishMany(msgs)
+
+    def sendBatch(self, topicName: str, columns: Mapping[str, Sequence[Any]], numMsgs: int = None):
+        """
+        Send a batch of messages given in columnar form: each message data name maps to a sequence
+        having one item per message. Listeners that have a parameter with default value pub.MSG_BATCH
+        get the whole batch in one call, other listeners get one call per message. See
+        Topic.publishBatch() for details.
+        :param topicName: name of message topic (dotted or tuple format)
+        :param columns: mapping of message data name to sequence of values (the names must satisfy
+            the topic's MDS)
+        :param numMsgs: number of messages, only needed if columns is empty
+        """
+        if self._isSendSkipped(topicName):
+            return
+        topicObj = self.getTopicMgr().getOrCreateTopic(topicName)
+        topicObj.publishBatch(columns, numMsgs)
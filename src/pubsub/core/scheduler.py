@@ -0,0 +1,63 @@
+"""
+Schedulers used to call listeners later, such as the trailing call of a throttled
+or debounced listener (see Publisher.subscribe()).
+
+:copyright: Copyright since 2006 by Oliver Schoenborn, all rights reserved.
+:license: BSD, see LICENSE_BSD_Simple.txt for details.
+"""
+
+from asyncio import AbstractEventLoop
+from threading import Timer
+from typing import Callable
+
+__all__ = [
+    'IScheduler',
+    'TimerScheduler',
+    'AsyncioScheduler',
+]
+
+
+class IScheduler:
+    """
+    Interface class for any scheduler given to pub.setScheduler(). A scheduler is called
+    with a delay and a function, from any thread, and must call the function, without
+    arguments, once delay seconds have passed. The function gets called in whatever thread
+    the scheduler calls it from, so GUI applications typically use a scheduler that calls
+    it from the GUI thread. Example for wxPython::
+
+        from pubsub import pub
+
+        class WxScheduler(pub.IScheduler):
+            def __call__(self, delay, func):
+                wx.CallAfter(wx.CallLater, int(delay * 1000), func)
+
+        pub.setScheduler(WxScheduler())
+
+    Any callable that takes the same arguments can be used instead of an IScheduler.
+    """
+
+    def __call__(self, delay: float, func: Callable[[], None]):
+        raise NotImplementedError('%s must override __call__()' % self.__class__)
+
+
+class TimerScheduler(IScheduler):
+    """
+    Calls the functions from timer threads (see threading.Timer). This is the default
+    scheduler. The threads are daemon threads, so they don't prevent the application
+    from exiting.
+    """
+
+    def __call__(self, delay: float, func: Callable[[], None]):
+        timer = Timer(delay, func)
+        timer.daemon = True
+        timer.start()
+
+
+class AsyncioScheduler(IScheduler):
+    """Calls the functions from the thread that runs the given asyncio event loop."""
+
+    def __init__(self, loop: AbstractEventLoop):
+        self.__loop = loop
+
+    def __call__(self, delay: float, func: Callable[[], None]):
+        self.__loop.call_soon_threadsafe(self.__loop.call_later, delay, func)
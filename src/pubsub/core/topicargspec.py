@@ -6,7 +6,9 @@ Definitions related to message data specification.
 """
 
 import weakref
-from typing import Tuple, List, Sequence as Seq, Mapping, Dict, Callable, Any, Optional, Union
+from enum import IntEnum
+from threading import Lock
+from typing import Tuple, List, Sequence as Seq, Mapping, Dict, Callable, Any, Optional, Union, FrozenSet
 
 from .topicutils import stringize, WeakNone
 from .annotations import annotationType
@@ -18,6 +20,69 @@ ArgsDocs = Dict[str, str]
 MsgData = Mapping[str, Any]
 
 
+class MsgDataCheck(IntEnum):
+    """
+    Policy for checking the message data given to sendMessage() against the
+    topic's message data specification (MDS), see Publisher.setMsgDataCheck()
+    and Topic.setMsgDataCheck():
+
+    - ALWAYS: every message is checked (the default);
+    - FIRST_N: only the first N messages of each topic are checked;
+    - SAMPLED: one message out of every N messages of each topic is checked;
+    - OFF: messages are never checked.
+
+    With ALWAYS, the cost of checking a message that has the same data names
+    as a message already checked is only a set lookup. The other policies are
+    for applications that are known to send valid messages (e.g. once tested),
+    such that even that cost should be avoided.
+    """
+    ALWAYS, FIRST_N, SAMPLED, OFF = range(4)
+
+
+class LazyValue:
+    """
+    Message data value that is computed only if a listener gets it. Use it for message data that
+    is expensive to produce, such as a formatted report or a copy of a large structure::
+
+        pub.sendMessage('app.state', state=pub.LazyValue(lambda: copy.deepcopy(appState)))
+
+    When the message is sent, func is called (without arguments) only if at least one listener
+    of the topic or of its parent topics gets that message data; the listeners then get the value
+    returned by func. The value is computed at most once, even if the LazyValue is given to
+    several messages, so a LazyValue should not be reused for data that can change. If no listener
+    gets the message data, func is not called, and listeners never see the LazyValue.
+    """
+
+    __slots__ = ('__func', '__value', '__lock')
+
+    __UNSET = object()
+
+    def __init__(self, func: Callable[[], Any]):
+        self.__func = func
+        self.__value = self.__UNSET
+        self.__lock = Lock()
+
+    def get(self) -> Any:
+        """Get the value, computing it if not done yet."""
+        value = self.__value
+        if value is self.__UNSET:
+            with self.__lock:
+                value = self.__value
+                if value is self.__UNSET:
+                    value = self.__value = self.__func()
+                    self.__func = None
+        return value
+
+    def isComputed(self) -> bool:
+        """Return True if the value has been computed."""
+        return self.__value is not self.__UNSET
+
+    def __repr__(self):
+        if self.isComputed():
+            return 'LazyValue(%r)' % (self.__value,)
+        return 'LazyValue(%r)' % (self.__func,)
+
+
 def verifyArgsDifferent(allArgs, allParentArgs, topicName):
     """
     Verify that allArgs does not contain any of allParentArgs. Raise
@@ -96,8 +161,8 @@ class ArgSpecGiven:
         return self.argsSpecType == ArgSpecGiven.SPEC_GIVEN_ALL
 
     def getOptional(self) -> List[str]:
-        """Get the list of optional arguments"""
-        return tuple(set(self.argsDocs.keys()).difference(self.reqdArgs))
+        """Get the list of optional arguments, in the same order as in argsDocs"""
+        return tuple(arg for arg in self.argsDocs if arg not in self.reqdArgs)
 
     def __str__(self):
         return "%s, %s, %s" % (self.argsDocs, self.reqdArgs, self.argsSpecType)
@@ -158,12 +223,16 @@ class ArgsInfo:
     SPEC_MISSING = 10  # no args given
     SPEC_COMPLETE = 12  # all args, but not confirmed via user spec
 
+    MAX_CHECKED_KEY_SETS = 256  # max number of sets of message data names that check() and filterArgs() remember
+
     def __init__(self, topicNameTuple: Seq[str], specGiven: ArgSpecGiven, parentArgsInfo: ArgsInfo):
         self.topicNameTuple = topicNameTuple
         self.allOptional = ()  # topic message optional arg names
         self.allDocs = {}  # doc for each arg
         self.allRequired = ()  # topic message required arg names
         self.argsSpecType = self.SPEC_MISSING
+        self.__validKeySets = set()  # each item is a frozenset of message data names that passed check()
+        self.__filteredNames = {}  # frozenset of message data names -> names kept by filterArgs()
         self.parentAI = WeakNone()
         if parentArgsInfo is not None:
             self.parentAI = weakref.ref(parentArgsInfo)
@@ -206,14 +275,23 @@ class ArgsInfo:
         for arg, doc in docs.items():
             self.allDocs[arg] = doc
 
-    def check(self, msgData: MsgData):
+    def check(self, msgData: MsgData, keySet: FrozenSet[str] = None):
         """
         Check that the message arguments given satisfy the topic message
         data specification (MDS).
         :param msgData: the topic message data to check for validity
+        :param keySet: frozenset(msgData), if caller already has it
         :raise SenderMissingReqdMsgDataError: if some required args are missing or not known
         :raise SenderUnknownMsgDataError: if some optional args are unknown.
+
+        Only the names of msgData matter, so the names of valid msgData are remembered and
+        a msgData that has the same names as a previously checked one is not checked again.
         """
+        if keySet is None:
+            keySet = frozenset(msgData)
+        if keySet in self.__validKeySets:
+            return
+
         all = set(msgData)
         # check that it has all required args
         needReqd = set(self.allRequired)
@@ -229,6 +307,9 @@ class ArgsInfo:
             raise SenderUnknownMsgDataError(self.topicNameTuple,
                                             list(msgData.keys()), optional - set(self.allOptional))
 
+        if len(self.__validKeySets) < self.MAX_CHECKED_KEY_SETS:
+            self.__validKeySets.add(keySet)
+
     def filterArgs(self, msgData: MsgData) -> MsgData:
         """
         Returns a dict which contains only those items of msgData which are defined for topic.
@@ -241,20 +322,16 @@ class ArgsInfo:
         if len(msgData) == self.numArgs():
             return msgData
 
-        # only keep the keys from msgData that are also in topic's kwargs
-        # method 1: SLOWEST
-        # newKwargs = dict( (k,msgData[k]) for k in self.__msgArgs.allOptional if k in msgData )
-        # newKwargs.update( (k,msgData[k]) for k in self.__msgArgs.allRequired )
-
-        # method 2: FAST:
-        # argNames = self.__msgArgs.getArgs()
-        # newKwargs = dict( (key, val) for (key, val) in msgData.iteritems() if key in argNames )
-
-        # method 3: FASTEST:
-        argNames = set(self.getArgs()).intersection(msgData)
-        newKwargs = dict((k, msgData[k]) for k in argNames)
+        # only keep the keys from msgData that are also in topic's kwargs; which ones
+        # depends only on the keys of msgData, so is remembered for each set of keys
+        keySet = frozenset(msgData)
+        argNames = self.__filteredNames.get(keySet)
+        if argNames is None:
+            argNames = tuple(set(self.getArgs()).intersection(keySet))
+            if len(self.__filteredNames) < self.MAX_CHECKED_KEY_SETS:
+                self.__filteredNames[keySet] = argNames
 
-        return newKwargs
+        return {k: msgData[k] for k in argNames}
 
     def hasSameArgs(self, *argNames: Seq[str]) -> bool:
         """
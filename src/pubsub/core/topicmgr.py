@@ -6,14 +6,20 @@ and removing topics, getting info about a particular topic, etc.
 :license: BSD, see LICENSE_BSD_Simple.txt for details.
 """
 
+from threading import RLock
+from weakref import WeakSet
+from concurrent.futures import Executor, ThreadPoolExecutor, ProcessPoolExecutor
 from typing import Tuple, List, Sequence, Mapping, Dict, Callable, Any, Optional, Union, TextIO
 
-from .callables import getID, UserListener
+from .callables import getID, getCallableFromPath, UserListener
 
 from .topicutils import (
     ALL_TOPICS,
+    WILDCARD_ONE,
+    WILDCARD_ANY,
     tupleize,
     stringize,
+    validatePattern,
 )
 
 from .topicexc import (
@@ -25,12 +31,15 @@ from .topicargspec import (
     ArgSpecGiven,
     topicArgsFromCallable,
     ArgsInfo,
+    MsgDataCheck,
 )
 
 from .topicobj import Topic
-from .listener import IListenerExcHandler
+from .listener import IListenerExcHandler, Listener, DispatchMode, CoalesceOption
+from .weakmethod import getWeakRef, StrongRef
 from .topicdefnprovider import ITopicDefnProvider
 from .notificationmgr import NotificationMgr, INotificationHandler
+from .scheduler import IScheduler, TimerScheduler
 
 # ---------------------------------------------------------
 
@@ -46,10 +55,189 @@ ARGS_SPEC_NONE = ArgSpecGiven.SPEC_GIVEN_NONE
 
 # ---------------------------------------------------------
 
+class _ListenerTopicsIndex:
+    """
+    Reverse index of subscriptions: the topics to which each listener is subscribed,
+    kept up to date by the topics as listeners get un/subscribed or die. Each topic
+    has its own Listener for a given callable; one of them is the key of the callable's
+    entry. A dead Listener does not compare equal to anything, so the entry of each
+    Listener is also kept by identity. Must be modified with the tree lock held.
+    """
+
+    def __init__(self):
+        self.__entries = {}  # key Listener -> [key Listener, {topic: Listener of topic}]
+        self.__entriesByID = {}  # id(Listener) -> entry of the callable it wraps
+
+    def add(self, listener: Listener, topicObj: Topic):
+        """Record that listener, just created by topicObj, is subscribed to it."""
+        entry = self.__entries.get(listener)
+        if entry is None:
+            entry = [listener, {}]
+            self.__entries[listener] = entry
+        entry[1][topicObj] = listener
+        self.__entriesByID[id(listener)] = entry
+
+    def remove(self, listener: Listener, topicObj: Topic):
+        """Record that listener of topicObj is no longer subscribed to it (unsubscribed or dead)."""
+        entry = self.__entriesByID.pop(id(listener), None)
+        if entry is None:
+            return
+        key, topics = entry
+        del topics[topicObj]
+        if key is listener:
+            # the key must not outlive its subscription (a strong one would keep the callable alive)
+            del self.__entries[key]  # found by identity even if key is dead
+            if topics:
+                entry[0] = next(iter(topics.values()))
+                self.__entries[entry[0]] = entry
+
+    def getTopics(self, listener: Union[UserListener, Listener]) -> List[Topic]:
+        """Get the topics to which listener is subscribed."""
+        entry = self.__entries.get(listener)
+        return [] if entry is None else list(entry[1])
+
+
+class _PatternSubscription:
+    """A listener subscribed to a topic name pattern (see TopicManager.subscribePattern())."""
+
+    def __init__(self, pattern: Tuple[str, ...], listener: UserListener, subscribeArgs: Mapping[str, Any],
+                 onDead: Callable[..., None]):
+        self.pattern = pattern
+        if subscribeArgs['strong']:
+            self.listenerRef = StrongRef(listener)
+        else:
+            self.listenerRef = getWeakRef(listener, lambda ref: onDead(self))
+        self.subscribeArgs = subscribeArgs  # keyword args of Topic.subscribe()
+        self.topics = WeakSet()  # topics subscribed to because they match the pattern
+
+
+class _PatternNode:
+    """Node of the trie of topic name patterns: one per pattern prefix."""
+
+    __slots__ = ('children', 'subscriptions', 'isWildcardAny')
+
+    def __init__(self, isWildcardAny: bool = False):
+        self.children = {}  # name or wildcard -> _PatternNode
+        self.subscriptions = []  # of patterns that end at this node
+        self.isWildcardAny = isWildcardAny  # reached via WILDCARD_ANY, so can match more names
+
+
+class _TopicPatterns:
+    """
+    Index of the subscriptions to topic name patterns, as a trie of the pattern names, so the
+    subscriptions that match a topic are found in one walk along the topic's name. Must be used
+    with the tree lock held.
+    """
+
+    def __init__(self):
+        self.__root = _PatternNode()
+        self.__numSubscriptions = 0
+
+    def __bool__(self):
+        return self.__numSubscriptions > 0
+
+    def add(self, subscription: _PatternSubscription):
+        node = self.__root
+        for name in subscription.pattern:
+            child = node.children.get(name)
+            if child is None:
+                child = node.children[name] = _PatternNode(name == WILDCARD_ANY)
+            node = child
+        node.subscriptions.append(subscription)
+        self.__numSubscriptions += 1
+
+    def remove(self, subscription: _PatternSubscription):
+        nodes = [self.__root]
+        for name in subscription.pattern:
+            nodes.append(nodes[-1].children[name])
+        nodes[-1].subscriptions.remove(subscription)
+        self.__numSubscriptions -= 1
+        # prune the nodes no longer used by any pattern:
+        for name, parent, node in reversed(list(zip(subscription.pattern, nodes, nodes[1:]))):
+            if node.children or node.subscriptions:
+                break
+            del parent.children[name]
+
+    def find(self, pattern: Tuple[str, ...], listener: UserListener) -> Optional[_PatternSubscription]:
+        """Get the subscription of listener to pattern, or None if there is none."""
+        node = self.__root
+        for name in pattern:
+            node = node.children.get(name)
+            if node is None:
+                return None
+        for subscription in node.subscriptions:
+            if subscription.listenerRef() == listener:
+                return subscription
+        return None
+
+    def matchesAny(self, nameTuple: Tuple[str, ...]) -> bool:
+        """Return True if a pattern matches the topic name or the name of one of its parent topics."""
+        nodes = self.__closure([self.__root])
+        for name in nameTuple:
+            nextNodes = []
+            for node in nodes:
+                child = node.children.get(name)
+                if child is not None:
+                    nextNodes.append(child)
+                child = node.children.get(WILDCARD_ONE)
+                if child is not None:
+                    nextNodes.append(child)
+                if node.isWildcardAny:
+                    nextNodes.append(node)
+            nodes = self.__closure(nextNodes)
+            if not nodes:
+                return False
+            if any(node.subscriptions for node in nodes):
+                return True
+        return False
+
+    def getMatching(self, nameTuple: Tuple[str, ...]) -> List[_PatternSubscription]:
+        """
+        Get the subscriptions of the patterns that match the topic name but not the name of one
+        of its parent topics: the latter are subscribed to the parent, so they get the messages
+        of the topic anyway.
+        """
+        nodes = self.__closure([self.__root])
+        parentMatches = set()
+        for index, name in enumerate(nameTuple):
+            if index > 0:
+                parentMatches.update(sub for node in nodes for sub in node.subscriptions)
+            nextNodes = []
+            for node in nodes:
+                child = node.children.get(name)
+                if child is not None:
+                    nextNodes.append(child)
+                child = node.children.get(WILDCARD_ONE)
+                if child is not None:
+                    nextNodes.append(child)
+                if node.isWildcardAny:
+                    nextNodes.append(node)
+            if not nextNodes:
+                return []
+            nodes = self.__closure(nextNodes)
+
+        return [sub for node in nodes for sub in node.subscriptions if sub not in parentMatches]
+
+    @staticmethod
+    def __closure(nodes: List[_PatternNode]) -> List[_PatternNode]:
+        """Add to nodes (without duplicates) the nodes reachable without a name, via WILDCARD_ANY."""
+        closure = {}
+        while nodes:
+            node = nodes.pop()
+            if node not in closure:
+                closure[node] = None
+                child = node.children.get(WILDCARD_ANY)
+                if child is not None:
+                    nodes.append(child)
+        return list(closure)
+
+
 class TreeConfig:
     """
     Each topic tree has its own topic manager and configuration,
-    such as notification and exception handling.
+    such as notification and exception handling. The lock is held while the
+    topic tree or the listeners of a topic are being modified, so these can be
+    modified from multiple threads; message sending does not need it.
     """
 
     def __init__(self, notificationHandler: INotificationHandler = None,
@@ -57,6 +245,46 @@ class TreeConfig:
         self.notificationMgr = NotificationMgr(notificationHandler)
         self.listenerExcHandler = listenerExcHandler
         self.raiseOnTopicUnspecified = False
+        self.msgDataCheck = (MsgDataCheck.ALWAYS, 1)  # (policy, N) for topics that don't have their own
+        self.strongListenerRefs = False
+        self.lock = RLock()
+        self.threadPoolExecutor = None  # created on first use, see getThreadPoolExecutor()
+        self.processPoolExecutor = None  # created on first use, see getProcessPoolExecutor()
+        self.coalescedTopics = {}  # topics that have coalesced messages to deliver (values unused)
+        self.scheduler = None  # created on first use, see getScheduler()
+        self.listenerTopics = _ListenerTopicsIndex()
+        self.skipUnobservedSends = False  # see Publisher.setSkipUnobservedSends()
+        self.unobservedNames = {}  # names of topics not created, known to have no listeners (values unused)
+
+    def getThreadPoolExecutor(self) -> Executor:
+        """Get the executor for listeners that have a thread pool dispatch mode, creating it if necessary."""
+        executor = self.threadPoolExecutor
+        if executor is None:
+            with self.lock:
+                if self.threadPoolExecutor is None:
+                    self.threadPoolExecutor = ThreadPoolExecutor(thread_name_prefix='pubsub')
+                executor = self.threadPoolExecutor
+        return executor
+
+    def getScheduler(self) -> IScheduler:
+        """Get the scheduler of deferred listener calls, creating it if necessary."""
+        scheduler = self.scheduler
+        if scheduler is None:
+            with self.lock:
+                if self.scheduler is None:
+                    self.scheduler = TimerScheduler()
+                scheduler = self.scheduler
+        return scheduler
+
+    def getProcessPoolExecutor(self) -> Executor:
+        """Get the executor for listeners that have the process pool dispatch mode, creating it if necessary."""
+        executor = self.processPoolExecutor
+        if executor is None:
+            with self.lock:
+                if self.processPoolExecutor is None:
+                    self.processPoolExecutor = ProcessPoolExecutor()
+                executor = self.processPoolExecutor
+        return executor
 
 
 class TopicManager:
@@ -67,9 +295,18 @@ class TopicManager:
     Note that any method that accepts a topic name can accept it in the
     'dotted' format such as ``'a.b.c.'`` or in tuple format such as
     ``('a', 'b', 'c')``. Any such method will raise a ValueError
-    if name not valid (empty, invalid characters, etc).
+    if name not valid (empty, invalid characters, etc). The fastest
+    is a Topic object of this topic tree (such as returned by getTopic()),
+    which is used as is, without any name lookup, unless it has been deleted
+    (then its name is used); next fastest is a dotted name, which is looked up
+    directly. Topic names are interned, so looking up a name that is
+    itself interned (such as one given as a literal in the source code)
+    compares strings by identity.
     """
 
+    # max number of names of topics not created that isTopicObserved() remembers
+    MAX_UNOBSERVED_NAMES = 10000
+
     # Allowed return values for isTopicSpecified()
     TOPIC_SPEC_NOT_SPECIFIED = 0  # false
     TOPIC_SPEC_ALREADY_CREATED = 1  # all other values equate to "true" but different reason
@@ -86,6 +323,7 @@ class TopicManager:
         self._topicsMap = {}  # registry of all topics
         self.__treeConfig = treeConfig or TreeConfig()
         self.__defnProvider = _MasterTopicDefnProvider(self.__treeConfig)
+        self.__patterns = _TopicPatterns()
 
         # define root of all topics
         assert self.__allTopics is None
@@ -142,11 +380,17 @@ class TopicManager:
         Get the Topic instance for the given topic name. By default, raises
         an TopicNameError exception if a topic with given name doesn't exist. If
         okIfNone=True, returns None instead of raising an exception.
+
+        The name can be in dotted or tuple format, or a Topic object of this topic tree (returned
+        as is). Looking up a dotted name or a Topic object builds no string; a tuple name is first
+        joined into its dotted form.
         """
-        topicNameDotted = stringize(name)
-        # if not name:
-        #    raise TopicNameError(name, 'Empty topic name not allowed')
-        obj = self._topicsMap.get(topicNameDotted, None)
+        if name.__class__ is str:
+            obj = self._topicsMap.get(name, None)
+        elif isinstance(name, Topic) and name._treeConfig is self.__treeConfig and not name.isDeleted():
+            return name
+        else:
+            obj = self._topicsMap.get(stringize(name), None)
         if obj is not None:
             return obj
 
@@ -155,7 +399,7 @@ class TopicManager:
 
         # NOT FOUND! Determine what problem is and raise accordingly:
         # find the closest parent up chain that does exists:
-        parentObj, subtopicNames = self.__getClosestParent(topicNameDotted)
+        parentObj, subtopicNames = self.__getClosestParent(tupleize(name))
         assert subtopicNames
 
         subtopicName = subtopicNames[0]
@@ -172,7 +416,9 @@ class TopicManager:
         functions such as subscribe() use this to obtain the Topic object
         corresponding to a topic name.
 
-        The name can be in dotted or string format (``'a.b.'`` or ``('a','b')``).
+        The name can be in dotted or string format (``'a.b.'`` or ``('a','b')``), or a Topic
+        object of this topic tree. As for getTopic(), only a tuple name is turned into a string
+        to look up the topic.
 
         This method always attempts to return a "complete" topic, i.e. one
         with a Message Data Specification (MDS). So if the topic does not have
@@ -204,31 +450,42 @@ class TopicManager:
         The MDS can also be defined via a call to subscribe(listener, topicName),
         which indirectly calls getOrCreateTopic(topicName, listener).
         """
-        obj = self.getTopic(name, okIfNone=True)
-        if obj:
-            # if object is not sendable but a proto listener was given,
-            # update its specification so that it is sendable
-            if (protoListener is not None) and not obj.hasMDS():
-                allArgsDocs, required = topicArgsFromCallable(protoListener)
-                obj.setMsgArgSpec(allArgsDocs, required)
+        if name.__class__ is str:
+            obj = self._topicsMap.get(name, None)
+        elif isinstance(name, Topic) and name._treeConfig is self.__treeConfig and not name.isDeleted():
+            obj = name
+        else:
+            obj = self.getTopic(name, okIfNone=True)
+        if obj is not None and (protoListener is None or obj.hasMDS()):
             return obj
 
-        # create missing parents
-        nameTuple = tupleize(name)
-        parentObj = self.__createParentTopics(nameTuple)
-
-        # now the final topic object, args from listener if provided
-        desc, specGiven = self.__defnProvider.getDefn(nameTuple)
-        # POLICY: protoListener is used only if no definition available
-        if specGiven is None:
-            if protoListener is None:
-                desc = 'UNDOCUMENTED: created without spec'
-            else:
-                allArgsDocs, required = topicArgsFromCallable(protoListener)
-                specGiven = ArgSpecGiven(allArgsDocs, required)
-                desc = 'UNDOCUMENTED: created from protoListener "%s" in module %s' % getID(protoListener)
-
-        return self.__createTopic(nameTuple, desc, parent=parentObj, specGiven=specGiven)
+        with self.__treeConfig.lock:
+            # check again, another thread may have created topic or its MDS in the meantime:
+            obj = self.getTopic(name, okIfNone=True)
+            if obj:
+                # if object is not sendable but a proto listener was given,
+                # update its specification so that it is sendable
+                if (protoListener is not None) and not obj.hasMDS():
+                    allArgsDocs, required = topicArgsFromCallable(protoListener)
+                    obj.setMsgArgSpec(allArgsDocs, required)
+                return obj
+
+            # create missing parents
+            nameTuple = name if isinstance(name, tuple) else tupleize(name)
+            parentObj = self.__createParentTopics(nameTuple)
+
+            # now the final topic object, args from listener if provided
+            desc, specGiven = self.__defnProvider.getDefn(nameTuple)
+            # POLICY: protoListener is used only if no definition available
+            if specGiven is None:
+                if protoListener is None:
+                    desc = 'UNDOCUMENTED: created without spec'
+                else:
+                    allArgsDocs, required = topicArgsFromCallable(protoListener)
+                    specGiven = ArgSpecGiven(allArgsDocs, required)
+                    desc = 'UNDOCUMENTED: created from protoListener "%s" in module %s' % getID(protoListener)
+
+            return self.__createTopic(nameTuple, desc, parent=parentObj, specGiven=specGiven)
 
     def isTopicInUse(self, name: str) -> bool:
         """
@@ -275,76 +532,257 @@ class TopicManager:
         """
         # find from which parent the topic object should be removed
         dottedName = stringize(name)
-        try:
-            # obj = weakref( self._topicsMap[dottedName] )
-            obj = self._topicsMap[dottedName]
-        except KeyError:
-            return False
+        with self.__treeConfig.lock:
+            try:
+                # obj = weakref( self._topicsMap[dottedName] )
+                obj = self._topicsMap[dottedName]
+            except KeyError:
+                return False
+
+            # assert obj().getName() == dottedName
+            assert obj.getName() == dottedName
+            # notification must be before deletion in case
+            notificationMgr = self.__treeConfig.notificationMgr
+            notificationMgr.notifyDelTopic(dottedName)
+
+            # obj()._undefineSelf_(self._topicsMap)
+            unsubscribed = obj._undefineSelf_(self._topicsMap)
+            # assert obj() is None
+            if unsubscribed:
+                notificationMgr.notifyUnsubscribeMany(unsubscribed)
 
-        # assert obj().getName() == dottedName
-        assert obj.getName() == dottedName
-        # notification must be before deletion in case
-        self.__treeConfig.notificationMgr.notifyDelTopic(dottedName)
+        return True
+
+    def getTopicsUnder(self, name: str = None) -> List[Topic]:
+        """
+        Get the topic of given name and all the topics under it (its subtopics, their subtopics,
+        and so forth), parents before their subtopics; all topics if name is None (except the
+        root of all topics). Returns an empty list if the topic doesn't exist. Only the branch
+        of the topic tree under the topic is visited.
+        """
+        if name is None:
+            topics = list(self.__allTopics.getSubtopics())
+        else:
+            topicObj = self.getTopic(name, okIfNone=True)
+            topics = [] if topicObj is None else [topicObj]
+
+        branch = []
+        while topics:
+            topicObj = topics.pop()
+            branch.append(topicObj)
+            topics.extend(topicObj.getSubtopics())
+        return branch
+
+    def isTopicObserved(self, name: str) -> bool:
+        """
+        Return True if a message of the named topic would reach at least one listener: if the topic or
+        one of its parent topics has listeners, or if the topic doesn't exist yet but would get listeners
+        once created (see subscribePattern()). This does not create the topic. For a topic that exists,
+        this uses the topic's cached dispatch plan (see Topic.hasListenersOnPath()); the names of topics
+        that don't exist and have no listeners are remembered until a listener gets subscribed, so
+        asking again is a single lookup.
+        """
+        if name.__class__ is str:
+            topicObj = self._topicsMap.get(name, None)
+        else:
+            topicObj = self.getTopic(name, okIfNone=True)
+            name = stringize(name)
+        if topicObj is not None:
+            return topicObj.hasListenersOnPath()
 
-        # obj()._undefineSelf_(self._topicsMap)
-        obj._undefineSelf_(self._topicsMap)
-        # assert obj() is None
+        unobservedNames = self.__treeConfig.unobservedNames
+        if name in unobservedNames:
+            return False
+        # must hold the lock so that a subscription can't happen before the name is remembered:
+        with self.__treeConfig.lock:
+            topicObj = self._topicsMap.get(name, None)
+            if topicObj is not None:
+                return topicObj.hasListenersOnPath()
+            nameTuple = tupleize(name)
+            parentObj, numFound = self.__allTopics._getClosestSubtopic(nameTuple)
+            if parentObj.hasListenersOnPath() or (self.__patterns and self.__patterns.matchesAny(nameTuple)):
+                return True
+            if len(unobservedNames) >= self.MAX_UNOBSERVED_NAMES:
+                unobservedNames.clear()
+            unobservedNames[name] = None
+        return False
+
+    def getTopicsMatching(self, pattern: str) -> List[Topic]:
+        """
+        Get the topics whose name matches the given pattern, in which '*' stands for any one name
+        and '#' for any number of names, including none. E.g. 'sensors.*.temperature' matches
+        'sensors.kitchen.temperature' but not 'sensors.temperature', whereas 'orders.#' matches
+        'orders' and every topic under it. Only the branches of the topic tree that can match are
+        visited.
+        """
+        patternTuple = tupleize(pattern)
+        matches = {}  # ordered set
+        visited = set()
+        branch = [(self.__allTopics, 0)]
+        while branch:
+            topicObj, index = branch.pop()
+            if index == len(patternTuple):
+                if topicObj is not self.__allTopics:
+                    matches[topicObj] = None
+                continue
+            if (topicObj, index) in visited:
+                continue
+            visited.add((topicObj, index))
+
+            name = patternTuple[index]
+            if name == WILDCARD_ANY:
+                branch.append((topicObj, index + 1))
+                branch.extend((subtopic, index) for subtopic in topicObj.getSubtopics())
+            elif name == WILDCARD_ONE:
+                branch.extend((subtopic, index + 1) for subtopic in topicObj.getSubtopics())
+            elif topicObj.hasSubtopic(name):
+                branch.append((topicObj.getSubtopic(name), index + 1))
+
+        return list(matches)
+
+    def subscribePattern(self, listener: Union[UserListener, str], pattern: str, *, strong: bool = None,
+                         dispatch: DispatchMode = None, coalesce: CoalesceOption = None, throttle: float = None,
+                         debounce: float = None, **curriedArgs) -> bool:
+        """
+        Subscribe listener to every topic that matches the pattern (see getTopicsMatching()), and to
+        every topic created later that matches it. Patterns are indexed, so matching topics are found
+        once, when the pattern is subscribed or the topic gets created, rather than at every message.
+        A topic whose parent matches the pattern is not subscribed to, since the listener gets the
+        messages of subtopics anyway (so with 'orders.#', the listener is subscribed to 'orders' only).
+        The other parameters are those of Topic.subscribe(), and apply to every topic subscribed to.
+        Returns False if listener was already subscribed to the pattern (then nothing is done).
+
+        :raises ListenerMismatchError: the listener is not compatible with the MDS of a matching topic;
+            if raised while the pattern gets subscribed, the listener is not subscribed to the pattern,
+            whereas if raised when a matching topic gets created, it is raised by the topic creation
+        """
+        patternTuple = tupleize(pattern)
+        validatePattern(patternTuple)
+        if isinstance(listener, str):
+            listener = getCallableFromPath(listener)
+            if dispatch is None:
+                dispatch = DispatchMode.PROCESS_POOL
+        if strong is None:
+            strong = self.__treeConfig.strongListenerRefs
+
+        with self.__treeConfig.lock:
+            if self.__patterns.find(patternTuple, listener) is not None:
+                return False
+
+            subscribeArgs = dict(curriedArgs, strong=strong, dispatch=dispatch, coalesce=coalesce,
+                                 throttle=throttle, debounce=debounce)
+            subscription = _PatternSubscription(patternTuple, listener, subscribeArgs, self.__onDeadPatternListener)
+            self.__treeConfig.unobservedNames.clear()
+            subscribed = set()
+            try:
+                for topicObj in sorted(self.getTopicsMatching(patternTuple), key=lambda t: len(t.getNameTuple())):
+                    parentObj = topicObj.getParent()
+                    while parentObj is not None and parentObj not in subscribed:
+                        parentObj = parentObj.getParent()
+                    if parentObj is None:
+                        subscribed.add(topicObj)
+                        if topicObj.subscribe(listener, **subscribeArgs)[1]:
+                            subscription.topics.add(topicObj)
+            except Exception:
+                for topicObj in subscription.topics:
+                    topicObj.unsubscribe(listener)
+                raise
+            self.__patterns.add(subscription)
 
         return True
 
-    def getTopicsSubscribed(self, listener: UserListener) -> List[Topic]:
+    def unsubscribePattern(self, listener: Union[UserListener, str], pattern: str) -> List[Listener]:
+        """
+        Unsubscribe listener from the pattern (see subscribePattern()), and so from the topics it
+        was subscribed to because of the pattern. Returns the pubsub.core.Listener of each topic
+        unsubscribed from; an empty list if listener was not subscribed to the pattern.
+        """
+        if isinstance(listener, str):
+            listener = getCallableFromPath(listener)
+        with self.__treeConfig.lock:
+            subscription = self.__patterns.find(tupleize(pattern), listener)
+            if subscription is None:
+                return []
+            self.__patterns.remove(subscription)
+            unsubscribed = [topicObj.unsubscribe(listener) for topicObj in list(subscription.topics)]
+        return [pubListener for pubListener in unsubscribed if pubListener is not None]
+
+    def isSubscribedPattern(self, listener: Union[UserListener, str], pattern: str) -> bool:
+        """
+        Return True if listener is subscribed to the given pattern (see subscribePattern()). As for
+        Topic.hasListener(), False is returned for a listener path that does not lead to a callable.
+        """
+        if isinstance(listener, str):
+            try:
+                listener = getCallableFromPath(listener)
+            except ValueError:
+                return False
+        with self.__treeConfig.lock:
+            return self.__patterns.find(tupleize(pattern), listener) is not None
+
+    def __onDeadPatternListener(self, subscription: _PatternSubscription):
+        """The listener of a pattern subscription has been garbage collected."""
+        with self.__treeConfig.lock:
+            self.__patterns.remove(subscription)
+
+    def getTopicsSubscribed(self, listener: Union[UserListener, str]) -> List[Topic]:
         """
         Get the list of Topic objects that have given listener
         subscribed. Note: the listener can also get messages from any
-        sub-topic of returned list.
+        sub-topic of returned list. The listener can be given by path
+        (see Topic.subscribe()). The topics of each listener are indexed
+        as listeners get subscribed, so this does not depend on the number of
+        topics in the topic tree.
         """
-        assocTopics = []
-        for topicObj in self._topicsMap.values():
-            if topicObj.hasListener(listener):
-                assocTopics.append(topicObj)
-        return assocTopics
+        if isinstance(listener, str):
+            listener = getCallableFromPath(listener)
+        with self.__treeConfig.lock:
+            return self.__treeConfig.listenerTopics.getTopics(listener)
 
     def clearTree(self):
-        """Remove every topic from the topic tree"""
-        for topic in list(self.__allTopics.subtopics):
-            self.delTopic(topic.name)
-
-    def __getClosestParent(self, topicNameDotted: str) -> Topic:
+        """
+        Remove every topic from the topic tree (except the root of all topics). Handlers
+        get a notifyDelTopic() call for each root topic, and one notifyUnsubscribeMany()
+        call for all the listeners unsubscribed.
+        """
+        with self.__treeConfig.lock:
+            notificationMgr = self.__treeConfig.notificationMgr
+            unsubscribed = []
+            for topic in list(self.__allTopics.subtopics):
+                notificationMgr.notifyDelTopic(topic.name)
+                unsubscribed.extend(topic._undefineSelf_(None))
+            self._topicsMap.clear()
+            self._topicsMap[self.__allTopics.getName()] = self.__allTopics
+            if unsubscribed:
+                notificationMgr.notifyUnsubscribeMany(unsubscribed)
+
+    def __getClosestParent(self, nameTuple: Tuple[str, ...]) -> Tuple[Topic, List[str]]:
         """
         Returns a pair, (closest parent, tuple path from parent). The
         first item is the closest parent Topic that exists.
         The second one is the list of topic name elements that have to be
         created to create the given topic.
 
-        So if topicNameDotted = A.B.C.D, but only A.B exists (A.B.C and
+        So if nameTuple = (A,B,C,D), but only A.B exists (A.B.C and
         A.B.C.D not created yet), then return is (A.B, ['C','D']).
         Note that if none of the branch exists (not even A), then return
         will be [root topic, ['A',B','C','D']). Note also that if A.B.C
         exists, the return will be (A.B.C, ['D']) regardless of whether
         A.B.C.D exists.
-        """
-        subtopicNames = []
-        headTail = topicNameDotted.rsplit('.', 1)
-        while len(headTail) > 1:
-            parentName = headTail[0]
-            subtopicNames.insert(0, headTail[1])
-            obj = self._topicsMap.get(parentName, None)
-            if obj is not None:
-                return obj, subtopicNames
 
-            headTail = parentName.rsplit('.', 1)
-
-        subtopicNames.insert(0, headTail[0])
-        return self.__allTopics, subtopicNames
+        This is a single walk down the topic tree, from the root.
+        """
+        parentObj, numFound = self.__allTopics._getClosestSubtopic(nameTuple[:-1])
+        return parentObj, list(nameTuple[numFound:])
 
-    def __createParentTopics(self, topicName: str) -> Topic:
+    def __createParentTopics(self, topicName: Tuple[str, ...]) -> Topic:
         """
         This will find which parents need to be created such that
         topicName can be created (but doesn't create given topic),
         and creates them. Returns the parent object.
         """
         assert self.getTopic(topicName, okIfNone=True) is None
-        parentObj, subtopicNames = self.__getClosestParent(stringize(topicName))
+        parentObj, subtopicNames = self.__getClosestParent(topicName)
 
         # will create subtopics of parentObj one by one from subtopicNames
         if parentObj is self.__allTopics:
@@ -393,6 +831,13 @@ class TopicManager:
         self.__treeConfig.notificationMgr.notifyNewTopic(
             newTopicObj, desc, specGiven.reqdArgs, specGiven.argsDocs)
 
+        # subscribe the listeners of the patterns that match it:
+        if self.__patterns and parent is not None:
+            for subscription in self.__patterns.getMatching(newTopicObj.getNameTuple()):
+                listener = subscription.listenerRef()
+                if listener is not None and newTopicObj.subscribe(listener, **subscription.subscribeArgs)[1]:
+                    subscription.topics.add(newTopicObj)
+
         return newTopicObj
 
 
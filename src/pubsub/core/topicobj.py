@@ -6,17 +6,27 @@ Provide the Topic class.
 """
 
 from weakref import ref as weakref
+import asyncio
+from concurrent.futures import Future, wait as waitFutures
+from threading import get_ident
+from collections import OrderedDict
 import sys
+import traceback
 from typing import Tuple, List, Sequence, Mapping, Dict, Callable, Any, Optional, Union, TextIO, MutableMapping, \
-    Iterator, ValuesView
+    Iterator, ValuesView, FrozenSet, Iterable, Awaitable
 
 from .listener import (
     Listener,
+    DispatchMode,
+    CoalesceOption,
+    _callInProcess,
     ListenerValidator,
     CallArgsInfo,
     UserListener,
 )
 
+from .callables import getCallableFromPath
+
 from .topicutils import (
     ALL_TOPICS,
     stringize,
@@ -36,6 +46,8 @@ from .topicargspec import (
     ArgSpecGiven,
     MsgData,
     ArgsDocs,
+    MsgDataCheck,
+    LazyValue,
     topicArgsFromCallable,
     MessageDataSpecError,
     SenderUnknownMsgDataError,
@@ -56,6 +68,17 @@ class TreeConfig:
 
 
 ListenerFilter = Callable[[Listener], bool]
+ListenerInvoker = Tuple[Listener, Callable[[MsgData, Topic, MsgData], None]]
+PooledListenerInvoker = Tuple[Listener, Callable[[MsgData, Topic, MsgData], None], DispatchMode]
+
+
+def _getMsgDataCheck(policy: MsgDataCheck, n: int) -> Tuple[MsgDataCheck, int]:
+    """Get the (policy, n) pair for given message data check policy. Raises ValueError if n is not valid for policy."""
+    policy = MsgDataCheck(policy)
+    minN = 1 if policy is MsgDataCheck.SAMPLED else 0
+    if n < minN:
+        raise ValueError('N of %s message data check must be at least %s (got %s)' % (policy.name, minN, n))
+    return policy, n
 
 
 class Topic:
@@ -66,6 +89,8 @@ class Topic:
     access to subtopics (e.g. A.B is subtopic B of topic A).
     """
 
+    MAX_ARGS_PROJECTIONS = 32  # max number of sets of message data names for which projections are cached
+
     def __init__(self, treeConfig: TreeConfig, nameTuple: Tuple[str, ...], description: str,
                  msgArgsInfo: ArgsInfo, parent: Topic = None):
         """
@@ -87,10 +112,19 @@ class Topic:
                 raise ValueError(msg % 'pub.ALL_TOPICS')
         else:
             validateName(nameTuple)
-        self.__tupleName = nameTuple
+        # interned, so that lookups by name of this topic compare names by identity:
+        self.__tupleName = tuple(sys.intern(name) for name in nameTuple)
+        self.__dottedName = sys.intern('.'.join(nameTuple))
 
-        self.__handlingUncaughtListenerExc = False
+        self.__excHandlingThreads = set()  # idents of threads in which listener exception handler is running
         self._treeConfig = treeConfig
+        self.__msgDataCheck = None  # (policy, N), or None to use the tree's
+        self.__numMsgsForCheck = 0  # messages sent while a policy other than ALWAYS in effect
+        self.__maxAsyncListeners = None  # max number of coroutine listeners awaited concurrently by apublish()
+        self.__dispatchMode = DispatchMode.INLINE
+        self.__threadPoolTimeout = None
+        self.__coalesce = False
+        self.__coalesced = {}  # listener -> {key: (data, msg topic, all data)} of latest messages not yet delivered
 
         self.__validator = None
         # Registered listeners were originally kept in a Python list; however
@@ -106,7 +140,19 @@ class Topic:
         # have that hash, and then iterate over that inner list to find the
         # Listener instance which satisfies Listener == callable, and will return
         # the Listener.
+        # The dict is never modified once assigned: un/subscription replaces it with a modified copy
+        # (while holding the tree's lock), so message sending and other readers can use it as a snapshot
+        # without any copying or locking, even while other threads un/subscribe:
         self.__listeners = dict()
+        # Cached tuple of (depth, topic, (listener, invoker) pairs, arg names, (listener, invoker, wait) triples)
+        # for every topic from root (ALL_TOPICS) to self that has listeners, the triples being for the listeners
+        # dispatched to the thread pool; built on first publish() and reset to None whenever the
+        # listeners or MDS of self or of one of its parent topics change (see __getDispatchPlan()):
+        self.__dispatchPlan = None
+        # LRU cache of frozenset of message data names -> (dispatch plan, the names that each entry of the
+        # dispatch plan gets, or None if it gets all the message data); cleared whenever the dispatch plan
+        # is rebuilt:
+        self.__argsProjections = OrderedDict()
 
         # specification:
         self.__description = None
@@ -152,19 +198,21 @@ class Topic:
         if argsDocs is None:
             raise ValueError('Cannot set listener spec to None')
 
-        if self.__msgArgs is None or not self.__msgArgs.isComplete():
-            try:
-                specGiven = ArgSpecGiven(argsDocs, required)
-                self.__msgArgs = ArgsInfo(self.__tupleName, specGiven,
-                                          self.__parentTopic().__msgArgs)
-            except MessageDataSpecError:
-                # discard the lower part of the stack trace
-                exc = sys.exc_info()[1]
-                raise exc
-            self.__finalize()
+        with self._treeConfig.lock:
+            if self.__msgArgs is None or not self.__msgArgs.isComplete():
+                try:
+                    specGiven = ArgSpecGiven(argsDocs, required)
+                    self.__msgArgs = ArgsInfo(self.__tupleName, specGiven,
+                                              self.__parentTopic().__msgArgs)
+                except MessageDataSpecError:
+                    # discard the lower part of the stack trace
+                    exc = sys.exc_info()[1]
+                    raise exc
+                self.__finalize()
+                self.__invalidateDispatchPlan()
 
-        else:
-            raise RuntimeError('Not allowed to call this: msg spec already set!')
+            else:
+                raise RuntimeError('Not allowed to call this: msg spec already set!')
 
     def getArgs(self) -> Tuple[Sequence[str], Sequence[str]]:
         """
@@ -192,6 +240,21 @@ class Topic:
         """Return true if this topic has a message data specification (MDS)."""
         return self.__validator is not None
 
+    def setMsgDataCheck(self, policy: MsgDataCheck = None, n: int = 1):
+        """
+        Set how the message data of messages of this topic is checked against its
+        MDS (see MsgDataCheck). The n is the N of the FIRST_N and SAMPLED policies.
+        If policy is None, the policy of the publisher is used (see
+        Publisher.setMsgDataCheck()), which is the default. Messages of subtopics
+        are not affected.
+        """
+        self.__msgDataCheck = None if policy is None else _getMsgDataCheck(policy, n)
+        self.__numMsgsForCheck = 0
+
+    def getMsgDataCheck(self) -> Tuple[MsgDataCheck, int]:
+        """Get the (policy, N) pair that determines how messages of this topic are checked against MDS."""
+        return self.__msgDataCheck or self._treeConfig.msgDataCheck
+
     def filterMsgArgs(self, msgData: MsgData, check: bool = False) -> MsgData:
         """Get the MDS docstrings for each of the spedified kwargs."""
         filteredArgs = self.__msgArgs.filterArgs(msgData)
@@ -207,6 +270,14 @@ class Topic:
         """
         return self.__tupleName == (ALL_TOPICS,)
 
+    def isDeleted(self) -> bool:
+        """
+        Returns true if this topic has been deleted from the topic tree (see
+        TopicManager.delTopic()). A deleted topic has no parent, no subtopics
+        and no listeners.
+        """
+        return self.__parentTopic is None and self.__tupleName != (ALL_TOPICS,)
+
     def isRoot(self) -> bool:
         """
         Returns true if this is a "root" topic, false otherwise. A
@@ -221,7 +292,7 @@ class Topic:
 
     def getName(self) -> str:
         """Return dotted form of full topic name"""
-        return stringize(self.__tupleName)
+        return self.__dottedName
 
     def getNameTuple(self) -> Tuple[str, ...]:
         """Return tuple form of full topic name"""
@@ -275,6 +346,23 @@ class Topic:
         """Get a list of Topic instances that are subtopics of self."""
         return self.__subTopics.values()
 
+    def _getClosestSubtopic(self, relNameTuple: Sequence[str]) -> Tuple[Topic, int]:
+        """
+        Walk down the topic tree from self along the names of relNameTuple, as far as the subtopics exist.
+        Returns the last topic reached and the number of names walked: self and 0 if the first name isn't
+        a subtopic of self, the subtopic named by relNameTuple and len(relNameTuple) if it exists.
+        Used by TopicManager, which uses the topic tree as an index of topics by name components.
+        """
+        topicObj = self
+        numFound = 0
+        for name in relNameTuple:
+            child = topicObj.__subTopics.get(name)
+            if child is None:
+                break
+            topicObj = child
+            numFound += 1
+        return topicObj, numFound
+
     def getNumListeners(self) -> int:
         """
         Return number of listeners currently subscribed to topic. This is
@@ -283,8 +371,16 @@ class Topic:
         """
         return len(self.__listeners)
 
-    def hasListener(self, listener: UserListener) -> bool:
-        """Return true if listener is subscribed to this topic."""
+    def hasListener(self, listener: Union[UserListener, str]) -> bool:
+        """
+        Return true if listener is subscribed to this topic. The listener can be given by path (see
+        subscribe()); false is returned for a path that does not lead to a callable.
+        """
+        if isinstance(listener, str):
+            try:
+                listener = getCallableFromPath(listener)
+            except ValueError:
+                return False
         return listener in self.__listeners
 
     def hasListeners(self) -> bool:
@@ -294,6 +390,14 @@ class Topic:
         """
         return bool(self.__listeners)
 
+    def hasListenersOnPath(self) -> bool:
+        """
+        Return true if this topic or one of its parent topics has listeners, ie if messages of
+        this topic reach at least one listener. This uses the cached dispatch plan, so it is as
+        fast as an attribute lookup once the plan is built.
+        """
+        return bool(self.__getDispatchPlan())
+
     def getListeners(self) -> List[Listener]:
         """
         Get a copy of list of listeners subscribed to this topic. Safe to iterate over while listeners
@@ -303,10 +407,11 @@ class Topic:
 
     def getListenersIter(self) -> Iterator[Listener]:
         """
-        Get an iterator over listeners subscribed to this topic. Do not use if listeners can be
-        un/subscribed while iterating.
+        Get an iterator over listeners subscribed to this topic. Listeners un/subscribed while iterating
+        (by same or other thread) do not affect the iteration: it is over the listeners subscribed when
+        this method was called.
         """
-        return self.__listeners.keys()
+        return iter(self.__listeners.keys())
 
     def validate(self, listener: UserListener, curriedArgNames: Sequence[str] = None) -> CallArgsInfo:
         """
@@ -329,56 +434,101 @@ class Topic:
             raise TopicDefnError(self.__tupleName)
         return self.__validator.isValid(listener, curriedArgNames=curriedArgNames)
 
-    def subscribe(self, listener: UserListener, **curriedArgs) -> Tuple[Listener, bool]:
+    def subscribe(self, listener: Union[UserListener, str], *, strong: bool = None, dispatch: DispatchMode = None,
+                  coalesce: CoalesceOption = None, throttle: float = None, debounce: float = None,
+                  **curriedArgs) -> Tuple[Listener, bool]:
         """
-        Subscribe listener to this topic. Returns a pair (pub.Listener, success).
-
+        Subscribe listener to this topic. Returns a pair (pub.Listener, success). The listener can
+        be given as the importable path of a function, 'module:function', in which case it is called
+        from the process pool unless dispatch is given (see DispatchMode.PROCESS_POOL).
+
+        :param strong: if True, the listener is held by strong reference, so it will not be
+            automatically unsubscribed when the application no longer refers to it; if False, by weak
+            reference; if None, as configured for the topic tree (see Publisher.setStrongListenerRefs()).
+            Ignored if the listener was already subscribed.
+        :param dispatch: how the listener should be called; if None, as set by setDispatchMode(). Ignored
+            if the listener was already subscribed. Raises ValueError if the listener is a coroutine function
+            and would be called from the thread pool.
+        :param coalesce: whether the listener gets only the latest messages, when messages are delivered
+            (see setCoalescing()); if None, as set by setCoalescing(). Ignored if the listener was already
+            subscribed. Raises ValueError if the listener is a coroutine function and would coalesce.
+        :param throttle: if given, the listener gets called at most once every throttle seconds; of the
+            messages sent in between, only the last one is delivered, at the end of the interval. Ignored if
+            the listener was already subscribed.
+        :param debounce: if given, the listener gets called only once debounce seconds have passed without
+            a message, with the last message. Ignored if the listener was already subscribed.
         :param curriedArgs: keyword argument to curry the listener arguments at message time; the listener(args) is
             treated essentially as ``listener(**(args - curriedArgs))``. If the listener was already subscribed,
             the pure curried args names (curriendArgs.keys() - _overrides_) must be unchanged.
         :return: True only if listener was not already subscribed; False if it was already subscribed.
         """
-        if listener in self.__listeners:
-            assert self.hasMDS()
-            newSub = False
-            subdLisnr = self.__listeners[listener]
-
-            # subscribe with different curried args; only ok if the keys are the same!
-            if curriedArgs:
-                subdLisnr.setCurriedArgs(**curriedArgs)
-
-        else:
-            newSub = True
-            if self.__validator is None:
-                args, reqd = topicArgsFromCallable(listener, ignoreArgs=curriedArgs)
-                self.setMsgArgSpec(args, reqd)
-                assert self.__validator is not None
-            argsInfo = self.__validator.validate(listener, curriedArgNames=curriedArgs)
-            weakListener = Listener(
-                listener, argsInfo, curriedArgs=curriedArgs, onDead=self.__onDeadListener)
-            self.__listeners[weakListener] = weakListener
-            subdLisnr = weakListener
+        if isinstance(listener, str):
+            listener = getCallableFromPath(listener)
+            if dispatch is None:
+                dispatch = DispatchMode.PROCESS_POOL
+
+        with self._treeConfig.lock:
+            if listener in self.__listeners:
+                assert self.hasMDS()
+                newSub = False
+                subdLisnr = self.__listeners[listener]
+
+                # subscribe with different curried args; only ok if the keys are the same!
+                if curriedArgs:
+                    subdLisnr.setCurriedArgs(**curriedArgs)
+                    self.__invalidateDispatchPlan()  # listener's invoker has changed
+
+            else:
+                newSub = True
+                if self.__validator is None:
+                    args, reqd = topicArgsFromCallable(listener, ignoreArgs=curriedArgs)
+                    self.setMsgArgSpec(args, reqd)
+                    assert self.__validator is not None
+                argsInfo = self.__validator.validate(listener, curriedArgNames=curriedArgs)
+                if coalesce is None:
+                    self.__checkCoalescing(argsInfo.isCoroutine, self.__coalesce)
+                if dispatch is None:
+                    self.__checkDispatchMode(argsInfo.isCoroutine, self.__dispatchMode)
+                if strong is None:
+                    strong = self._treeConfig.strongListenerRefs
+                subdLisnr = Listener(listener, argsInfo, curriedArgs=curriedArgs, onDead=self.__onDeadListener,
+                                     strong=strong, dispatchMode=dispatch, coalesce=coalesce,
+                                     throttle=throttle, debounce=debounce, scheduleCall=self.__scheduleListenerCall)
+                listeners = dict(self.__listeners)
+                listeners[subdLisnr] = subdLisnr
+                self.__listeners = listeners
+                self._treeConfig.listenerTopics.add(subdLisnr, self)
+                self._treeConfig.unobservedNames.clear()
+                self.__invalidateDispatchPlan()
 
         # notify of subscription
         self._treeConfig.notificationMgr.notifySubscribe(subdLisnr, self, newSub)
 
         return subdLisnr, newSub
 
-    def unsubscribe(self, listener: UserListener) -> Listener:
+    def unsubscribe(self, listener: Union[UserListener, str]) -> Listener:
         """
         Unsubscribe the specified listener from this topic. Returns
         the pub.Listener object associated with the listener that was
         unsubscribed, or None if the specified listener was not
         subscribed to this topic.  Note that this method calls
         ``notifyUnsubscribe(listener, self)`` on all registered notification
-        handlers (see pub.addNotificationHandler).
+        handlers (see pub.addNotificationHandler). The listener can be given
+        by path (see subscribe()).
         """
-        unsubdLisnr = self.__listeners.pop(listener, None)
-        if unsubdLisnr is None:
-            return None
-
-        unsubdLisnr._unlinkFromTopic_()
-        assert listener == unsubdLisnr.getCallable()
+        if isinstance(listener, str):
+            listener = getCallableFromPath(listener)
+        with self._treeConfig.lock:
+            if listener not in self.__listeners:
+                return None
+            listeners = dict(self.__listeners)
+            unsubdLisnr = listeners.pop(listener)
+            self.__listeners = listeners
+            self._treeConfig.listenerTopics.remove(unsubdLisnr, self)
+
+            unsubdLisnr._unlinkFromTopic_()
+            assert listener == unsubdLisnr.getCallable()
+            self.__invalidateDispatchPlan()
 
         # notify of unsubscription
         self._treeConfig.notificationMgr.notifyUnsubscribe(unsubdLisnr, self)
@@ -392,19 +542,24 @@ class Topic:
         should be unsubscribed. Returns the list of Listener for listeners
         that were unsubscribed.
         """
-        unsubd = []
-        if filter is None:
-            for listener in self.__listeners:
+        with self._treeConfig.lock:
+            if filter is None:
+                unsubd = list(self.__listeners)
+                self.__listeners = {}
+            else:
+                unsubd = [listener for listener in self.__listeners if filter(listener)]
+                if unsubd:
+                    listeners = dict(self.__listeners)
+                    for listener in unsubd:
+                        del listeners[listener]
+                    self.__listeners = listeners
+
+            listenerTopics = self._treeConfig.listenerTopics
+            for listener in unsubd:
+                listenerTopics.remove(listener, self)
                 listener._unlinkFromTopic_()
-            unsubd = self.__listeners.keys()
-            self.__listeners = {}
-        else:
-            unsubd = []
-            for listener in list(self.__listeners):
-                if filter(listener):
-                    unsubd.append(listener)
-                    listener._unlinkFromTopic_()
-                    del self.__listeners[listener]
+            if unsubd:
+                self.__invalidateDispatchPlan()
 
         # send notification regarding all listeners actually unsubscribed
         notificationMgr = self._treeConfig.notificationMgr
@@ -426,32 +581,218 @@ class Topic:
         sent (presumably, the listener has a way of preventing infinite
         loop).
         """
-        self._treeConfig.notificationMgr.notifySend('pre', self)
+        # None if no send notification needed, so message is sent without any notification calls:
+        notifySend = self._treeConfig.notificationMgr.getSendNotifier()
+        if notifySend is not None:
+            notifySend('pre', self)
+
+        keySet = frozenset(msgData)
+        self.__checkMsgData(msgData, keySet)
+        plan = self.__getDispatchPlan()
+        projections = self.__getArgsProjections(keySet, plan)
+        for value in msgData.values():
+            if value.__class__ is LazyValue:
+                msgData = self.__resolveLazyValues(msgData, plan, projections)
+                break
+        self.__dispatch(msgData, keySet, plan, projections, notifySend)
+
+        if notifySend is not None:
+            notifySend('post', self)
+
+    def publishMany(self, msgs: Iterable[MsgData]):
+        """
+        Send a message for each item of msgs, in order, as though publish(**msgData) were called
+        for each one, but much more efficiently: the message data of each distinct set of names
+        is checked only once per batch (subject to the message data check policy, see
+        setMsgDataCheck()), the dispatch plan and projections of message data are reused
+        between messages, and the 'pre' and 'post' send notifications are generated only once
+        for the whole batch (the 'in' notifications are still generated for every listener
+        call). As for publish(), if a listener raises and there is no listener exception
+        handler, the batch is aborted: the remaining messages are not sent.
+
+        :param msgs: iterable of message data mappings (arg name -> value); can be a generator.
+        """
+        notifySend = self._treeConfig.notificationMgr.getSendNotifier()
+        if notifySend is not None:
+            notifySend('pre', self)
+
+        checkedKeySets = set()
+        plan = self.__getDispatchPlan()
+        projectionsByKeySet = {}
+        for msgData in msgs:
+            keySet = frozenset(msgData)
+            if keySet not in checkedKeySets and self.__checkMsgData(msgData, keySet):
+                checkedKeySets.add(keySet)
+
+            if self.__dispatchPlan is not plan:
+                # a listener caused un/subscription during previous message
+                plan = self.__getDispatchPlan()
+                projectionsByKeySet.clear()
+            projections = projectionsByKeySet.get(keySet)
+            if projections is None:
+                projections = projectionsByKeySet[keySet] = self.__getArgsProjections(keySet, plan)
+
+            for value in msgData.values():
+                if value.__class__ is LazyValue:
+                    msgData = self.__resolveLazyValues(msgData, plan, projections)
+                    break
+            self.__dispatch(msgData, keySet, plan, projections, notifySend)
+
+        if notifySend is not None:
+            notifySend('post', self)
+
+    def publishBatch(self, columns: Mapping[str, Sequence[Any]], numMsgs: int = None):
+        """
+        Send a batch of messages given in columnar form: columns maps each message data name to a
+        sequence (list, tuple, NumPy array, etc) that has one item per message. The names are checked
+        once for the whole batch. Listeners that accept batches (they have a parameter with default
+        value pub.MSG_BATCH) get the whole batch in one call; other listeners get one call per message,
+        in order. Send notifications are as for publishMany().
+
+        :param columns: mapping of message data name to sequence of values, all of same length
+        :param numMsgs: number of messages in batch; only required if columns is empty (no message
+            data), otherwise it is the length of the columns
+        :raises ValueError: if the columns are not all of same length, or not of length numMsgs
+        """
+        lengths = set(len(column) for column in columns.values())
+        if numMsgs is None and not lengths:
+            raise ValueError('number of messages must be given for a batch without message data')
+        if len(lengths) > 1 or (numMsgs is not None and lengths and lengths != {numMsgs}):
+            raise ValueError('columns of a batch must all have same length (got %s)' % sorted(lengths))
+        if numMsgs is None:
+            numMsgs = lengths.pop()
+
+        notifySend = self._treeConfig.notificationMgr.getSendNotifier()
+        if notifySend is not None:
+            notifySend('pre', self)
+
+        keySet = frozenset(columns)
+        self.__checkMsgData(columns, keySet)
+        allRows = []  # rows of message data, created only if needed
+        for topicObj, listeners, argNames, pooled, _ in self.__iterDispatchPlan(keySet, columns):
+            if pooled:
+                listeners += tuple((listener, invoke) for listener, invoke, _ in pooled)
+            self.__sendBatch(columns, numMsgs, topicObj, argNames, listeners, allRows, notifySend)
+
+        if notifySend is not None:
+            notifySend('post', self)
+
+    async def apublish(self, **msgData):
+        """
+        Coroutine version of publish(), for use with asyncio: listeners that are coroutine functions
+        (async def) are awaited concurrently, at most getAsyncConcurrency() at a time, after all other
+        listeners have been called as by publish(). Exceptions raised by listeners, including coroutine
+        ones, are given to the listener exception handler if there is one (see pub.setListenerExcHandler);
+        otherwise the first one propagates once all coroutine listeners are done.
+        """
+        notifySend = self._treeConfig.notificationMgr.getSendNotifier()
+        if notifySend is not None:
+            notifySend('pre', self)
+
+        keySet = frozenset(msgData)
+        self.__checkMsgData(msgData, keySet)
+        awaitables = []
+        for topicObj, listeners, argNames, pooled, msgData in self.__iterDispatchPlan(keySet, msgData):
+            msgDataSubset = msgData if argNames is None else {k: msgData[k] for k in argNames}
+            if pooled:
+                futures = self.__submitToPool(msgData, topicObj, msgDataSubset, pooled, notifySend)
+                if futures:
+                    awaitables.append((None, topicObj, topicObj.__awaitPooled(futures)))
+            for listener, invoke in listeners:
+                if notifySend is not None:
+                    notifySend('in', topicObj, pubListener=listener)
+                if listener.isCoroutine():
+                    awaitables.append((listener, topicObj, listener._invokeAsync(msgDataSubset, self, msgData)))
+                    continue
+                try:
+                    invoke(msgDataSubset, self, msgData)
+                except Exception:
+                    if not self.__handleListenerExc(listener, topicObj):
+                        self.__closeAwaitables(awaitables)
+                        raise
 
-        # check the message data:
-        if self.__validator is not None:
-            self._getListenerSpec().check(msgData)
-        else:
-            assert not self.hasListeners()
+        if awaitables:
+            await self.__awaitListeners(awaitables)
 
-        # get the list of topics from self to root (ALL_TOPICS)
-        topicStack = [self]
-        parent = self.__parentTopic
-        while parent is not None:
-            parent = parent()
-            topicStack.append(parent)
-            parent = parent.__parentTopic  # deref weakref
-
-        # for each topic, send to listeners:
-        msgDataSubset = {}
-        for topicObj in reversed(topicStack):
-            added_args = topicObj.__msgArgs.argsAddedToParent
-            add_to_parent = {k: msgData[k] for k in added_args if k in msgData}
-            msgDataSubset.update(add_to_parent)
-            if topicObj.hasListeners():
-                self.__sendMessage(msgData, topicObj, msgDataSubset)
-
-        self._treeConfig.notificationMgr.notifySend('post', self)
+        if notifySend is not None:
+            notifySend('post', self)
+
+    def setDispatchMode(self, mode: DispatchMode = DispatchMode.INLINE, timeout: float = None):
+        """
+        Set how the listeners of this topic get called when a message is sent (this does not affect the
+        listeners of parent or child topics): inline, in the sending thread (the default), or by the
+        topic tree's thread pool. Listeners subscribed with a dispatch mode use theirs instead.
+
+        In a thread pool mode, exceptions raised by listeners are given to the listener exception handler
+        (see pub.setListenerExcHandler), from the pool thread. With THREAD_POOL there should be such a
+        handler, since the exceptions can't be raised in the sender. With THREAD_POOL_WAIT, the sender
+        waits until the listeners of this topic are done, or timeout seconds have passed (if not None), then
+        raises the first exception not handled. Note that only publish() and apublish() use the pool:
+        publishBatch() calls every listener inline. PROCESS_POOL can only be given at subscription.
+        Coroutine listeners can only be called inline: raises ValueError if the topic has coroutine
+        listeners subscribed without a dispatch mode.
+        """
+        mode = DispatchMode(mode)
+        if mode is DispatchMode.PROCESS_POOL:
+            raise ValueError('the process pool dispatch mode can only be given at subscription')
+        if timeout is not None and timeout < 0:
+            raise ValueError('timeout must be positive (got %s)' % timeout)
+        with self._treeConfig.lock:
+            for listener in self.__listeners:
+                if listener.getDispatchMode() is None:
+                    self.__checkDispatchMode(listener.isCoroutine(), mode)
+            self.__dispatchMode = mode
+            self.__threadPoolTimeout = timeout
+            self.__invalidateDispatchPlan()
+
+    def getDispatchMode(self) -> Tuple[DispatchMode, Optional[float]]:
+        """Get the (mode, timeout) pair given to setDispatchMode()."""
+        return self.__dispatchMode, self.__threadPoolTimeout
+
+    def setCoalescing(self, coalesce: CoalesceOption = True):
+        """
+        Set whether the listeners of this topic get every message or only the latest ones (this does not
+        affect the listeners of parent or child topics). Listeners subscribed with a coalesce value use
+        theirs instead. When coalescing, sending a message only records it for each listener, replacing the
+        message previously recorded for it; the listener gets called with the recorded messages when they
+        are delivered, ie when Publisher.flushCoalesced() is called (typically at every "tick" of the
+        application's event loop, or when idle), which QueuedPublisher.drain() also does.
+
+        :param coalesce: True to deliver only the latest message; a key function, given the message
+            data (mapping of all message data names to values), to deliver the latest message for each
+            key, in the order the keys were first seen (e.g. ``lambda msgData: msgData['robotID']``);
+            False to deliver every message when sent (the default).
+
+        Listeners that coalesce are called from the thread that delivers the messages, whatever their
+        dispatch mode. Note that publishBatch() gives batches directly to listeners that have a
+        pub.MSG_BATCH parameter. Coroutine listeners can't coalesce: raises ValueError if the topic has
+        coroutine listeners subscribed without a coalesce value.
+        """
+        if not (isinstance(coalesce, bool) or callable(coalesce)):
+            raise ValueError('coalesce must be a bool or a key function (got %s)' % type(coalesce).__name__)
+        with self._treeConfig.lock:
+            for listener in self.__listeners:
+                if listener.getCoalescing() is None:
+                    self.__checkCoalescing(listener.isCoroutine(), coalesce)
+            self.__coalesce = coalesce
+            self.__invalidateDispatchPlan()
+
+    def getCoalescing(self) -> CoalesceOption:
+        """Get the value given to setCoalescing()."""
+        return self.__coalesce
+
+    def setAsyncConcurrency(self, maxNum: int = None):
+        """
+        Set the maximum number of coroutine listeners that apublish() awaits at the same time for a
+        message of this topic; None (the default) for no limit.
+        """
+        if maxNum is not None and maxNum < 1:
+            raise ValueError('max number of concurrent listeners must be at least 1 (got %s)' % maxNum)
+        self.__maxAsyncListeners = maxNum
+
+    def getAsyncConcurrency(self) -> Optional[int]:
+        """Get the value set by setAsyncConcurrency()."""
+        return self.__maxAsyncListeners
 
     name = property(getName)
     parent = property(getParent)
@@ -472,31 +813,495 @@ class Topic:
         """Only to be called by pubsub package"""
         return self.__msgArgs
 
-    def __sendMessage(self, allData: MsgData, topicObj: Topic, data: MsgData):
-        # now send message data to each listener for current topic;
-        # use list of listeners rather than iterator, so that if listeners added/removed during
-        # send loop, no runtime exception (performance hit is marginal):
-        for listener in topicObj.getListeners():
+    def __checkMsgData(self, msgData: MsgData, keySet: FrozenSet[str]) -> bool:
+        """
+        Check msgData against topic's MDS if the message data check policy says so. Returns
+        True if the MDS is complete, False otherwise (then the topic can't have listeners).
+        """
+        if self.__validator is None:
+            assert not self.hasListeners()
+            return False
+
+        policy, n = self.__msgDataCheck or self._treeConfig.msgDataCheck
+        if policy is MsgDataCheck.ALWAYS or self.__isMsgDataCheckDue(policy, n):
+            self.__msgArgs.check(msgData, keySet)
+        return True
+
+    def __dispatch(self, msgData: MsgData, keySet: FrozenSet[str], plan: Sequence[Tuple],
+                   projections: Sequence[Optional[Tuple[str, ...]]], notifySend: Optional[Callable[..., None]]):
+        """
+        Send msgData to the listeners of each entry of plan, which must be the current dispatch plan;
+        projections are the corresponding arg names (see __getArgsProjections()). If notifySend
+        is not None, it is called before each listener is called.
+        """
+        currPlan = plan
+        while plan:
+            for (depth, topicObj, listeners, _, pooled), argNames in zip(plan, projections):
+                msgDataSubset = msgData if argNames is None else {k: msgData[k] for k in argNames}
+                if notifySend is None:
+                    self.__sendMessage(msgData, topicObj, msgDataSubset, listeners)
+                else:
+                    self.__sendMessageNotify(msgData, topicObj, msgDataSubset, listeners, notifySend)
+                if pooled:
+                    futures = self.__submitToPool(msgData, topicObj, msgDataSubset, pooled, notifySend)
+                    if futures:
+                        topicObj.__waitPooled(futures)
+
+                if self.__dispatchPlan is not currPlan:
+                    # a listener caused un/subscription: resume below depth with an up-to-date plan
+                    currPlan = self.__getDispatchPlan()
+                    plan = tuple(entry for entry in currPlan if entry[0] > depth)
+                    projections = self.__projectArgs(keySet, plan)
+                    msgData = self.__resolveLazyValues(msgData, plan, projections)
+                    break
+            else:
+                break
+
+    def __isMsgDataCheckDue(self, policy: MsgDataCheck, n: int) -> bool:
+        """Return True if the message being sent must be checked according to policy (other than ALWAYS)."""
+        if policy is MsgDataCheck.OFF:
+            return False
+
+        self.__numMsgsForCheck += 1
+        if policy is MsgDataCheck.FIRST_N:
+            return self.__numMsgsForCheck <= n
+        assert policy is MsgDataCheck.SAMPLED
+        return (self.__numMsgsForCheck - 1) % n == 0
+
+    def __getDispatchPlan(self) -> Tuple[Tuple[int, Topic, Tuple[ListenerInvoker, ...], Tuple[str, ...],
+                                               Tuple[PooledListenerInvoker, ...]], ...]:
+        """
+        Get the dispatch plan for messages of this topic: a tuple of (depth, topic, listeners, arg names,
+        pooled listeners) for each topic, from root (ALL_TOPICS) to self, that has listeners. The listeners
+        are pairs of Listener and the function that calls it (see Listener._invoke), for listeners to call
+        inline; the pooled listeners are the same plus their dispatch mode, for listeners to call from the
+        thread or process pool. The arg names are those of the message data that the topic's listeners should
+        receive. The plan is built from the parent topic's
+        plan and cached until __invalidateDispatchPlan() is called.
+        """
+        plan = self.__dispatchPlan
+        if plan is None:
+            # build while holding the lock so that the plan can't be discarded by another thread before stored:
+            with self._treeConfig.lock:
+                plan = self.__dispatchPlan
+                if plan is None:
+                    parent = self.getParent()
+                    plan = () if parent is None else parent.__getDispatchPlan()
+                    if self.__listeners:
+                        depth = 0 if parent is None else len(self.__tupleName)
+                        listeners, pooled = self.__getInvokers()
+                        plan += ((depth, self, listeners, tuple(self.__msgArgs.getArgs()), pooled),)
+                    self.__dispatchPlan = plan
+                    self.__argsProjections.clear()
+
+        return plan
+
+    def __getInvokers(self) -> Tuple[Tuple[ListenerInvoker, ...], Tuple[PooledListenerInvoker, ...]]:
+        """Get the invokers of listeners of this topic to be called inline and from the thread or process pool."""
+        inline = []
+        pooled = []
+        for listener in self.__listeners:
+            coalesce = listener.getCoalescing()
+            if coalesce is None:
+                coalesce = self.__coalesce
+            if coalesce:
+                inline.append((listener, self.__getCoalescer(listener, None if coalesce is True else coalesce)))
+                continue
+
+            mode = listener.getDispatchMode()
+            if mode is None:
+                mode = self.__dispatchMode
+            if mode is DispatchMode.INLINE:
+                inline.append((listener, listener._invoke))
+            else:
+                pooled.append((listener, listener._invoke, mode))
+        return tuple(inline), tuple(pooled)
+
+    @staticmethod
+    def __checkDispatchMode(isCoroutine: bool, mode: DispatchMode):
+        """Raise ValueError if a listener can't be called as given by mode (coroutine listeners only inline)."""
+        if isCoroutine and mode is not DispatchMode.INLINE:
+            raise ValueError('coroutine listeners can\'t be called from thread pool')
+
+    @staticmethod
+    def __checkCoalescing(isCoroutine: bool, coalesce: CoalesceOption):
+        """Raise ValueError if a listener can't coalesce messages as given by coalesce (coroutine listeners can't)."""
+        if coalesce and isCoroutine:
+            raise ValueError('coroutine listeners can\'t coalesce messages')
+
+    def __getCoalescer(self, listener: Listener, getKey: Optional[Callable[[MsgData], Any]]
+                       ) -> Callable[[MsgData, Topic, MsgData], None]:
+        """
+        Get the function to use instead of listener._invoke for a listener that coalesces messages: it records
+        the message as the latest one for its key (as given by getKey, or a single key if getKey is None).
+        """
+        treeConfig = self._treeConfig
+
+        def coalesce(data: MsgData, msgTopic: Topic, allData: MsgData):
+            key = None if getKey is None else getKey(allData)
+            with treeConfig.lock:
+                latest = self.__coalesced.get(listener)
+                if latest is None:
+                    latest = self.__coalesced[listener] = {}
+                latest[key] = (data, msgTopic, allData)
+                treeConfig.coalescedTopics[self] = None
+
+        return coalesce
+
+    def __scheduleListenerCall(self, listener: Listener, delay: float, call: Callable[[], None]):
+        """
+        Have the topic tree's scheduler call a listener in delay seconds, via call (the trailing call of a
+        throttled or debounced listener); exceptions raised by the listener are given to the listener
+        exception handler (see pub.setListenerExcHandler), from the thread that the scheduler calls from.
+        """
+        def callListener():
             try:
-                self._treeConfig.notificationMgr.notifySend('in', topicObj, pubListener=listener)
-                listener(data, self, allData)
+                call()
+            except Exception:
+                if not self.__handleListenerExc(listener, self):
+                    raise
+
+        self._treeConfig.getScheduler()(delay, callListener)
+
+    def _flushCoalesced(self) -> int:
+        """
+        Call the listeners of this topic that coalesce messages with the latest messages recorded for them
+        (see setCoalescing()), if they are still subscribed. Returns the number of calls. Used by
+        Publisher.flushCoalesced().
+        """
+        with self._treeConfig.lock:
+            coalesced = self.__coalesced
+            self.__coalesced = {}
+
+        listeners = self.__listeners
+        numCalls = 0
+        for listener, latest in coalesced.items():
+            if listener not in listeners:
+                continue
+            for data, msgTopic, allData in latest.values():
+                numCalls += 1
+                try:
+                    listener._invoke(data, msgTopic, allData)
+                except Exception:
+                    if not self.__handleListenerExc(listener, self):
+                        raise
+
+        return numCalls
+
+    def __getArgsProjections(self, keySet: FrozenSet[str], plan: Sequence[Tuple]) -> Tuple[Optional[Tuple[str, ...]], ...]:
+        """
+        Get the projection of the message data names, keySet, onto each entry of plan, ie the names
+        that the listeners of each entry get. Projections are cached for the most recently used sets
+        of names (at most MAX_ARGS_PROJECTIONS). The cache is not locked: each entry records the plan
+        it is for, and entries concurrently moved or evicted by other threads are simply recomputed.
+        """
+        cached = self.__argsProjections.get(keySet)
+        if cached is not None and cached[0] is plan:
+            try:
+                self.__argsProjections.move_to_end(keySet)
+            except KeyError:
+                pass  # evicted by another thread
+            return cached[1]
+
+        projections = self.__projectArgs(keySet, plan)
+        self.__argsProjections[keySet] = (plan, projections)
+        if len(self.__argsProjections) > self.MAX_ARGS_PROJECTIONS:
+            try:
+                self.__argsProjections.popitem(last=False)
+            except KeyError:
+                pass  # emptied by another thread
+
+        return projections
+
+    @staticmethod
+    def __projectArgs(keySet: FrozenSet[str], plan: Sequence[Tuple]) -> Tuple[Optional[Tuple[str, ...]], ...]:
+        """
+        Get the names of keySet that each entry of plan gets: a tuple of names, or None when
+        the entry gets all of keySet (so the message data can be given as is).
+        """
+        projections = []
+        for _, _, _, argNames, _ in plan:
+            names = tuple(name for name in argNames if name in keySet)
+            projections.append(None if len(names) == len(keySet) else names)
+        return tuple(projections)
+
+    @staticmethod
+    def __resolveLazyValues(msgData: MsgData, plan: Sequence[Tuple],
+                            projections: Sequence[Optional[Tuple[str, ...]]]) -> MsgData:
+        """
+        Get msgData with each LazyValue that a listener of plan gets replaced by its value. The
+        listeners of the last entry of plan get all the names that those of other entries get, and
+        listeners that accept **kwargs get all of msgData. The LazyValues that no listener gets are
+        left as is.
+        """
+        if not plan:
+            return msgData
+
+        names = projections[-1]
+        if names is not None:
+            for _, _, listeners, _, pooled in plan:
+                if any(listener.acceptsAllKwargs for listener, *_ in listeners + pooled):
+                    names = None
+                    break
+
+        resolved = None
+        for name in (msgData if names is None else names):
+            value = msgData[name]
+            if value.__class__ is LazyValue:
+                if resolved is None:
+                    resolved = dict(msgData)
+                resolved[name] = value.get()
+        return msgData if resolved is None else resolved
+
+    def __invalidateDispatchPlan(self):
+        """
+        Discard the cached dispatch plan of self and of all subtopics, since each one embeds the plan of
+        its parent. A topic's plan is never built before its parent's, so the discard can stop at any
+        subtopic that has no plan.
+        """
+        topics = [self]
+        while topics:
+            topicObj = topics.pop()
+            if topicObj.__dispatchPlan is not None:
+                topicObj.__dispatchPlan = None
+                topics.extend(topicObj.__subTopics.values())
+
+    def __sendMessage(self, allData: MsgData, topicObj: Topic, data: MsgData, listeners: Sequence[ListenerInvoker]):
+        # now send message data to each listener for current topic; the listeners sequence
+        # is a snapshot, so listeners can be added/removed during send loop:
+        for listener, invoke in listeners:
+            try:
+                invoke(data, self, allData)
+            except Exception:
+                if not self.__handleListenerExc(listener, topicObj):
+                    raise
+
+    def __sendMessageNotify(self, allData: MsgData, topicObj: Topic, data: MsgData,
+                            listeners: Sequence[ListenerInvoker], notifySend: Callable[..., None]):
+        """Same as __sendMessage() but with 'in' send notification before each listener is called."""
+        for listener, invoke in listeners:
+            try:
+                notifySend('in', topicObj, pubListener=listener)
+                invoke(data, self, allData)
+            except Exception:
+                if not self.__handleListenerExc(listener, topicObj):
+                    raise
 
+    def __iterDispatchPlan(self, keySet: FrozenSet[str], msgData: MsgData) -> Iterator[Tuple[
+            Topic, Sequence[ListenerInvoker], Optional[Tuple[str, ...]], Sequence[PooledListenerInvoker], MsgData]]:
+        """
+        Iterate over the current dispatch plan for a message that has keySet message data names, yielding
+        (topic, listeners, arg names, pooled listeners, message data) for each entry. Same as the loop of
+        __dispatch(), including the resolution of LazyValues of msgData and the resumption with an up-to-date
+        plan when a listener causes un/subscription, but at the cost of a generator, so it is used only where
+        that cost is small relative to the send.
+        """
+        plan = currPlan = self.__getDispatchPlan()
+        projections = self.__getArgsProjections(keySet, plan)
+        msgData = self.__resolveLazyValues(msgData, plan, projections)
+        while plan:
+            for (depth, topicObj, listeners, _, pooled), argNames in zip(plan, projections):
+                yield topicObj, listeners, argNames, pooled, msgData
+
+                if self.__dispatchPlan is not currPlan:
+                    # a listener caused un/subscription: resume below depth with an up-to-date plan
+                    currPlan = self.__getDispatchPlan()
+                    plan = tuple(entry for entry in currPlan if entry[0] > depth)
+                    projections = self.__projectArgs(keySet, plan)
+                    msgData = self.__resolveLazyValues(msgData, plan, projections)
+                    break
+            else:
+                break
+
+    async def __awaitListeners(self, awaitables: List[Tuple[Listener, Topic, Awaitable]]):
+        """
+        Await the awaitables of coroutine listeners concurrently, at most getAsyncConcurrency() at a
+        time (those that have no listener are for thread pool listeners, and are not limited). Raises the first exception of a listener that the listener exception handler did not handle.
+        """
+        semaphore = None
+        maxNum = self.__maxAsyncListeners
+        if maxNum is not None and len(awaitables) > maxNum:
+            semaphore = asyncio.Semaphore(maxNum)
+
+        async def awaitListener(listener: Optional[Listener], topicObj: Topic, awaitable: Awaitable):
+            if listener is None:
+                # listeners in thread pool, exceptions already given to handler:
+                await awaitable
+                return
+
+            try:
+                if semaphore is None:
+                    await awaitable
+                else:
+                    async with semaphore:
+                        await awaitable
             except Exception:
-                # if exception handling is on, handle, otherwise re-raise
-                handler = self._treeConfig.listenerExcHandler
-                if handler is None or self.__handlingUncaughtListenerExc:
+                if not self.__handleListenerExc(listener, topicObj):
                     raise
 
-                # try handling the exception so we can continue the send:
+        results = await asyncio.gather(*(awaitListener(*item) for item in awaitables), return_exceptions=True)
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+
+    @staticmethod
+    def __closeAwaitables(awaitables: List[Tuple[Listener, Topic, Awaitable]]):
+        """Close the coroutines of listeners that will not be awaited, so they don't warn of it when discarded."""
+        for _, _, coroutine in awaitables:
+            coroutine.close()
+
+    def __sendBatch(self, allColumns: Mapping[str, Sequence[Any]], numMsgs: int, topicObj: Topic,
+                    argNames: Optional[Tuple[str, ...]], listeners: Sequence[ListenerInvoker],
+                    allRows: List[MsgData], notifySend: Optional[Callable[..., None]]):
+        """
+        Send a batch of messages to the listeners of topicObj: the columns of argNames (all columns if
+        None) to listeners that accept batches, and one message per row of those columns to the other
+        listeners. The allRows is filled with the rows of allColumns the first time rows are needed.
+        """
+        columns = allColumns if argNames is None else {name: allColumns[name] for name in argNames}
+        rows = None
+        for listener, invoke in listeners:
+            if notifySend is not None:
+                notifySend('in', topicObj, pubListener=listener)
+
+            invokeBatch = listener._invokeBatch
+            if invokeBatch is not None:
                 try:
-                    self.__handlingUncaughtListenerExc = True
-                    handler(listener.name(), topicObj)
-                    self.__handlingUncaughtListenerExc = False
+                    invokeBatch(columns, numMsgs, self, allColumns)
                 except Exception:
-                    exc = sys.exc_info()[1]
-                    # print 'exception raised', exc
-                    self.__handlingUncaughtListenerExc = False
-                    raise ExcHandlerError(listener.name(), topicObj, exc)
+                    if not self.__handleListenerExc(listener, topicObj):
+                        raise
+                continue
+
+            if rows is None:
+                if not allRows:
+                    allRows.extend(self.__getBatchRows(allColumns, numMsgs))
+                rows = allRows if argNames is None else self.__getBatchRows(columns, numMsgs)
+            for data, allData in zip(rows, allRows):
+                try:
+                    invoke(data, self, allData)
+                except Exception:
+                    if not self.__handleListenerExc(listener, topicObj):
+                        raise
+
+    @staticmethod
+    def __getBatchRows(columns: Mapping[str, Sequence[Any]], numMsgs: int) -> List[MsgData]:
+        """Get the message data of each message of a batch given in columnar form."""
+        if not columns:
+            return [{} for _ in range(numMsgs)]
+        names = tuple(columns)
+        return [dict(zip(names, values)) for values in zip(*columns.values())]
+
+    def __submitToPool(self, allData: MsgData, topicObj: Topic, data: MsgData,
+                       pooled: Sequence[PooledListenerInvoker], notifySend: Optional[Callable[..., None]]) -> List[Future]:
+        """
+        Submit the calls of pooled listeners of topicObj to the thread pool, and those of process pool
+        listeners to the process pool, all in one submission so the message data is pickled only once.
+        Returns the futures of calls that the sender must wait for.
+        """
+        futures = []
+        inProcess = []
+        for listener, invoke, mode in pooled:
+            if notifySend is not None:
+                notifySend('in', topicObj, pubListener=listener)
+            if mode is DispatchMode.PROCESS_POOL:
+                inProcess.append(listener)
+                continue
+            future = self._treeConfig.getThreadPoolExecutor().submit(
+                self.__callPooled, listener, invoke, topicObj, data, allData)
+            if mode is DispatchMode.THREAD_POOL_WAIT:
+                futures.append(future)
+
+        if inProcess:
+            calls = tuple((listener.getPath(), listener.curriedArgs or None, listener.wantsAllMessageData())
+                          for listener in inProcess)
+            wantsAllData = any(listener.wantsAllMessageData() for listener in inProcess)
+            future = self._treeConfig.getProcessPoolExecutor().submit(
+                _callInProcess, calls, data, allData if wantsAllData else None)
+            future.add_done_callback(lambda done: self.__onProcessCallsDone(done, topicObj, inProcess))
+
+        return futures
+
+    def __callPooled(self, listener: Listener, invoke: Callable[[MsgData, Topic, MsgData], None],
+                     topicObj: Topic, data: MsgData, allData: MsgData):
+        """
+        Call a listener from the thread pool; its exception is raised only if the handler doesn't handle it.
+        The call is skipped if the listener died while queued.
+        """
+        callable_obj = listener.getCallable()  # keeps it alive until called
+        if callable_obj is None:
+            return
+        try:
+            invoke(data, self, allData)
+        except Exception:
+            if not self.__handleListenerExc(listener, topicObj):
+                raise
+
+    def __onProcessCallsDone(self, future: Future, topicObj: Topic, listeners: List[Listener]):
+        """
+        Give the exceptions of listeners called in the process pool (see __submitToPool()) to the listener
+        exception handler, as ListenerProcessError. If the submission itself failed (such as if the message
+        data could not be pickled), each listener is reported as having raised that exception.
+        """
+        listenersByPath = {listener.getPath(): listener for listener in listeners}
+        exc = future.exception()
+        if exc is None:
+            failures = future.result()
+        else:
+            excTraceback = ''.join(traceback.format_exception(type(exc), exc, exc.__traceback__))
+            failures = [(path, excTraceback) for path in listenersByPath]
+
+        for path, excTraceback in failures:
+            listener = listenersByPath[path]
+            try:
+                listener._raiseProcessError(excTraceback)
+            except Exception:
+                if not self.__handleListenerExc(listener, topicObj):
+                    raise
+
+    def __waitPooled(self, futures: List[Future]):
+        """
+        Wait for the futures of calls of this topic's listeners to be done, for at most the
+        thread pool timeout of this topic, then raise the exception of the first one that raised.
+        """
+        done, _ = waitFutures(futures, timeout=self.__threadPoolTimeout)
+        for future in futures:
+            if future in done and future.exception() is not None:
+                raise future.exception()
+
+    async def __awaitPooled(self, futures: List[Future]):
+        """Same as __waitPooled(), but for use in a coroutine."""
+        await asyncio.wait([asyncio.wrap_future(future) for future in futures], timeout=self.__threadPoolTimeout)
+        for future in futures:
+            if future.done() and future.exception() is not None:
+                raise future.exception()
+
+    def __handleListenerExc(self, listener: Listener, topicObj: Topic) -> bool:
+        """
+        Give the exception being raised by listener to the listener exception handler
+        (see pub.setListenerExcHandler). Must be called from an except clause. Returns
+        False if there is no handler (or the handler is being used by the calling thread),
+        in which case the exception should be re-raised so the send is aborted. Raises
+        ExcHandlerError if the handler raised.
+        """
+        # if exception handling is on, handle, otherwise re-raise
+        handler = self._treeConfig.listenerExcHandler
+        threadID = get_ident()
+        if handler is None or threadID in self.__excHandlingThreads:
+            return False
+
+        # try handling the exception so we can continue the send:
+        try:
+            self.__excHandlingThreads.add(threadID)
+            handler(listener.name(), topicObj)
+        except Exception:
+            exc = sys.exc_info()[1]
+            # print 'exception raised', exc
+            raise ExcHandlerError(listener.name(), topicObj, exc)
+        finally:
+            self.__excHandlingThreads.discard(threadID)
+
+        return True
 
     def __finalize(self):
         """
@@ -514,29 +1319,43 @@ class Topic:
         self.__validator = ListenerValidator(required, list(optional))
         assert not self.__listeners
 
-    def _undefineSelf_(self, topicsMap: MutableMapping[str, Topic]):
-        """Called by topic manager when deleting a topic."""
+    def _undefineSelf_(self, topicsMap: Optional[MutableMapping[str, Topic]]) -> List[Tuple[Listener, Topic]]:
+        """
+        Called by topic manager when deleting a topic. The topics of the branch are removed
+        from topicsMap, unless it is None (then the topic manager clears it). Returns the
+        (listener, topic) pairs unsubscribed, for the topic manager to notify.
+        """
         if self.__parentTopic is not None:
             self.__parentTopic().__abandonSubtopic(self.__tupleName[-1])
-        self.__undefineBranch(topicsMap)
+        return self.__undefineBranch(topicsMap)
 
-    def __undefineBranch(self, topicsMap: MutableMapping[str, Topic]):
+    def __undefineBranch(self, topicsMap: Optional[MutableMapping[str, Topic]]) -> List[Tuple[Listener, Topic]]:
         """
-        Unsubscribe all our listeners, remove all subtopics from self,
-        then detach from parent. Parent is not notified, because method
-        assumes it has been called by parent
+        Unsubscribe the listeners of self and of every topic under self, and detach each
+        topic from its parent and subtopics. Parent is not notified, because method
+        assumes it has been called by parent. The branch is visited iteratively, so it
+        can be arbitrarily deep, and without any notification: returns the (listener,
+        topic) pairs unsubscribed.
         """
-        # print 'Remove %s listeners (%s)' % (self.getName(), self.getNumListeners())
-        self.unsubscribeAllListeners()
-        self.__parentTopic = None
+        unsubscribed = []
+        listenerTopics = self._treeConfig.listenerTopics
+        topics = [self]
+        while topics:
+            topicObj = topics.pop()
+            for listener in topicObj.__listeners:
+                listenerTopics.remove(listener, topicObj)
+                listener._unlinkFromTopic_()
+                unsubscribed.append((listener, topicObj))
+            topicObj.__listeners = {}
+            topicObj.__parentTopic = None
+            topicObj.__dispatchPlan = None
 
-        for subName, subObj in self.__subTopics.items():
-            assert isinstance(subObj, Topic)
-            # print 'Unlinking %s from parent' % subObj.getName()
-            subObj.__undefineBranch(topicsMap)
+            topics.extend(topicObj.__subTopics.values())
+            topicObj.__subTopics = {}
+            if topicsMap is not None:
+                del topicsMap[topicObj.__dottedName]
 
-        self.__subTopics = {}
-        del topicsMap[self.getName()]
+        return unsubscribed
 
     def __adoptSubtopic(self, topicObj: Topic):
         """Add topicObj as child topic."""
@@ -551,7 +1370,12 @@ class Topic:
 
     def __onDeadListener(self, listener: Listener):
         """One of our subscribed listeners has died, so remove it and notify"""
-        pubListener = self.__listeners.pop(listener)
+        with self._treeConfig.lock:
+            listeners = dict(self.__listeners)
+            pubListener = listeners.pop(listener)
+            self.__listeners = listeners
+            self._treeConfig.listenerTopics.remove(pubListener, self)
+            self.__invalidateDispatchPlan()
         self._treeConfig.notificationMgr.notifyDeadListener(pubListener, self)
 
     def __str__(self):
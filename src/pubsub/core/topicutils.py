@@ -16,6 +16,9 @@ __all__ = []
 UNDERSCORE = '_'  # topic name can't start with this
 # just want something unlikely to clash with user's topic names
 ALL_TOPICS = 'ALL_TOPICS'
+# wildcards of topic name patterns, matching one name, and any number of names (including none):
+WILDCARD_ONE = '*'
+WILDCARD_ANY = '#'
 
 
 class WeakNone:
@@ -53,14 +56,11 @@ _validNameRE = re.compile(r'[-0-9a-zA-Z]\w*')
 
 def validateName(topicName: str):
     """Raise TopicNameError if nameTuple not valid as topic name."""
-    topicNameTuple = tupleize(topicName)
+    topicNameTuple = topicName if isinstance(topicName, tuple) else tupleize(topicName)
     if not topicNameTuple:
         reason = 'name tuple must have at least one item!'
         raise TopicNameError(None, reason)
 
-    class topic:
-        pass
-
     for subname in topicNameTuple:
         if not subname:
             reason = 'can\'t contain empty string or None'
@@ -80,20 +80,46 @@ def validateName(topicName: str):
             raise TopicNameError(topicNameTuple, reason)
 
 
+def isTopicPattern(topicName: Union[str, Tuple[str, ...]]) -> bool:
+    """
+    Return True if topicName is a topic name pattern, ie has WILDCARD_ONE or WILDCARD_ANY
+    as one of its names, such as 'sensors.*.temperature' or 'orders.#'.
+    """
+    if topicName.__class__ is str:
+        if WILDCARD_ONE not in topicName and WILDCARD_ANY not in topicName:
+            return False
+    elif topicName.__class__ is not tuple:
+        return False
+    nameTuple = tupleize(topicName)
+    return WILDCARD_ONE in nameTuple or WILDCARD_ANY in nameTuple
+
+
+def validatePattern(pattern: Union[str, Tuple[str, ...]]):
+    """Raise TopicNameError if pattern is not valid as topic name pattern (see isTopicPattern())."""
+    patternTuple = tupleize(pattern)
+    names = tuple(name for name in patternTuple if name not in (WILDCARD_ONE, WILDCARD_ANY))
+    if names:
+        validateName(names)
+
+
 def stringize(topicName: Sequence[str]) -> str:
     """
     If topicName is a string, just return it
     as is. If it is a topic definition object (ie an object that has
     'msgDataSpec' as data member), return the dotted name of corresponding
-    topic. Otherwise, assume topicName is a tuple and convert it to to a
-    dotted name i.e. ('a','b','c') => 'a.b.c'. Empty name is not allowed
-    (ValueError). The reverse operation is tupleize(topicName).
+    topic; if it is a Topic, return its name. Otherwise, assume topicName is
+    a tuple and convert it to to a dotted name i.e. ('a','b','c') => 'a.b.c'.
+    Empty name is not allowed (ValueError). The reverse operation is
+    tupleize(topicName).
     """
     if isinstance(topicName, str):
         return topicName
 
-    if hasattr(topicName, "_topicNameStr"):
-        return topicName._topicNameStr
+    if not isinstance(topicName, tuple):
+        if hasattr(topicName, "_topicNameStr"):
+            return topicName._topicNameStr
+        if hasattr(topicName, "getNameTuple"):
+            return topicName.getName()
 
     try:
         name = '.'.join(topicName)
@@ -111,14 +137,16 @@ def tupleize(topicName: str) -> Tuple[str, ...]:
     'a.b.c' => ('a','b','c'). Empty topicName is not allowed (ValueError).
     The reverse operation is stringize(topicNameTuple).
     """
-    # assume name is most often str; if more often tuple,
-    # then better use isinstance(name, tuple)
-    if hasattr(topicName, "msgDataSpec"):
-        topicName = topicName._topicNameStr
     if isinstance(topicName, str):
         topicTuple = tuple(topicName.split('.'))
+    elif isinstance(topicName, tuple):
+        topicTuple = topicName
+    elif hasattr(topicName, "msgDataSpec"):
+        topicTuple = tuple(topicName._topicNameStr.split('.'))
+    elif hasattr(topicName, "getNameTuple"):
+        topicTuple = topicName.getNameTuple()
     else:
-        topicTuple = tuple(topicName)  # assume already tuple of strings
+        topicTuple = tuple(topicName)  # assume sequence of strings
 
     if not topicTuple:
         raise TopicNameError(topicTuple, "Topic name can't be empty!")
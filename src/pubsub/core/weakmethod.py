@@ -5,6 +5,7 @@ Prior to pypubsub 4.0, WeakMethod was a custom class that adhered to the WeakRef
 
 Use the getWeakRef(object) module function to create the
 proper type of weak reference (weakref.WeakRef or WeakMethod) for given object.
+The StrongRef class has the same call API but holds its object strongly.
 
 :copyright: Copyright since 2006 by Oliver Schoenborn, all rights reserved.
 :license: BSD, see LICENSE_BSD_Simple.txt for details.
@@ -23,6 +24,22 @@ except:
 from typing import Tuple, List, Sequence, Mapping, Dict, Callable, Any, Optional, Union, TextIO
 
 
+class StrongRef:
+    """
+    Pretend to be a weak reference but hold a strong reference, so the
+    referenced object never dies while the StrongRef exists. Used for
+    listeners subscribed with strong=True.
+    """
+
+    __slots__ = ('__obj',)
+
+    def __init__(self, obj):
+        self.__obj = obj
+
+    def __call__(self):
+        return self.__obj
+
+
 WeakObjOrMethod = Union[WeakMethod, WeakRef]
 
 DeadRefObserver = Callable[[WeakObjOrMethod], None]
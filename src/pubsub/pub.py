@@ -19,8 +19,8 @@ Note that this module creates a "default" instance of
 pubsub.core.Publisher and binds several local functions to some of its methods
 and those of the pubsub.core.TopicManager instance that it contains. However, an
 application may create as many independent instances of Publisher as
-required (for instance, one in each thread; with a custom queue to mediate
-message transfer between threads).
+required (for instance, one in each thread). To send messages from other
+threads than the one that delivers them, see QueuedPublisher.
 """
 
 """
@@ -32,12 +32,18 @@ VERSION_API = 4  #: major API version
 
 VERSION_SVN = "$Rev: 243 $".split()[1]  # DO NOT CHANGE: automatically updated by VCS
 
-from typing import List
+from typing import List, Tuple, Union
 
 from .core import (
     Publisher,
+    MessageSender,
+    QueuedPublisher,
+    QueuePolicy,
+    MessageIterator,
+    MessageStream,
 
     AUTO_TOPIC,
+    MSG_BATCH,
 
     ListenerMismatchError,
     TopicDefnError,
@@ -50,10 +56,18 @@ from .core import (
     UnrecognizedSourceFormatError,
     SenderUnknownMsgDataError,
     SenderMissingReqdMsgDataError,
+    MsgDataCheck,
+    LazyValue,
+    DispatchMode,
+    ListenerProcessError,
+    IScheduler,
+    TimerScheduler,
+    AsyncioScheduler,
 
     TopicManager,
     ALL_TOPICS,
     Topic,
+    isTopicPattern,
 
     MessageDataSpecError,
     exportTopicTreeSpec,
@@ -72,11 +86,13 @@ __all__ = [
     'unsubscribe',
     'unsubAll',
     'isSubscribed',
+    'setStrongListenerRefs',
 
     'isValid',
     'validate',
     'ListenerMismatchError',
     'AUTO_TOPIC',
+    'MSG_BATCH',
 
     'IListenerExcHandler',
     'getListenerExcHandler',
@@ -112,6 +128,33 @@ __all__ = [
     # publisher stuff:
 
     'sendMessage',
+    'asendMessage',
+    'sendMessages',
+    'sendBatch',
+    'getSender',
+    'MessageSender',
+    'QueuedPublisher',
+    'QueuePolicy',
+    'iterate',
+    'stream',
+    'MessageIterator',
+    'MessageStream',
+    'setMsgDataCheck',
+    'getMsgDataCheck',
+    'MsgDataCheck',
+    'setSkipUnobservedSends',
+    'getSkipUnobservedSends',
+    'hasListenersFor',
+    'LazyValue',
+    'setThreadPoolExecutor',
+    'flushCoalesced',
+    'setScheduler',
+    'IScheduler',
+    'TimerScheduler',
+    'AsyncioScheduler',
+    'setProcessPoolExecutor',
+    'DispatchMode',
+    'ListenerProcessError',
 
     # misc:
 
@@ -131,7 +174,12 @@ _publisher = Publisher()
 subscribe = _publisher.subscribe
 unsubscribe = _publisher.unsubscribe
 unsubAll = _publisher.unsubAll
+setStrongListenerRefs = _publisher.setStrongListenerRefs
 sendMessage = _publisher.sendMessage
+asendMessage = _publisher.asendMessage
+sendMessages = _publisher.sendMessages
+sendBatch = _publisher.sendBatch
+getSender = _publisher.getSender
 
 getListenerExcHandler = _publisher.getListenerExcHandler
 setListenerExcHandler = _publisher.setListenerExcHandler
@@ -142,6 +190,17 @@ setNotificationFlags = _publisher.setNotificationFlags
 getNotificationFlags = _publisher.getNotificationFlags
 
 setTopicUnspecifiedFatal = _publisher.setTopicUnspecifiedFatal
+setMsgDataCheck = _publisher.setMsgDataCheck
+getMsgDataCheck = _publisher.getMsgDataCheck
+setSkipUnobservedSends = _publisher.setSkipUnobservedSends
+getSkipUnobservedSends = _publisher.getSkipUnobservedSends
+hasListenersFor = _publisher.hasListenersFor
+setThreadPoolExecutor = _publisher.setThreadPoolExecutor
+flushCoalesced = _publisher.flushCoalesced
+iterate = _publisher.iterate
+stream = _publisher.stream
+setScheduler = _publisher.setScheduler
+setProcessPoolExecutor = _publisher.setProcessPoolExecutor
 
 
 def getDefaultPublisher() -> Publisher:
@@ -184,8 +243,11 @@ def isSubscribed(listener, topicName) -> bool:
     Returns true if listener has subscribed to topicName, false otherwise.
     WARNING: a false return is not a guarantee that listener won't get
     messages of topicName: it could receive messages of a subtopic of
-    topicName.
+    topicName. If topicName is a pattern (see subscribe()), returns true
+    if listener has subscribed to the pattern.
     """
+    if isTopicPattern(topicName):
+        return _topicMgr.isSubscribedPattern(listener, topicName)
     return _topicMgr.getTopic(topicName).hasListener(listener)
 
 
@@ -208,13 +270,14 @@ clearTopicDefnProviders  = _topicMgr.clearDefnProviders
 getNumTopicDefnProviders = _topicMgr.getNumDefnProviders
 
 
-def instantiateAllDefinedTopics(provider) -> List[Topic]:
+def instantiateAllDefinedTopics(provider) -> List[Union[str, Tuple[str, ...]]]:
     """
     Loop over all topics of given provider and "instantiate" each topic, thus
     forcing a parse of the topics documentation, message data specification (MDS),
     comparison with parent MDS, and MDS documentation. Without this function call,
     an error among any of those characteristics will manifest only if the a
-    listener is registered on it.
+    listener is registered on it. Returns the topic names of provider, as and in
+    the order that it gives them (parent topics created on the way are not included).
     """
     all_topics = []
     for topic_name in provider:
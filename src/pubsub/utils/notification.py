@@ -19,7 +19,7 @@ relevant information.
 :license: BSD, see LICENSE_BSD_Simple.txt for details.
 """
 
-from typing import List, Mapping, Any, TextIO
+from typing import List, Mapping, Any, TextIO, Tuple
 
 from ..core import TopicManager, INotificationHandler, Listener, Topic, Publisher
 
@@ -88,6 +88,10 @@ class NotifyByWriteFile(INotificationHandler):
         msg = msg % (self.__pre, pubListener, topicObj.getName())
         self.__fileObj.write(msg)
 
+    def notifyUnsubscribeMany(self, unsubscribed: List[Tuple[Listener, Topic]]):
+        msg = '%s Unsubscribed %s listeners from deleted topics\n' % (self.__pre, len(unsubscribed))
+        self.__fileObj.write(msg)
+
     def notifyDeadListener(self, pubListener: Listener, topicObj: Topic):
         msg = '%s Listener "%s" of Topic "%s" has died\n' \
               % (self.__pre, pubListener, topicObj.getName())
@@ -122,6 +122,22 @@ def perf_send():
     with depth 1:           with depth 1:
         1 data 1.2              1 data 1.1          8       1.1
         no data 1.24            no data 1.05        15      1.2
+
+    Caching a dispatch plan in each topic (the listeners and arg names of every level from root
+    to topic, rebuilt only when un/subscriptions occur) instead of rebuilding the topic stack and
+    message data subsets at every send:
+
+    with depth 8:           with depth 8:         % less   X faster
+        8 data 2.83             8 data 1.92         32      1.5
+        4 data 1.95             4 data 1.34         31      1.5
+        2 data 1.7              2 data 1.24         27      1.4
+        1 data 1.51             1 data 1.23         19      1.2
+        no data 1.71            no data 0.97        43      1.8
+    with depth 4:           with depth 4:
+        4 data 1.29             4 data 0.74         43      1.7
+        2 data 0.93             2 data 0.69         26      1.3
+        1 data 0.85             1 data 0.61         28      1.4
+        no data 0.78            no data 0.56        28      1.4
     """
     print("-"*40)
     print("Performance measurement for sending:")
@@ -41,10 +41,18 @@ def test_ArgsInfo():
     assert c.getOptionalArgs() == c.optionalArgs
     assert c.getRequiredArgs() == c.requiredArgs
 
+    def listenerBatch(arg1, arg2=2, numMsgs=Listener.MSG_BATCH): pass
+    c = CallArgsInfo(listenerBatch)
+    assert c.batchArgName == 'numMsgs'
+    assert c.optionalArgs == ('arg2',)
+    assert CallArgsInfo(listenerWithHints2).batchArgName is None
+
 
 class ArgsInfoMock:
     def __init__(self, autoTopicArgName=None):
         self.autoTopicArgName = autoTopicArgName
+        self.batchArgName = None
+        self.isCoroutine = False
         self.acceptsAllKwargs = False
 
 
@@ -382,3 +390,67 @@ def test_call():
     listener = Listener(fn, aiMock, curriedArgs=dict(b=4, d=5, f=6))
     listener(dict(a=123), 'test_topic')
     assert result[1] == (123, 4, 1, 5, {'f': 6})
+
+
+def test_callPolicies():
+    result = []
+
+    def fn(a, b=1, topic=Listener.AUTO_TOPIC, **e):
+        result.append((a, b, topic, e))
+
+    # auto topic with and without curried args:
+    listener = Listener(fn, getArgs(fn))
+    listener(dict(a=1), 'test_topic', dict(a=1, c=3))
+    assert result.pop() == (1, 1, 'test_topic', dict(c=3))
+
+    listener = Listener(fn, getArgs(fn), curriedArgs=dict(b=2))
+    listener(dict(a=1), 'test_topic')
+    assert result.pop() == (1, 2, 'test_topic', {})
+
+    # changing curried args changes what listener gets:
+    listener.setCurriedArgs(b=3)
+    listener(dict(a=1), 'test_topic', dict(a=1, c=3))
+    assert result.pop() == (1, 3, 'test_topic', dict(c=3))
+
+    # all kwargs with curried args but no auto topic:
+    def fn2(a, b=1, **e):
+        result.append((a, b, e))
+    listener = Listener(fn2, getArgs(fn2), curriedArgs=dict(b=2))
+    listener(dict(a=1), 'test_topic', dict(a=1, c=3))
+    assert result.pop() == (1, 2, dict(c=3))
+
+
+def test_callBatch():
+    result = []
+
+    def fn(a, b=None, n=Listener.MSG_BATCH, topic=Listener.AUTO_TOPIC):
+        result.append((a, b, n, topic))
+
+    listener = Listener(fn, getArgs(fn))
+    assert listener.wantsMsgBatch()
+    listener._invokeBatch(dict(a=[1, 2], b=[3, 4]), 2, 'test_topic')
+    assert result.pop() == ([1, 2], [3, 4], 2, 'test_topic')
+
+    # a single message is a batch of one:
+    listener(dict(a=1), 'test_topic')
+    assert result.pop() == ((1,), None, 1, 'test_topic')
+
+    def fn2(a):
+        pass
+    listener = Listener(fn2, getArgs(fn2))
+    assert not listener.wantsMsgBatch()
+    assert listener._invokeBatch is None
+
+
+def test_getPath():
+    from pubsub.core.callables import getPath, getCallableFromPath
+
+    assert getPath(test_getPath) == '%s:test_getPath' % __name__
+    assert getCallableFromPath('%s:test_getPath' % __name__) is test_getPath
+    assert getCallableFromPath('%s:ArgsInfoMock.__init__' % __name__) is ArgsInfoMock.__init__
+
+    def local(): pass
+    pytest.raises(ValueError, getPath, local)
+    pytest.raises(ValueError, getPath, lambda: None)
+    pytest.raises(ValueError, getCallableFromPath, 'nomodule')
+    pytest.raises(ValueError, getCallableFromPath, '%s:noSuchName' % __name__)
@@ -127,3 +127,15 @@ def test_filter():
     msgArgs.update(arg3=3, arg4=4)
     assert ai.filterArgs( msgArgs ) == argsOK
 
+
+
+def test_check():
+    td1 = ArgSpecGiven(dict(arg1='doc for arg1', arg2='doc for arg2'), reqdArgs=('arg1',))
+    ai1 = ArgsInfo(('t1',), td1, None)
+
+    ai1.check(dict(arg1=1))
+    ai1.check(dict(arg1=2))  # same names: remembered as valid
+    ai1.check(dict(arg1=1, arg2=2))
+    pytest.raises(SenderMissingReqdMsgDataError, ai1.check, dict(arg2=1))
+    pytest.raises(SenderMissingReqdMsgDataError, ai1.check, dict(arg2=1))  # invalid never remembered
+    pytest.raises(SenderUnknownMsgDataError, ai1.check, dict(arg1=1, arg3=1))
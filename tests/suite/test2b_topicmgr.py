@@ -90,6 +90,46 @@ class TestTopicMgr0_Basic:
         topicMgr.clearTree()
         assert list(topicMgr.getRootAllTopics().subtopics) == []
 
+    def test_clearNotifyAndDeep(self):
+        #
+        # Test that deleting topics notifies of listeners unsubscribed at once, and supports deep branches
+        #
+
+        class Handler(pub.INotificationHandler):
+            def __init__(self):
+                self.delTopics = []
+                self.unsubscribed = []
+            def notifyDelTopic(self, topicName):
+                self.delTopics.append(topicName)
+            def notifyUnsubscribeMany(self, unsubscribed):
+                self.unsubscribed.append([(lisnr.getCallable(), topic.getName()) for lisnr, topic in unsubscribed])
+
+        def listener(): pass
+        deepName = tuple('deep%s' % i for i in range(sys.getrecursionlimit() + 10))
+        topicMgr.getOrCreateTopic(deepName)
+        pub.subscribe(listener, 'topic1.topic11')
+        pub.subscribe(listener, deepName[:3])
+        assert len(topicMgr.getTopicsSubscribed(listener)) == 2
+
+        handler = Handler()
+        pub.addNotificationHandler(handler)
+        flags = pub.getNotificationFlags()
+        pub.setNotificationFlags(delTopic=True, unsubscribe=True)
+        try:
+            topicMgr.delTopic(deepName[:2])
+            assert handler.delTopics == ['deep0.deep1']
+            assert handler.unsubscribed == [[(listener, 'deep0.deep1.deep2')]]
+            topicMgr.clearTree()
+        finally:
+            pub.clearNotificationHandlers()
+            pub.setNotificationFlags(**flags)
+
+        assert sorted(handler.delTopics[1:]) == ['deep0', 'topic1']
+        assert handler.unsubscribed[1:] == [[(listener, 'topic1.topic11')]]
+        assert list(topicMgr.getRootAllTopics().subtopics) == []
+        assert list(topicMgr._topicsMap) == [ALL_TOPICS]
+        assert topicMgr.getTopicsSubscribed(listener) == []
+
 
 class TestTopicMgr1_GetOrCreate_NoDefnProv:
     """Only tests TopicMgr methods. This must use some query methods on
@@ -350,6 +390,57 @@ class TestTopicMgr2_GetOrCreate_DefnProv:
         assert topicMgr.getTopic('delTopic.b.c.d', okIfNone=True) is None
         assert topicMgr.getTopic('delTopic.b.c', okIfNone=True) is None
 
+    def test_TopicsUnder(self):
+        #
+        # Test prefix queries and closest parent errors
+        #
+
+        for name in ('under.a.x', 'under.a.y.z', 'under.b', 'underNot.a'):
+            topicMgr.getOrCreateTopic(name)
+        names = [topic.getName() for topic in topicMgr.getTopicsUnder('under.a')]
+        assert sorted(names) == ['under.a', 'under.a.x', 'under.a.y', 'under.a.y.z']
+        assert names.index('under.a.y') < names.index('under.a.y.z')
+        assert len(topicMgr.getTopicsUnder(('under',))) == 6
+        assert topicMgr.getTopicsUnder('under.c') == []
+        assert topicMgr.getTopic('underNot.a') not in topicMgr.getTopicsUnder('under')
+        assert topicMgr.getTopic('underNot.a') in topicMgr.getTopicsUnder()
+
+        with pytest.raises(TopicNameError, match='"under.a" doesn\'t have "w"'):
+            topicMgr.getTopic('under.a.w.v')
+        assert topicMgr.getTopic(('under', 'a', 'y')) is topicMgr.getTopic('under.a.y')
+
+    def test_TopicObjAsName(self):
+        #
+        # Test that Topic objects can be given wherever a topic name is accepted
+        #
+
+        topic = topicMgr.getOrCreateTopic('objName.a')
+        assert topicMgr.getTopic(topic) is topic
+        assert topicMgr.getOrCreateTopic(topic) is topic
+        assert sys.intern('objName.a') is topic.getName()
+        assert all(sys.intern(name) is name for name in topic.getNameTuple())
+
+        received = []
+        def listener(value):
+            received.append(value)
+        pub.subscribe(listener, topic)
+        pub.sendMessage(topic, value=1)
+        assert received == [1]
+        assert pub.isSubscribed(listener, topic)
+        pub.unsubscribe(listener, topic)
+
+        # a topic of another topic tree is used by name:
+        otherMgr = pub.Publisher().getTopicMgr()
+        otherTopic = otherMgr.getOrCreateTopic('objName.a')
+        assert topicMgr.getTopic(otherTopic) is topic
+
+        # a deleted topic is also used by name:
+        topicMgr.delTopic('objName.a')
+        assert topicMgr.getTopic(topic, okIfNone=True) is None
+        newTopic = topicMgr.getOrCreateTopic(topic)
+        assert newTopic is not topic
+        assert newTopic.getName() == 'objName.a'
+
 
 class TestTopicMgr3_TreeTraverser:
     expectedOutput = '''\
@@ -93,6 +93,34 @@ def testFlagChanges():
     pub.setNotificationFlags(** savedFlags)
 
 
+def testSendNotifier():
+    from pubsub.core.notificationmgr import NotificationMgr
+
+    class Handler(INotificationHandler):
+        stages = []
+        def notifySend(self, stage, topicObj, pubListener=None):
+            self.stages.append(stage)
+
+    mgr = NotificationMgr()
+    assert mgr.getSendNotifier() is None
+    mgr.setFlagStates(sendMessage=True)
+    assert mgr.getSendNotifier() is None  # no handlers yet
+    handler = Handler()
+    mgr.addHandler(handler)
+    assert mgr.getSendNotifier() is not None
+    mgr.notifySend('pre', None)
+    assert handler.stages == ['pre']
+
+    mgr.setFlagStates(sendMessage=False)
+    assert mgr.getSendNotifier() is None
+    mgr.notifySend('pre', None)
+    assert handler.stages == ['pre']
+
+    mgr.setFlagStates(sendMessage=True)
+    mgr.clearHandlers()
+    assert mgr.getSendNotifier() is None
+
+
 def testNotifications():
     class Handler(INotificationHandler):
         def __init__(self):
@@ -329,6 +329,217 @@ def testUnsubAll():
     assert unsubed >= expect
 
 
+def testListenerTopicsIndex():
+    class Panel:
+        def onData(self): pass
+    panel = Panel()
+    def strongListener(): pass
+    names = ['testLisnrIndex.%s' % i for i in range(3)]
+    for name in names:
+        pub.subscribe(panel.onData, name)
+    pub.subscribe(strongListener, names[0], strong=True)
+    pub.subscribe(strongListener, names[1])
+
+    def topicNames(listener):
+        return sorted(t.getName() for t in topicMgr.getTopicsSubscribed(listener))
+    assert topicNames(panel.onData) == names
+    assert topicNames(strongListener) == names[:2]
+
+    # unsubscribing the first subscription of a callable must not lose its other ones:
+    pub.unsubscribe(strongListener, names[0])
+    assert topicNames(strongListener) == names[1:2]
+    pub.unsubscribe(panel.onData, names[0])
+    assert topicNames(panel.onData) == names[1:]
+    topicMgr.delTopic(names[1])
+    assert topicNames(panel.onData) == names[2:]
+    assert topicNames(strongListener) == []
+
+    # unsubscribe from every topic:
+    pub.subscribe(panel.onData, names[0])
+    assert pub.unsubAll(listener=panel.onData, topicFilter=lambda name: name != names[0]) != []
+    assert topicNames(panel.onData) == names[:1]
+    assert pub.unsubAll(listener=panel.onData, listenerFilter=lambda lisnr: False) == []
+    unsubd = pub.unsubAll(listener=panel.onData)
+    assert [lisnr.getCallable() for lisnr in unsubd] == [panel.onData]
+    assert topicNames(panel.onData) == []
+
+    # dead listeners are removed from the index:
+    for name in names:
+        pub.subscribe(panel.onData, name)
+    del panel
+    gc.collect()
+    assert all(topicMgr.getTopic(name).getNumListeners() == 0 for name in names)
+    panel = Panel()
+    pub.subscribe(panel.onData, names[2])
+    assert topicNames(panel.onData) == names[2:]
+
+
+def testPatternSubscriptions():
+    received = []
+    def onTemp(value, msgTopic=pub.AUTO_TOPIC):
+        received.append((msgTopic.getName(), value))
+
+    assert pub.subscribe(onTemp, 'wild.*.temp') == (None, True)
+    assert pub.subscribe(onTemp, 'wild.*.temp') == (None, False)
+    assert pub.isSubscribed(onTemp, 'wild.*.temp')
+    pub.sendMessage('wild.kitchen.temp', value=1)
+    pub.sendMessage('wild.kitchen.hum', value=2)
+    pub.sendMessage('wild.kitchen.temp.high', value=3)
+    pub.sendMessage('wild.garage.temp', value=4)
+    assert received == [('wild.kitchen.temp', 1), ('wild.kitchen.temp.high', 3), ('wild.garage.temp', 4)]
+    assert [t.getName() for t in topicMgr.getTopicsMatching('wild.*.temp')] == ['wild.garage.temp', 'wild.kitchen.temp']
+
+    # topics that already exist; a listener is subscribed only to the topmost ones of a branch:
+    del received[:]
+    pub.getDefaultTopicMgr().getOrCreateTopic('wildOrders.new.paid')
+    pub.getDefaultTopicMgr().getOrCreateTopic('wildOrders.new.unpaid.late')
+    pub.subscribe(onTemp, 'wildOrders.#')
+    pub.subscribe(onTemp, 'wildOrders.#.late')
+    pub.sendMessage('wildOrders.new.unpaid.late', value=5)
+    assert received == [('wildOrders.new.unpaid.late', 5)] * 2
+    assert sorted(t.getName() for t in topicMgr.getTopicsSubscribed(onTemp)) == [
+        'wild.garage.temp', 'wild.kitchen.temp', 'wildOrders', 'wildOrders.new.unpaid.late']
+    pub.sendMessage('wildOrders.late', value=6)
+    assert topicMgr.getTopic('wildOrders.late').hasListener(onTemp)
+
+    # unsubscribing from a pattern unsubscribes from the topics subscribed because of it:
+    unsubd = pub.unsubscribe(onTemp, 'wild.*.temp')
+    assert len(unsubd) == 2 and not pub.isSubscribed(onTemp, 'wild.*.temp')
+    assert not topicMgr.getTopic('wild.kitchen.temp').hasListener(onTemp)
+    pub.sendMessage('wild.cellar.temp', value=7)
+    assert pub.unsubscribe(onTemp, 'wild.*.temp') == []
+
+    # listeners incompatible with a matching topic:
+    def onOther(other): pass
+    topicMgr.getOrCreateTopic('wildMix.a', lambda value: None)
+    topicMgr.getOrCreateTopic('wildMix.b', onOther)
+    with pytest.raises(pub.ListenerMismatchError):
+        pub.subscribe(onOther, 'wildMix.*')
+    assert not pub.isSubscribed(onOther, 'wildMix.*')
+    assert topicMgr.getTopicsSubscribed(onOther) == []
+    pytest.raises(pub.TopicNameError, pub.subscribe, onTemp, 'wild..*')
+
+    # patterns of dead listeners are forgotten:
+    class Obj:
+        def onTemp(self, value): pass
+    obj = Obj()
+    pub.subscribe(obj.onTemp, 'wildDead.*')
+    del obj
+    gc.collect()
+    assert topicMgr.getOrCreateTopic('wildDead.a').getNumListeners() == 0
+
+
+def testSkipUnobservedSends():
+    publisher = pub.Publisher()
+    mgr = publisher.getTopicMgr()
+    assert not publisher.setSkipUnobservedSends()
+    assert publisher.getSkipUnobservedSends()
+
+    publisher.sendMessage('tele.a.b', value=1)
+    assert mgr.getTopic('tele', okIfNone=True) is None
+    assert not mgr.isTopicObserved('tele.a.b')
+
+    received = []
+    def listener(value, msgTopic=pub.AUTO_TOPIC):
+        received.append((msgTopic.getName(), value))
+    publisher.subscribe(listener, 'tele')
+    assert mgr.isTopicObserved('tele.a.b')
+    publisher.sendMessage('tele.a.b', value=2)
+    assert received == [('tele.a.b', 2)]
+
+    # existing topics without listeners are skipped too, even with wrong message data:
+    publisher.unsubscribe(listener, 'tele')
+    mgr.getOrCreateTopic('teleDefined', lambda value: None)
+    publisher.sendMessage('teleDefined', wrong=3)
+    publisher.sendMessage('tele.c', value=4)
+    assert not mgr.isTopicObserved('tele.c')
+
+    # names remembered as unobserved are forgotten once a listener gets subscribed:
+    publisher.subscribe(listener, ('tele',))
+    publisher.sendMessage('tele.c', value=5)
+    publisher.subscribe(listener, 'telePattern.*')
+    publisher.sendMessage('telePattern.a', value=6)
+    assert received[1:] == [('tele.c', 5), ('telePattern.a', 6)]
+
+    # all the ways of sending skip:
+    import asyncio
+    asyncio.run(publisher.asendMessage('teleAsync', value=1))
+    publisher.sendMessages('teleMany', [dict(value=1)])
+    publisher.sendBatch('teleBatch', dict(value=[1, 2]))
+    queued = pub.QueuedPublisher(publisher)
+    assert queued.sendMessage('teleQueued', value=1)
+    assert queued.getNumPending() == 0
+    for name in ('teleAsync', 'teleMany', 'teleBatch', 'teleQueued'):
+        assert mgr.getTopic(name, okIfNone=True) is None
+    sender = publisher.getSender('teleDefined')
+    sender(wrong=8)
+    publisher.subscribe(listener, 'teleDefined')
+    sender(value=9)
+    asyncio.run(publisher.asendMessage('tele.d', value=10))
+    publisher.sendMessages('tele.d', [dict(value=11)])
+    assert received[-3:] == [('teleDefined', 9), ('tele.d', 10), ('tele.d', 11)]
+
+    publisher.setSkipUnobservedSends(False)
+    pytest.raises(pub.SenderMissingReqdMsgDataError, publisher.sendMessage, 'teleDefined', wrong=7)
+
+
+def testLazyValues():
+    publisher = pub.Publisher()
+    mgr = publisher.getTopicMgr()
+    mgr.getOrCreateTopic('lazy', lambda a, b=None: None)
+    mgr.getOrCreateTopic('lazy.sub', lambda a, c, b=None: None)
+
+    computed = []
+    def lazy(value):
+        def compute():
+            computed.append(value)
+            return value
+        return pub.LazyValue(compute)
+
+    # no listeners: nothing computed
+    assert not publisher.hasListenersFor('lazy.sub')
+    assert not publisher.hasListenersFor('lazy.sub.other')
+    publisher.sendMessage('lazy.sub', a=lazy(1), c=lazy(2))
+    assert computed == []
+
+    # only the data that listeners get is computed:
+    received = []
+    def onLazy(a, b=None):
+        received.append((a, b))
+    publisher.subscribe(onLazy, 'lazy')
+    assert publisher.hasListenersFor('lazy.sub')
+    assert publisher.hasListenersFor(mgr.getTopic('lazy.sub'))
+    publisher.sendMessage('lazy.sub', a=lazy(3), c=lazy(4))
+    assert computed == [3]
+    assert received == [(3, None)]
+    publisher.sendMessages('lazy.sub', [dict(a=lazy(5), c=lazy(6))])
+    assert computed == [3, 5]
+
+    # listeners that accept **kwargs get everything; shared values are computed once:
+    def onAll(**kwargs):
+        received.append(kwargs)
+    publisher.subscribe(onAll, 'lazy')
+    del received[:], computed[:]
+    shared = lazy(8)
+    publisher.sendMessage('lazy.sub', a=shared, c=lazy(7))
+    publisher.sendMessage('lazy.sub', a=shared, c=lazy(9))
+    assert computed == [8, 7, 9]
+    assert received[:2] == [(8, None), dict(a=8, c=7)]
+    assert shared.isComputed() and shared.get() == 8
+
+    # listener subscribed during the send gets computed data too:
+    publisher.unsubscribe(onAll, 'lazy')
+    def onSub(a, c, b=None):
+        received.append((a, c))
+    def subscriber(a, b=None):
+        publisher.subscribe(onSub, 'lazy.sub')
+    publisher.subscribe(subscriber, 'lazy')
+    del received[:], computed[:]
+    publisher.sendMessage('lazy.sub', a=lazy(10), c=lazy(11))
+    assert received == [(10, None), (10, 11)]
+    assert computed == [10, 11]
+
+
 def testSendForUndefinedTopic():
     pub.sendMessage('testSendForUndefinedTopic')
     assert topicMgr.getTopic('testSendForUndefinedTopic')
@@ -419,3 +630,850 @@ def testListenerChangesListenerList():
     pub.sendMessage('test.change-listeners')
     assert testListeners.callCountForChanger ==     3
     assert testListeners.callCountForNewListener == 1
+
+
+def testListenerChangesSubtopicListeners():
+    """The listeners of the topics of a message are not frozen at start of sendMessage: a listener of
+    a parent topic can un/subscribe listeners of the subtopic that is being sent."""
+
+    class Listeners:
+        calls = []
+
+        def parent(self):
+            self.calls.append('parent')
+            pub.unsubscribe(self.deadSoon, 'testChangeSubtopic.sub')
+            pub.subscribe(self.newSub, 'testChangeSubtopic.sub')
+
+        def deadSoon(self):
+            self.calls.append('deadSoon')
+
+        def newSub(self):
+            self.calls.append('newSub')
+
+    testListeners = Listeners()
+    pub.subscribe(testListeners.parent, 'testChangeSubtopic')
+    pub.subscribe(testListeners.deadSoon, 'testChangeSubtopic.sub')
+
+    pub.sendMessage('testChangeSubtopic.sub')
+    assert testListeners.calls == ['parent', 'newSub']
+
+    # sending after changes uses new listeners:
+    pub.unsubscribe(testListeners.parent, 'testChangeSubtopic')
+    testListeners.calls = []
+    pub.sendMessage('testChangeSubtopic.sub')
+    assert testListeners.calls == ['newSub']
+
+
+def testGetSender():
+    result = []
+    def listener(a, b, c=None): result.append((a, b, c))
+    pub.subscribe(listener, 'testGetSender')
+
+    send = pub.getSender('testGetSender')
+    assert send.getTopic() is topicMgr.getTopic('testGetSender')
+    send(a=1, b=2)
+    send(1, 2, 3)
+    send(1, b=2, c=3)
+    assert result == [(1, 2, None), (1, 2, 3), (1, 2, 3)]
+
+    pytest.raises(TypeError, send, 1, a=1, b=2)
+    pytest.raises(TypeError, send, 1, 2, 3, 4)
+    pytest.raises(pubsub.core.topicargspec.SenderMissingReqdMsgDataError, send, 1)
+
+    # no longer valid once topic deleted:
+    topicMgr.delTopic('testGetSender')
+    pytest.raises(pub.TopicNameError, send, a=1, b=2)
+
+
+def testMsgDataCheck():
+    def listener(a, b=None): pass
+    pub.subscribe(listener, 'testMsgDataCheck')
+    topic = topicMgr.getTopic('testMsgDataCheck')
+    assert pub.getMsgDataCheck() == (pub.MsgDataCheck.ALWAYS, 1)
+    assert topic.getMsgDataCheck() == (pub.MsgDataCheck.ALWAYS, 1)
+    badMsg = dict(a=1, c=3)
+
+    topic.setMsgDataCheck(pub.MsgDataCheck.FIRST_N, 2)
+    pytest.raises(pub.SenderUnknownMsgDataError, pub.sendMessage, 'testMsgDataCheck', **badMsg)
+    pub.sendMessage('testMsgDataCheck', a=1)
+    pub.sendMessage('testMsgDataCheck', **badMsg)  # not checked: extra data ignored
+
+    topic.setMsgDataCheck(pub.MsgDataCheck.SAMPLED, 2)
+    pytest.raises(pub.SenderUnknownMsgDataError, pub.sendMessage, 'testMsgDataCheck', **badMsg)
+    pub.sendMessage('testMsgDataCheck', **badMsg)
+    pytest.raises(pub.SenderUnknownMsgDataError, pub.sendMessage, 'testMsgDataCheck', **badMsg)
+
+    # topic policy overrides the publisher's:
+    pub.setMsgDataCheck(pub.MsgDataCheck.OFF)
+    assert topic.getMsgDataCheck() == (pub.MsgDataCheck.SAMPLED, 2)
+    topic.setMsgDataCheck(None)
+    assert topic.getMsgDataCheck() == (pub.MsgDataCheck.OFF, 1)
+    pub.sendMessage('testMsgDataCheck', **badMsg)
+
+    pub.setMsgDataCheck(pub.MsgDataCheck.ALWAYS)
+    pytest.raises(pub.SenderUnknownMsgDataError, pub.sendMessage, 'testMsgDataCheck', **badMsg)
+    pytest.raises(ValueError, pub.setMsgDataCheck, pub.MsgDataCheck.SAMPLED, 0)
+
+
+def testArgsProjection():
+    received = []
+    def listenerA(a=None): received.append(('A', dict(a=a)))
+    def listenerAB(a=None, b=None, c=None): received.append(('AB', dict(a=a, b=b, c=c)))
+    pub.subscribe(listenerA, 'testArgsProj')
+    pub.subscribe(listenerAB, 'testArgsProj.sub')
+
+    pub.sendMessage('testArgsProj.sub', a=1, c=3)
+    pub.sendMessage('testArgsProj.sub', b=2)
+    pub.sendMessage('testArgsProj.sub', a=1, c=3)
+    assert received == [
+        ('A', dict(a=1)), ('AB', dict(a=1, b=None, c=3)),
+        ('A', dict(a=None)), ('AB', dict(a=None, b=2, c=None)),
+        ('A', dict(a=1)), ('AB', dict(a=1, b=None, c=3)),
+    ]
+
+    # the projections cache is bounded:
+    topic = topicMgr.getTopic('testArgsProj.sub')
+    topic.MAX_ARGS_PROJECTIONS = 2
+    for msgData in (dict(a=1), dict(b=2), dict(c=3), dict(a=1, b=2)):
+        del received[:]
+        pub.sendMessage('testArgsProj.sub', **msgData)
+        expectA = dict(a=msgData.get('a'))
+        expectAB = dict(a=msgData.get('a'), b=msgData.get('b'), c=msgData.get('c'))
+        assert received == [('A', expectA), ('AB', expectAB)]
+    assert len(topic._Topic__argsProjections) == 2
+
+
+def testResubscribeCurriedArgs():
+    result = []
+    def listen(a, b=0):
+        result.append((a, b))
+
+    pub.subscribe(listen, 'testResubCurriedArgs', b=2)
+    pub.sendMessage('testResubCurriedArgs', a=1)
+    pub.subscribe(listen, 'testResubCurriedArgs', b=3)
+    pub.sendMessage('testResubCurriedArgs', a=1)
+    assert result == [(1, 2), (1, 3)]
+
+
+def testStrongListenerRefs():
+    result = []
+    class Functor:
+        def __call__(self, a):
+            result.append(a)
+
+    listener, _ = pub.subscribe(Functor(), 'testStrongRefs', strong=True)
+    pub.subscribe(lambda a: result.append(-a), 'testStrongRefs', strong=True)
+    pub.subscribe(Functor(), 'testStrongRefs')  # weak: dies right away
+    gc.collect()
+    assert listener.isStrongRef()
+    assert not listener.isDead()
+    assert pub.getDefaultTopicMgr().getTopic('testStrongRefs').getNumListeners() == 2
+    pub.sendMessage('testStrongRefs', a=1)
+    assert sorted(result) == [-1, 1]
+
+    pub.unsubscribe(listener.getCallable(), 'testStrongRefs')
+    del result[:]
+    pub.sendMessage('testStrongRefs', a=2)
+    assert result == [-2]
+
+    # default for the whole tree:
+    assert pub.setStrongListenerRefs() is False
+    try:
+        listener, _ = pub.subscribe(Functor(), 'testStrongRefs2')
+        gc.collect()
+        assert listener.isStrongRef()
+        listener, _ = pub.subscribe(Functor(), 'testStrongRefs2', strong=False)
+        assert not listener.isStrongRef()
+        gc.collect()
+        assert pub.getDefaultTopicMgr().getTopic('testStrongRefs2').getNumListeners() == 1
+    finally:
+        assert pub.setStrongListenerRefs(False) is True
+
+
+def testSendMessages():
+    received = []
+    def listenRoot(a):
+        received.append(('root', a))
+    def listenSub(a, b=None):
+        received.append(('sub', a, b))
+
+    pub.subscribe(listenRoot, 'testSendMsgs')
+    pub.subscribe(listenSub, 'testSendMsgs.sub')
+
+    msgs = [dict(a=1), dict(a=2, b=3), dict(a=4)]
+    pub.sendMessages('testSendMsgs.sub', (msg for msg in msgs))
+    assert received == [('root', 1), ('sub', 1, None), ('root', 2), ('sub', 2, 3), ('root', 4), ('sub', 4, None)]
+
+    # data of each message is checked:
+    del received[:]
+    with pytest.raises(pub.SenderUnknownMsgDataError):
+        pub.sendMessages('testSendMsgs.sub', [dict(a=1), dict(a=2, c=3)])
+    assert received == [('root', 1), ('sub', 1, None)]
+
+    # a listener subscribed during the batch gets the remaining messages (and the current
+    # one since it is subscribed to a topic below the one being dispatched, as for sendMessage):
+    del received[:]
+    def listenSub2(a, b=None):
+        received.append(('sub2', a))
+    def subscriber(a):
+        if a == 1:
+            pub.subscribe(listenSub2, 'testSendMsgs.sub')
+    pub.subscribe(subscriber, 'testSendMsgs')
+    pub.sendMessages('testSendMsgs.sub', [dict(a=1), dict(a=2)])
+    assert [msg for msg in received if msg[0] == 'sub2'] == [('sub2', 1), ('sub2', 2)]
+
+
+def testSendMessagesNotify():
+    class Handler(IgnoreNotificationsMixin):
+        def __init__(self):
+            self.stages = []
+        def notifySend(self, stage, topicObj, pubListener=None):
+            self.stages.append(stage)
+
+    def listen(a):
+        pass
+    pub.subscribe(listen, 'testSendMsgsNotify')
+
+    handler = Handler()
+    savedFlags = pub.getNotificationFlags()
+    pub.addNotificationHandler(handler)
+    pub.setNotificationFlags(sendMessage=True)
+    try:
+        pub.sendMessages('testSendMsgsNotify', [dict(a=1), dict(a=2)])
+    finally:
+        pub.clearNotificationHandlers()
+        pub.setNotificationFlags(**savedFlags)
+    assert handler.stages == ['pre', 'in', 'in', 'post']
+
+
+def testSendBatch():
+    received = []
+    def listenRoot(a, n=pub.MSG_BATCH):
+        received.append(('rootBatch', n, list(a)))
+    def listenSub(a, b=None):
+        received.append(('sub', a, b))
+    def listenSubBatch(n=pub.MSG_BATCH, **columns):
+        received.append(('subBatch', n, sorted(columns)))
+
+    pub.subscribe(listenRoot, 'testSendBatch')
+    pub.subscribe(listenSub, 'testSendBatch.sub')
+    pub.subscribe(listenSubBatch, 'testSendBatch.sub')
+
+    pub.sendBatch('testSendBatch.sub', dict(a=(1, 2, 3), b=[4, 5, 6]))
+    assert received[0] == ('rootBatch', 3, [1, 2, 3])
+    assert sorted(received[1:]) == sorted([
+        ('sub', 1, 4), ('sub', 2, 5), ('sub', 3, 6), ('subBatch', 3, ['a', 'b'])])
+
+    # columns are checked once for whole batch:
+    del received[:]
+    with pytest.raises(pub.SenderUnknownMsgDataError):
+        pub.sendBatch('testSendBatch.sub', dict(a=[1], c=[3]))
+    with pytest.raises(ValueError):
+        pub.sendBatch('testSendBatch.sub', dict(a=[1], b=[2, 3]))
+    assert received == []
+
+    # a batch listener gets a message from sendMessage as a batch of one:
+    pub.sendMessage('testSendBatch', a=1)
+    assert received == [('rootBatch', 1, [1])]
+
+
+def testSendBatchNoData():
+    received = []
+    def listen(n=pub.MSG_BATCH):
+        received.append(n)
+    def listen2():
+        received.append(None)
+    pub.subscribe(listen, 'testSendBatchNoData')
+    pub.subscribe(listen2, 'testSendBatchNoData')
+
+    with pytest.raises(ValueError):
+        pub.sendBatch('testSendBatchNoData', {})
+    pub.sendBatch('testSendBatchNoData', {}, numMsgs=2)
+    assert sorted(received, key=str) == [2, None, None]
+
+
+def testThreadedSubscribeSend():
+    from threading import Thread
+
+    numThreads, numLoops = 4, 200
+    listeners = [[(lambda a, n=n: None) for n in range(10)] for _ in range(numThreads)]
+    errors = []
+
+    def subscriber(threadListeners):
+        try:
+            for _ in range(numLoops):
+                for listener in threadListeners:
+                    pub.subscribe(listener, 'testThreaded.sub')
+                for listener in threadListeners:
+                    pub.unsubscribe(listener, 'testThreaded.sub')
+        except Exception as exc:
+            errors.append(exc)
+
+    def sender():
+        try:
+            for _ in range(numLoops * 10):
+                pub.sendMessage('testThreaded.sub', a=1)
+        except Exception as exc:
+            errors.append(exc)
+
+    pub.subscribe(lambda a: None, 'testThreaded.sub', strong=True)
+    threads = [Thread(target=subscriber, args=(lsnrs,)) for lsnrs in listeners]
+    threads += [Thread(target=sender) for _ in range(numThreads)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    topic = pub.getDefaultTopicMgr().getTopic('testThreaded.sub')
+    assert topic.getNumListeners() == 1
+    pub.unsubAll('testThreaded.sub')
+
+
+def testAsendMessage():
+    import asyncio
+    events = []
+
+    async def listenSlow(a):
+        events.append(('slow start', a))
+        await asyncio.sleep(0.01)
+        events.append(('slow end', a))
+
+    async def listenFast(a):
+        events.append(('fast start', a))
+        events.append(('fast end', a))
+
+    def listenSync(a):
+        events.append(('sync', a))
+
+    listener, _ = pub.subscribe(listenSlow, 'testAsend')
+    assert listener.isCoroutine()
+    pub.subscribe(listenFast, 'testAsend')
+    pub.subscribe(listenSync, 'testAsend')
+
+    # coroutine listeners are awaited concurrently, after sync ones called:
+    asyncio.run(pub.asendMessage('testAsend', a=1))
+    assert events[0] == ('sync', 1)
+    assert events.index(('fast end', 1)) < events.index(('slow end', 1))
+
+    # bounded concurrency:
+    topic = pub.getDefaultTopicMgr().getTopic('testAsend')
+    topic.setAsyncConcurrency(1)
+    del events[:]
+    asyncio.run(pub.asendMessage('testAsend', a=2))
+    starts = [event for event in events if event[0] != 'sync']
+    assert starts[1][0] == starts[0][0].replace('start', 'end')
+    with pytest.raises(ValueError):
+        topic.setAsyncConcurrency(0)
+    topic.setAsyncConcurrency(None)
+    assert topic.getAsyncConcurrency() is None
+
+    # other sends skip coroutine listeners, with a warning that names them, and create no coroutine:
+    import warnings
+    del events[:]
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter('always')
+        pub.sendMessage('testAsend', a=3)
+        pub.sendMessages('testAsend', [dict(a=4)])
+        pub.sendBatch('testAsend', dict(a=[5]))
+    assert events == [('sync', 3), ('sync', 4), ('sync', 5)]
+    assert len(caught) == 6
+    assert all(issubclass(warning.category, RuntimeWarning) for warning in caught)
+    assert sorted(set(str(warning.message).split('"')[1] for warning in caught)) == ['listenFast', 'listenSlow']
+
+
+def testAsendMessageExc():
+    import asyncio
+    from pubsub.utils.exchandling import TracebackInfo
+
+    async def listenRaise(a):
+        await asyncio.sleep(0)
+        raise RuntimeError('async listener raise')
+    received = []
+    async def listenOk(a):
+        received.append(a)
+
+    pub.subscribe(listenRaise, 'testAsendExc')
+    pub.subscribe(listenOk, 'testAsendExc')
+
+    # no handler: exception propagates, other listeners still awaited
+    assert pub.getListenerExcHandler() is None
+    with pytest.raises(RuntimeError):
+        asyncio.run(pub.asendMessage('testAsendExc', a=1))
+    assert received == [1]
+
+    handled = []
+    def handler(listenerID, topicObj):
+        handled.append((listenerID.split('_')[0], TracebackInfo().ExcClass))
+    pub.setListenerExcHandler(handler)
+    try:
+        asyncio.run(pub.asendMessage('testAsendExc', a=2))
+    finally:
+        pub.setListenerExcHandler(None)
+    assert received == [1, 2]
+    assert handled == [('listenRaise', RuntimeError)]
+
+
+def testThreadPoolDispatch():
+    from threading import get_ident, Event
+
+    senderThread = get_ident()
+    threads = {}
+    def listenPool(a):
+        threads['pool'] = get_ident()
+    def listenInline(a):
+        threads['inline'] = get_ident()
+
+    topic = pub.getDefaultTopicMgr().getOrCreateTopic('testThreadPool', listenPool)
+    topic.setDispatchMode(pub.DispatchMode.THREAD_POOL_WAIT, timeout=5)
+    assert topic.getDispatchMode() == (pub.DispatchMode.THREAD_POOL_WAIT, 5)
+    pub.subscribe(listenPool, 'testThreadPool')
+    pub.subscribe(listenInline, 'testThreadPool', dispatch=pub.DispatchMode.INLINE)
+    pub.sendMessage('testThreadPool', a=1)
+    assert threads['inline'] == senderThread
+    assert threads['pool'] != senderThread
+
+    # exceptions raised in sender when waiting and no handler:
+    def listenRaise(a):
+        raise RuntimeError('pooled listener raise')
+    pub.subscribe(listenRaise, 'testThreadPool')
+    with pytest.raises(RuntimeError):
+        pub.sendMessage('testThreadPool', a=1)
+
+    # else given to handler:
+    handled = []
+    pub.setListenerExcHandler(lambda listenerID, topicObj: handled.append(get_ident()))
+    try:
+        pub.sendMessage('testThreadPool', a=1)
+    finally:
+        pub.setListenerExcHandler(None)
+    assert len(handled) == 1 and handled[0] != senderThread
+    pub.unsubscribe(listenRaise, 'testThreadPool')
+
+    # fire and forget: sender does not wait for listener
+    release = Event()
+    done = Event()
+    def listenBlock(a):
+        release.wait(5)
+        done.set()
+    pub.subscribe(listenBlock, 'testThreadPool', dispatch=pub.DispatchMode.THREAD_POOL)
+    pub.sendMessage('testThreadPool', a=1)
+    assert not done.is_set()
+    release.set()
+    assert done.wait(5)
+
+    # coroutine listeners can only be called inline:
+    async def listenAsync(a):
+        pass
+    for mode in (pub.DispatchMode.THREAD_POOL, pub.DispatchMode.THREAD_POOL_WAIT):
+        with pytest.raises(ValueError):
+            pub.subscribe(listenAsync, 'testThreadPool', dispatch=mode)
+    with pytest.raises(ValueError):
+        pub.subscribe(listenAsync, 'testThreadPool')
+    assert not pub.isSubscribed(listenAsync, 'testThreadPool')
+
+    topic.setDispatchMode()
+    assert topic.getDispatchMode() == (pub.DispatchMode.INLINE, None)
+    pub.subscribe(listenAsync, 'testThreadPool')
+    with pytest.raises(ValueError):
+        topic.setDispatchMode(pub.DispatchMode.THREAD_POOL)
+    assert topic.getDispatchMode() == (pub.DispatchMode.INLINE, None)
+    pub.unsubAll('testThreadPool')
+
+
+def testSetThreadPoolExecutor():
+    from concurrent.futures import ThreadPoolExecutor
+
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='testPool')
+    oldExecutor = pub.setThreadPoolExecutor(executor)
+    try:
+        from threading import current_thread
+        names = []
+        def listen():
+            names.append(current_thread().name)
+        pub.subscribe(listen, 'testSetExecutor', dispatch=pub.DispatchMode.THREAD_POOL_WAIT)
+        pub.sendMessage('testSetExecutor')
+        assert names[0].startswith('testPool')
+
+        # listener that dies while its call is queued does not get called:
+        from threading import Event
+        release = Event()
+        def listenBlock():
+            release.wait(5)
+        class Panel:
+            def onMsg(self):
+                names.append('dead')
+        panel = Panel()
+        handled = []
+        pub.setListenerExcHandler(lambda listenerID, topicObj: handled.append(listenerID))
+        pub.subscribe(listenBlock, 'testSetExecutorDead', dispatch=pub.DispatchMode.THREAD_POOL)
+        pub.subscribe(panel.onMsg, 'testSetExecutorDead', dispatch=pub.DispatchMode.THREAD_POOL)
+        pub.sendMessage('testSetExecutorDead')
+        del panel
+        gc.collect()
+        release.set()
+        executor.submit(lambda: None).result(5)
+        assert 'dead' not in names
+        assert handled == []
+    finally:
+        pub.setListenerExcHandler(None)
+        assert pub.setThreadPoolExecutor(oldExecutor) is executor
+        executor.shutdown()
+
+
+def listenInProcess(outPath, value):
+    # module-level so that worker processes can import it by name
+    if value < 0:
+        raise ValueError('negative value %s' % value)
+    with open(outPath, 'a') as outFile:
+        outFile.write('%s\n' % value)
+
+
+def testProcessPoolDispatch(tmp_path):
+    from concurrent.futures import ProcessPoolExecutor
+    from pubsub.utils.exchandling import TracebackInfo
+
+    # listeners that can't be found by name or can't be pickled are refused:
+    def listenLocal(outPath, value): pass
+    with pytest.raises(ValueError):
+        pub.subscribe(listenLocal, 'testProcessPool', dispatch=pub.DispatchMode.PROCESS_POOL)
+    with pytest.raises(ValueError):
+        pub.subscribe('no_such_module:listen', 'testProcessPool')
+    with pytest.raises(ValueError):
+        topicMgr.getTopic('testProcessPool').setDispatchMode(pub.DispatchMode.PROCESS_POOL)
+
+    executor = ProcessPoolExecutor(max_workers=1)
+    oldExecutor = pub.setProcessPoolExecutor(executor)
+    path = '%s:listenInProcess' % __name__
+    handled = []
+    def handler(listenerID, topicObj):
+        handled.append(TracebackInfo().ExcClass)
+    pub.setListenerExcHandler(handler)
+    try:
+        listener, _ = pub.subscribe(path, 'testProcessPool')
+        assert listener.getDispatchMode() is pub.DispatchMode.PROCESS_POOL
+        assert listener.getPath() == path
+        assert pub.isSubscribed(listenInProcess, 'testProcessPool')
+        assert topicMgr.getTopic('testProcessPool').hasListener(path)
+        # paths that don't lead to a callable are simply not subscribed:
+        for badPath in ('noColon', 'no_such_module_xyz:func', __name__ + ':noSuchListener'):
+            assert not topicMgr.getTopic('testProcessPool').hasListener(badPath)
+            assert not pub.isSubscribed(badPath, 'testProcessPool')
+        assert not pub.isSubscribed('noColon', 'testProcessPool.*')
+
+        outPath = str(tmp_path / 'out.txt')
+        pub.sendMessage('testProcessPool', outPath=outPath, value=1)
+        pub.sendMessage('testProcessPool', outPath=outPath, value=-1)
+        pub.sendMessage('testProcessPool', outPath=outPath, value=2)
+    finally:
+        executor.shutdown(wait=True)
+        pub.setListenerExcHandler(None)
+        assert pub.setProcessPoolExecutor(oldExecutor) is executor
+        pub.unsubscribe(path, 'testProcessPool')
+
+    with open(outPath) as outFile:
+        assert outFile.read().split() == ['1', '2']
+    assert handled == [pub.ListenerProcessError]
+
+
+def testQueuedPublisher():
+    from threading import Thread, get_ident
+
+    received = []
+    threads = set()
+    def listenA(n):
+        received.append(('a', n))
+        threads.add(get_ident())
+    def listenB(n):
+        received.append(('b', n))
+    pub.subscribe(listenA, 'testQueued.a')
+    pub.subscribe(listenB, 'testQueued.b')
+
+    queued = pub.QueuedPublisher(pub.getDefaultPublisher())
+    workers = [Thread(target=lambda: [queued.sendMessage('testQueued.a', n=n) for n in range(100)])
+               for _ in range(4)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    assert received == []
+    assert queued.getNumPending() == 400
+
+    assert queued.drain(maxItems=10) == 10
+    assert queued.getNumPending() == 390
+    assert queued.drain() == 390
+    assert len(received) == 400 and threads == {get_ident()}
+    assert sorted(n for _, n in received) == sorted(list(range(100)) * 4)
+
+    # order is kept across topics, and maxTime limits the delivery:
+    del received[:]
+    for n in range(3):
+        queued.sendMessage('testQueued.a', n=n)
+        queued.sendMessage('testQueued.b', n=n)
+    assert queued.drain(maxTime=0) == 0
+    assert queued.drain() == 6
+    assert received == [('a', 0), ('b', 0), ('a', 1), ('b', 1), ('a', 2), ('b', 2)]
+
+    # undelivered messages stay queued if a listener raises:
+    def listenRaise(n):
+        if n == 1:
+            raise RuntimeError('raising on 1')
+    pub.subscribe(listenRaise, 'testQueued.a')
+    del received[:]
+    for n in range(3):
+        queued.sendMessage('testQueued.a', n=n)
+    with pytest.raises(RuntimeError):
+        queued.drain()
+    assert queued.getNumPending() == 1
+    assert queued.drain() == 1
+    assert received == [('a', 0), ('a', 1), ('a', 2)]
+    pub.unsubscribe(listenRaise, 'testQueued.a')
+
+
+def testQueuedPublisherPolicies():
+    from queue import Full
+
+    received = []
+    def listen(n):
+        received.append(n)
+    def listenOther(n):
+        received.append(-n)
+    pub.subscribe(listen, 'testQueuedPolicy')
+    pub.subscribe(listenOther, 'testQueuedPolicyOther')
+
+    def sendAll(policy, msgs):
+        del received[:]
+        queued = pub.QueuedPublisher(pub.getDefaultPublisher(), maxSize=3, policy=policy, blockTimeout=0.01)
+        for topicName, n in msgs:
+            queued.sendMessage(topicName, n=n)
+        queued.drain()
+        return queued.getNumDropped()
+
+    msgs = [('testQueuedPolicy', n) for n in range(5)]
+    assert sendAll(pub.QueuePolicy.DROP_OLDEST, msgs) == 2
+    assert received == [2, 3, 4]
+    assert sendAll(pub.QueuePolicy.DROP_NEWEST, msgs) == 2
+    assert received == [0, 1, 2]
+    with pytest.raises(Full):
+        sendAll(pub.QueuePolicy.BLOCK, msgs)
+
+    msgs = [('testQueuedPolicy', 0), ('testQueuedPolicyOther', 1), ('testQueuedPolicy', 2),
+            ('testQueuedPolicy', 3), ('testQueuedPolicyOther', 4)]
+    assert sendAll(pub.QueuePolicy.COALESCE, msgs) == 2
+    assert received == [0, -4, 3]  # 3 replaced data of 2, then 4 replaced data of 1
+
+    # blocking from a listener during drain() would never end, so it raises right away:
+    queued = pub.QueuedPublisher(pub.getDefaultPublisher(), maxSize=1)
+    def listenResend(n):
+        received.append(n)
+        queued.sendMessage('testQueuedPolicyOther', n=n)
+        queued.sendMessage('testQueuedPolicyOther', n=n)
+    pub.subscribe(listenResend, 'testQueuedPolicyResend')
+    del received[:]
+    queued.sendMessage('testQueuedPolicyResend', n=1)
+    with pytest.raises(Full):
+        queued.drain()
+    assert received == [1]
+    assert queued.getNumPending() == 1
+    queued.drain()
+    assert received == [1, -1]
+
+
+def testCoalescing():
+    import asyncio
+
+    received = []
+    def listenLatest(robot, x):
+        received.append(('latest', robot, x))
+    def listenPerRobot(robot, x):
+        received.append(('perRobot', robot, x))
+    def listenAll(robot, x):
+        received.append(('all', robot, x))
+
+    topic = topicMgr.getOrCreateTopic('testCoalesce', listenAll)
+    topic.setCoalescing()
+    assert topic.getCoalescing() is True
+    pub.subscribe(listenLatest, 'testCoalesce')
+    pub.subscribe(listenPerRobot, 'testCoalesce', coalesce=lambda msgData: msgData['robot'])
+    pub.subscribe(listenAll, 'testCoalesce', coalesce=False)
+
+    for x in range(3):
+        pub.sendMessage('testCoalesce', robot='r1', x=x)
+        pub.sendMessage('testCoalesce', robot='r2', x=x + 10)
+    assert [msg for msg in received if msg[0] != 'all'] == []
+    assert len(received) == 6
+
+    del received[:]
+    assert pub.flushCoalesced() == 3
+    assert sorted(received) == [('latest', 'r2', 12), ('perRobot', 'r1', 2), ('perRobot', 'r2', 12)]
+    assert pub.flushCoalesced() == 0
+
+    # drain of a queued publisher delivers coalesced messages:
+    del received[:]
+    queued = pub.QueuedPublisher(pub.getDefaultPublisher())
+    for x in range(100):
+        queued.sendMessage('testCoalesce', robot='r1', x=x)
+    queued.drain()
+    assert ('latest', 'r1', 99) in received and ('latest', 'r1', 98) not in received
+
+    # unsubscribed listeners don't get their pending messages:
+    del received[:]
+    pub.sendMessage('testCoalesce', robot='r1', x=0)
+    pub.unsubscribe(listenLatest, 'testCoalesce')
+    pub.flushCoalesced()
+    assert received == [('all', 'r1', 0), ('perRobot', 'r1', 0)]
+
+    with pytest.raises(ValueError):
+        topic.setCoalescing('yes')
+
+    # coroutine listeners can't coalesce, whether given at subscription or by topic:
+    async def listenAsync(robot, x):
+        received.append(('async', robot, x))
+    with pytest.raises(ValueError):
+        pub.subscribe(listenAsync, 'testCoalesce', coalesce=True)
+    with pytest.raises(ValueError):
+        pub.subscribe(listenAsync, 'testCoalesce')
+    assert not pub.isSubscribed(listenAsync, 'testCoalesce')
+    pub.subscribe(listenAsync, 'testCoalesce', coalesce=False)
+    topic.setCoalescing(False)
+    pub.unsubscribe(listenAsync, 'testCoalesce')
+    pub.subscribe(listenAsync, 'testCoalesce')
+    with pytest.raises(ValueError):
+        topic.setCoalescing()
+    assert topic.getCoalescing() is False
+    del received[:]
+    asyncio.run(pub.asendMessage('testCoalesce', robot='r1', x=1))
+    assert sorted(received) == [('all', 'r1', 1), ('async', 'r1', 1)]
+
+
+def testThrottleDebounce():
+    import time
+
+    scheduled = []
+    def scheduler(delay, func):
+        scheduled.append((delay, func))
+    oldScheduler = pub.setScheduler(scheduler)
+
+    received = []
+    def listenThrottled(x):
+        received.append(('throttled', x))
+    def listenDebounced(x):
+        received.append(('debounced', x))
+    try:
+        pub.subscribe(listenThrottled, 'testRateLimit', throttle=10)
+        pub.subscribe(listenDebounced, 'testRateLimit', debounce=0.01)
+        for x in range(5):
+            pub.sendMessage('testRateLimit', x=x)
+
+        # throttled listener called first time, then one trailing call deferred; debounced deferred:
+        assert received == [('throttled', 0)]
+        assert len(scheduled) == 2
+        debounceDelay, throttleDelay = sorted(delay for delay, _ in scheduled)
+        assert debounceDelay == 0.01 and 9 < throttleDelay <= 10
+
+        time.sleep(0.02)
+        for _, func in scheduled:
+            func()
+        assert sorted(received) == [('debounced', 4), ('throttled', 0), ('throttled', 4)]
+
+        # debounced listener deferred again if messages sent during delay:
+        del scheduled[:]
+        del received[:]
+        pub.sendMessage('testRateLimit', x=5)
+        scheduled.pop(0)[1]()  # throttled: trailing call
+        scheduled[0][1]()  # debounced: too early, re-scheduled
+        assert received == [('throttled', 5)]
+        assert len(scheduled) == 2
+        time.sleep(0.02)
+        scheduled[1][1]()
+        assert received == [('throttled', 5), ('debounced', 5)]
+
+        # deferred calls are dropped if the listener gets unsubscribed before they are due:
+        del scheduled[:]
+        del received[:]
+        pub.sendMessage('testRateLimit', x=6)
+        assert len(scheduled) == 2
+        pub.unsubscribe(listenThrottled, 'testRateLimit')
+        pub.unsubAll('testRateLimit')
+        time.sleep(0.02)
+        for _, func in scheduled:
+            func()
+        assert received == []
+
+        with pytest.raises(ValueError):
+            pub.subscribe(lambda x: None, 'testRateLimit', throttle=1, debounce=1)
+        async def listenAsync(x): pass
+        with pytest.raises(ValueError):
+            pub.subscribe(listenAsync, 'testRateLimit', throttle=1)
+    finally:
+        assert pub.setScheduler(oldScheduler) is scheduler
+
+
+def testIterate():
+    from threading import Thread
+
+    def proto(x): pass
+    topicMgr.getOrCreateTopic('testIterate', proto)
+    topicMgr.getOrCreateTopic('testIterate.sub', proto)
+
+    messages = pub.iterate('testIterate', maxSize=3)
+    for x in range(5):
+        pub.sendMessage('testIterate', x=x)
+    assert messages.getNumPending() == 3 and messages.getNumDropped() == 2
+    assert [next(messages), next(messages), next(messages)] == [dict(x=2), dict(x=3), dict(x=4)]
+
+    # consumer thread gets messages from other thread, until closed:
+    received = []
+    def consume():
+        for msgData in messages:
+            received.append(msgData['x'])
+    consumer = Thread(target=consume)
+    consumer.start()
+    pub.sendMessage('testIterate', x=5)
+    pub.sendMessage('testIterate.sub', x=6)
+    messages.close()
+    consumer.join(5)
+    assert received == [5, 6]
+    assert not topicMgr.getTopic('testIterate').hasListeners()
+
+    # unsubscribed when garbage collected:
+    messages = pub.iterate('testIterate', overflow='drop_newest', withTopic=True)
+    pub.sendMessage('testIterate.sub', x=7)
+    assert next(messages) == (topicMgr.getTopic('testIterate.sub'), dict(x=7))
+    del messages
+    gc.collect()
+    assert not topicMgr.getTopic('testIterate').hasListeners()
+
+    with pytest.raises(ValueError):
+        pub.iterate('testIterate', overflow=pub.QueuePolicy.COALESCE)
+
+
+def testStream():
+    import asyncio
+    from threading import Thread
+
+    def proto(x): pass
+    topicMgr.getOrCreateTopic('testStream', proto)
+
+    async def consume():
+        received = []
+        with pub.stream('testStream', maxSize=10) as messages:
+            sender = Thread(target=lambda: [pub.sendMessage('testStream', x=x) for x in range(3)])
+            sender.start()
+            async for msgData in messages:
+                received.append(msgData['x'])
+                if len(received) == 3:
+                    break
+            sender.join()
+            pub.sendMessage('testStream', x=3)
+            assert (await messages.__anext__()) == dict(x=3)
+        assert messages.isClosed()
+        return received
+
+    assert asyncio.run(consume()) == [0, 1, 2]
+    assert not topicMgr.getTopic('testStream').hasListeners()
+
+    async def streamBlocking():
+        pub.stream('testStream', overflow=pub.QueuePolicy.BLOCK)
+    with pytest.raises(ValueError):
+        asyncio.run(streamBlocking())
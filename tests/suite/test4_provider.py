@@ -10,7 +10,7 @@ from textwrap import dedent
 from pathlib import Path
 import sys
 
-from pubsub.core import TopicNameError
+from pubsub.core import TopicNameError, ITopicDefnProvider
 
 try:
     from importlib.util import cache_from_source
@@ -348,3 +348,17 @@ def test_module_as_class():
     assert topicMgr.getTopic('root_topic_2.subtopic_21') is not None
 
     pub.sendMessage(my_import_topics.root_topic_1)
+
+
+def test_instantiate_returns_provider_names():
+    clear_topic_tree()
+
+    class Provider(ITopicDefnProvider):
+        def getDefn(self, topicNameTuple):
+            return None, None
+        def topicNames(self):
+            return [('zz_inst', 'sub'), 'aa_inst.b.c', ('zz_inst',)]
+
+    names = pub.instantiateAllDefinedTopics(Provider())
+    assert names == [('zz_inst', 'sub'), 'aa_inst.b.c', ('zz_inst',)]
+    assert topicMgr.getTopic('aa_inst.b') is not None